@@ -1,12 +1,15 @@
 """Weekly insights generator service"""
 
-import json
 import shutil
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import structlog
+from scraper.utils import codec
 from jinja2 import Environment, FileSystemLoader, select_autoescape, PackageLoader
+import numpy as np
+from scraper.models.resource_table import Categorical, ResourceTable
 from .resource_matcher import ResourceMatcher
 import random
 from dataclasses import dataclass
@@ -79,8 +82,7 @@ class WeeklyInsightsGenerator:
         try:
             # 載入最新的彙整資料
             latest_data = self.data_dir / "aggregated" / "latest" / "aggregated.json"
-            with latest_data.open() as f:
-                raw_data = json.load(f)
+            raw_data = codec.read_json(latest_data)
             
             # 合併相同資源
             raw_data["resources"]["resources"] = self._merge_resources_by_type(raw_data["resources"]["resources"])
@@ -105,9 +107,10 @@ class WeeklyInsightsGenerator:
             
             # 分析資料
             rising_stars = self._find_rising_stars(all_resources)
-            version_updates = self._analyze_version_trends(all_resources)
-            category_highlights = self._get_category_highlights(all_resources)
-            platform_stats = self._get_platform_stats(all_resources)
+            table = ResourceTable.from_dicts(all_resources, type_key="type")
+            version_updates = self._analyze_version_trends(table)
+            category_highlights = self._get_category_highlights(table)
+            platform_stats = self._get_platform_stats(table)
             
             # 建立報告資料結構
             report = {
@@ -211,82 +214,57 @@ class WeeklyInsightsGenerator:
         candidates.sort(key=lambda x: x["growth_data"]["growth_rate"], reverse=True)
         return candidates[:10]
     
-    def _analyze_version_trends(self, data: list) -> dict:
+    def _analyze_version_trends(self, table: ResourceTable) -> dict:
         """Analyze version trends"""
-        version_stats = {}
-        
-        # 從資料中提取版本資訊
-        for resource in data:
-            for version in resource.get("versions", []):
-                if version not in version_stats:
-                    version_stats[version] = {"count": 0, "resources": []}
-                version_stats[version]["count"] += 1
-                version_stats[version]["resources"].append(resource["name"])
+        # 每個版本的資源列，依版本首次出現順序
+        version_rows = table.group_indices("versions")
         
         # 按資源數量排序
-        popular_versions = sorted(
-            version_stats.items(),
-            key=lambda x: x[1]["count"],
-            reverse=True
-        )
+        popular_versions = sorted(version_rows.items(), key=lambda x: len(x[1]), reverse=True)[:5]
         
         return {
-            "popular_versions": popular_versions[:5]
+            "popular_versions": [
+                (version, {"count": len(rows), "resources": [r["name"] for r in table.rows(rows)]})
+                for version, rows in popular_versions
+            ]
         }
     
-    def _get_category_highlights(self, data: list) -> dict:
+    def _get_category_highlights(self, table: ResourceTable) -> dict:
         """Get category highlights"""
         highlights = {}
         
-        # 按類型分組資源
-        for resource in data:
-            category = resource.get("type", "其他")
-            if category not in highlights:
-                highlights[category] = {
-                    "total_resources": 0,
-                    "total_downloads": 0,
-                    "top_resources": []
-                }
-            
-            highlights[category]["total_resources"] += 1
-            highlights[category]["total_downloads"] += resource.get("downloads", 0)
-            highlights[category]["top_resources"].append(resource)
-        
-        # 為每個類型排序並只保留前 5 個資源
-        for category in highlights:
-            highlights[category]["top_resources"].sort(
-                key=lambda x: x.get("downloads", 0),
-                reverse=True
-            )
-            highlights[category]["top_resources"] = highlights[category]["top_resources"][:5]
+        # 按類型分組資源，每個類型只保留下載量前 5 的資源
+        for category, rows in table.group_indices("resource_type").items():
+            highlights[category if category is not None else "其他"] = {
+                "total_resources": len(rows),
+                "total_downloads": table.sum("downloads", rows),
+                "top_resources": table.rows(table.top_n(5, "downloads", rows))
+            }
         
         return highlights
     
-    def _get_platform_stats(self, data: list) -> dict:
+    def _get_platform_stats(self, table: ResourceTable) -> dict:
         """Get platform statistics"""
-        stats = {}
+        # 多平台資源的每個平台各算一列，類型沿用所屬資源的編碼
+        platform_lists = [resource.get("platforms", []) for resource in table.records]
+        entries = list(chain.from_iterable(platform_lists))
+        parents = np.repeat(np.arange(len(table)), [len(platforms) for platforms in platform_lists])
+        platforms = ResourceTable(entries, dict_records=True, columns={
+            "platform": Categorical.encode([entry["name"].lower() for entry in entries]),
+            "resource_type": table["resource_type"].take(parents)
+        })
         
-        # 從資料中提取平台統計
-        for resource in data:
-            # 處理多平台資源
-            for platform_info in resource.get("platforms", []):
-                platform = platform_info["name"].lower()
-                if platform not in stats:
-                    stats[platform] = {
-                        "total_resources": 0,
-                        "total_downloads": 0,
-                        "resource_types": {}
-                    }
-                
-                stats[platform]["total_resources"] += 1
-                stats[platform]["total_downloads"] += platform_info["downloads"]
-                
-                resource_type = resource.get("type", "其他")
-                if resource_type not in stats[platform]["resource_types"]:
-                    stats[platform]["resource_types"][resource_type] = 0
-                stats[platform]["resource_types"][resource_type] += 1
-        
-        return stats
+        return {
+            platform: {
+                "total_resources": len(rows),
+                "total_downloads": platforms.sum("downloads", rows),
+                "resource_types": {
+                    resource_type if resource_type is not None else "其他": count
+                    for resource_type, count in platforms.count_by("resource_type", rows).items()
+                }
+            }
+            for platform, rows in platforms.group_indices("platform").items()
+        }
     
     def _copy_static_files(self) -> None:
         """Copy static files to public directory"""
@@ -1,12 +1,12 @@
 """Weekly insights generator service"""
 
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import structlog
 from dataclasses import dataclass
 from zoneinfo import ZoneInfo
+from scraper.utils import codec
 from jinja2 import Environment, FileSystemLoader
 
 logger = structlog.get_logger(__name__)
@@ -191,8 +191,7 @@ class WeeklyInsightsGenerator:
             latest_dir = self.base_dir / "data" / "aggregated" / "latest"
             data_file = latest_dir / "aggregated.json"
             
-            with open(data_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return codec.read_json(data_file)
         except Exception as e:
             self.logger.error("failed_to_load_data", error=str(e))
             raise
@@ -345,8 +344,7 @@ class WeeklyInsightsGenerator:
             }
             
             # 儲存 JSON 報告
-            with open(report_file, "w", encoding="utf-8") as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            codec.write_json(report_file, report_data)
             
             # 產生 HTML 報告
             self._generate_html_report(report)
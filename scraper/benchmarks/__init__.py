@@ -0,0 +1 @@
+"""Micro-benchmarks of the scraper's hot paths."""
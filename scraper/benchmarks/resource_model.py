@@ -0,0 +1,147 @@
+"""
+Per-resource memory and construction time of the Resource model
+
+Compares the slotted, interning ``Resource`` with a plain ``@dataclass``
+copy of the same fields, the model used before. Resources are rebuilt
+from decoded JSON through the ``from_dict`` path used when a processed
+snapshot is loaded, so every string starts out as a separate object just
+like after reading a file::
+
+    python -m scraper.benchmarks.resource_model --count 100000
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from scraper.models.resource import Resource
+
+PlainResource = dataclasses.make_dataclass("PlainResource", [
+    (f.name, f.type, dataclasses.field(default=f.default, default_factory=f.default_factory))
+    for f in dataclasses.fields(Resource)
+])
+
+PLATFORMS = {
+    "modrinth": ["mod", "plugin", "modpack", "resourcepack", "datapack"],
+    "hangar": ["plugin", "addon"],
+    "polymart": ["plugin", "mod", "resourcepack", "datapack", "pluginpack"]
+}
+LICENSES = ["MIT", "GPL-3.0-only", "Apache-2.0", "LGPL-3.0-only", "ARR", None]
+CATEGORIES = ["adventure", "decoration", "economy", "equipment", "food", "library", "magic",
+              "management", "minigame", "mobs", "optimization", "social", "storage",
+              "technology", "transportation", "utility", "worldgen", "admin_tools", "chat", "game_mechanics"]
+VERSIONS = [f"1.{minor}.{patch}" for minor in range(16, 22) for patch in range(5)]
+LOADERS = ["fabric", "forge", "neoforge", "quilt", "paper", "spigot", "velocity"]
+
+def generate(count: int, seed: int = 0) -> bytes:
+    """
+    Generate a snapshot of synthetic resources
+    
+    Args:
+        count: Number of resources
+        seed: Random seed
+    
+    Returns:
+        JSON array in the ``Resource.to_dict`` format
+    """
+    rng = random.Random(seed)
+    epoch = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(count):
+        platform = rng.choice(list(PLATFORMS))
+        created_at = epoch + timedelta(minutes=rng.randrange(2_000_000))
+        items.append({
+            "id": f"{platform}-{i}",
+            "name": f"Resource {i}",
+            "description": f"Synthetic resource number {i}",
+            "author": f"author{rng.randrange(count // 4 + 1)}",
+            "downloads": rng.randrange(10_000_000),
+            "created_at": created_at.isoformat(),
+            "updated_at": (created_at + timedelta(days=rng.randrange(400))).isoformat(),
+            "resource_type": rng.choice(PLATFORMS[platform]),
+            "platform": platform,
+            "versions": rng.sample(VERSIONS, rng.randrange(1, 12)),
+            "categories": rng.sample(CATEGORIES, rng.randrange(0, 4)),
+            "website_url": f"https://example.com/{platform}/{i}",
+            "source_url": None,
+            "license": rng.choice(LICENSES),
+            "followers": rng.randrange(50_000),
+            "loaders": rng.sample(LOADERS, rng.randrange(1, 3)),
+            "gallery_count": rng.randrange(10)
+        })
+    return json.dumps(items).encode()
+
+def _build(cls: type) -> Callable[[Dict[str, Any]], Any]:
+    """Create a ``from_dict`` equivalent for a model class"""
+    def build(data: Dict[str, Any]) -> Any:
+        data = dict(data)
+        for key in ("created_at", "updated_at"):
+            data[key] = datetime.fromisoformat(data[key])
+        return cls(**data)
+    return build
+
+def measure(cls: type, payload: bytes, repeat: int = 3) -> Dict[str, float]:
+    """
+    Measure one model class
+    
+    Args:
+        cls: Model class
+        payload: Output of ``generate``
+        repeat: Timing runs, the fastest one is reported
+    
+    Returns:
+        Bytes retained and microseconds of construction per resource
+    """
+    build = _build(cls)
+    
+    timings = []
+    for _ in range(repeat):
+        items = json.loads(payload)
+        gc.collect()
+        started = time.perf_counter()
+        resources = [build(item) for item in items]
+        timings.append(time.perf_counter() - started)
+        del items, resources
+    
+    gc.collect()
+    tracemalloc.start()
+    try:
+        items = json.loads(payload)
+        resources: List[Any] = [build(item) for item in items]
+        # Only what the resources reference is kept once the decoded JSON is gone
+        del items
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    count = len(resources)
+    return {
+        "bytes_per_resource": retained / count,
+        "construct_us_per_resource": min(timings) / count * 1e6
+    }
+
+def main() -> None:
+    """Print the comparison"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000, help="Resources per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic snapshot")
+    args = parser.parse_args()
+    
+    payload = generate(args.count, args.seed)
+    results = {name: measure(cls, payload) for name, cls in
+               (("dataclass (before)", PlainResource), ("slots + interning", Resource))}
+    
+    print(f"{args.count} resources")
+    print(f"{'model':<20} {'bytes/resource':>15} {'construct µs/resource':>22}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['bytes_per_resource']:>15.0f} {result['construct_us_per_resource']:>22.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Command line interface for the scraper"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+import click
+import structlog
+
+from .services.scraper_service import main, run_worker
+
+logger = structlog.get_logger(__name__)
+
+@click.group()
+def cli():
+    """Minecraft resource scraper"""
+    pass
+
+@cli.command()
+@click.option(
+    "--base-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Base directory containing the data files"
+)
+@click.option(
+    "--replay",
+    "replay_dir",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Reprocess a data/raw/<timestamp> snapshot instead of calling the platform APIs"
+)
+@click.option(
+    "--record",
+    is_flag=True,
+    help="Record every HTTP request/response pair next to the raw data"
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only fetch resources changed since the previous processed snapshot (Modrinth, Hangar)"
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Split the run into work units drained by this many local worker processes"
+)
+@click.option(
+    "--resume",
+    metavar="TIMESTAMP",
+    default=None,
+    help="Continue an interrupted run, skipping the pages it already fetched"
+)
+@click.option(
+    "--platform",
+    "platforms",
+    multiple=True,
+    help="Only scrape this configured platform, may be repeated"
+)
+def run(base_dir: Optional[Path], replay_dir: Optional[Path], record: bool, incremental: bool,
+        workers: Optional[int], resume: Optional[str], platforms: Tuple[str, ...]):
+    """Scrape all platforms, store the results and aggregate them"""
+    if replay_dir and (record or incremental or resume):
+        raise click.UsageError("--replay cannot be combined with --record, --incremental or --resume")
+    if workers is not None and (replay_dir or record or incremental):
+        raise click.UsageError("--workers cannot be combined with --replay, --record or --incremental")
+    
+    try:
+        asyncio.run(main(storage_dir=base_dir, replay_dir=replay_dir, record=record,
+                         incremental=incremental, workers=workers, resume=resume,
+                         platforms=list(platforms) or None))
+    except Exception as e:
+        logger.error("scraping_failed", error=str(e))
+        sys.exit(1)
+
+@cli.command()
+@click.option(
+    "--base-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    help="Base directory containing the data files, shared with the coordinating host"
+)
+@click.option(
+    "--run-id",
+    default=None,
+    help="Timestamp of the sharded run to join, the latest one when omitted"
+)
+def worker(base_dir: Optional[Path], run_id: Optional[str]):
+    """Help drain the work units of a sharded run"""
+    try:
+        run_worker(storage_dir=base_dir, run_id=run_id)
+    except Exception as e:
+        logger.error("worker_failed", error=str(e))
+        sys.exit(1)
+
+@cli.command("mock-server")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind")
+@click.option("--port", default=8080, show_default=True, help="Port to bind")
+@click.option("--size", default=1000, show_default=True, help="Resources per platform and resource type")
+@click.option("--latency", default=0.0, show_default=True, help="Base response delay in seconds")
+@click.option("--jitter", default=0.0, show_default=True, help="Extra random delay of up to this many seconds")
+@click.option("--error-rate", default=0.0, show_default=True, help="Fraction of requests failing with --error-status")
+@click.option("--error-status", default=503, show_default=True, help="Status code of injected errors")
+@click.option("--rate-limit", default=0, show_default=True, help="Requests allowed per --rate-window, 0 for unlimited")
+@click.option("--rate-window", default=60.0, show_default=True, help="Rate limit window in seconds")
+@click.option("--seed", default=0, show_default=True, help="Seed for jitter and error injection")
+def mock_server(host: str, port: int, **settings):
+    """Serve synthetic platform APIs for offline load and latency testing"""
+    # aiohttp.web is only needed by this command
+    from .mock_server import MockSettings, api_urls, run_mock_server
+    
+    click.echo("Point the clients at the mock server with these api_url settings:")
+    for platform, url in api_urls(f"http://{host}:{port}").items():
+        click.echo(f"  platforms.{platform}.api_url: {url}")
+    run_mock_server(host, port, MockSettings(**settings))
+
+if __name__ == "__main__":
+    cli()
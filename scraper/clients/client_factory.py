@@ -3,9 +3,16 @@ API client factory and base client interface
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Type, TypeVar, ClassVar
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, ClassVar
+import asyncio
+import aiohttp
 import structlog
 
+from scraper.registry import PlatformRegistry
+from scraper.utils.checkpoint import PageCheckpoint
+from scraper.utils.http import HTTPResult, HTTPSessionManager
+
 # Initialize structured logging
 logger = structlog.get_logger(__name__)
 
@@ -29,6 +36,389 @@ class BaseClient(ABC):
     # Class variable to store platform name
     platform: ClassVar[str]
     
+    # Whether the client implements fetch_updates
+    supports_incremental: ClassVar[bool] = False
+    
+    # Whether the client implements stream_pages
+    supports_streaming: ClassVar[bool] = False
+    
+    # Whether the client implements fetch_range
+    supports_sharding: ClassVar[bool] = False
+    
+    # Key holding the items in a resource type's raw payload
+    raw_items_key: ClassVar[str] = "result"
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 session_manager: Optional[HTTPSessionManager] = None) -> None:
+        """
+        Initialize the client
+        
+        Args:
+            api_key: Optional API key for authenticated requests
+            session_manager: Shared HTTP session manager; a private one is used when omitted
+        """
+        self.api_key = api_key
+        self.session_manager = session_manager or HTTPSessionManager()
+        self._owns_session_manager = session_manager is None
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Completed pages of the run, reused instead of refetched when resuming
+        self.checkpoint: Optional[PageCheckpoint] = None
+        # Resource types whose fetch failed, with the error
+        self.failed_types: Dict[str, str] = {}
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """
+        Build the headers sent with every request of this client
+        
+        Returns:
+            Dict of request headers
+        """
+        headers = {}
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        return headers
+    
+    async def _ensure_session(self) -> None:
+        """Ensure the shared aiohttp session is available"""
+        if not self.session or self.session.closed:
+            self.session = await self.session_manager.get_session()
+    
+    async def _close_session(self) -> None:
+        """Release the session; only a privately owned session manager is closed"""
+        self.session = None
+        if self._owns_session_manager:
+            await self.session_manager.close()
+    
+    @asynccontextmanager
+    async def _request(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request with this client's headers through the session manager
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments passed to the session manager
+            
+        Yields:
+            The response, released when the context exits
+        """
+        headers = {**self._build_headers(), **kwargs.pop("headers", {})}
+        async with self.session_manager.request(method, url, headers=headers, **kwargs) as response:
+            yield response
+    
+    async def _fetch(self, method: str, url: str, **kwargs: Any) -> HTTPResult:
+        """
+        Send a request with this client's headers and read the whole response
+        
+        Goes through the session manager's response cache when one is configured.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments passed to the session manager
+            
+        Returns:
+            The read response
+        """
+        headers = {**self._build_headers(), **kwargs.pop("headers", {})}
+        return await self.session_manager.fetch(method, url, headers=headers, **kwargs)
+    
+    async def _checkpointed(self, key: str, fetch_page: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Fetch a page unless the run's checkpoint already holds it
+        
+        Args:
+            key: Page identifier within the platform
+            fetch_page: Coroutine function fetching the page
+            
+        Returns:
+            The checkpointed or freshly fetched page
+        """
+        if self.checkpoint is None:
+            return await fetch_page()
+        page = self.checkpoint.load(self.platform, key)
+        if page is None:
+            page = await fetch_page()
+            self.checkpoint.save(self.platform, key, page)
+        return page
+    
+    async def _stream(self, method: str, url: str, path: Sequence[str], **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Send a request with this client's headers and decode a JSON array incrementally
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            path: Object keys leading from the document root to the array
+            **kwargs: Extra arguments passed to the session manager
+            
+        Yields:
+            Items of the array, one at a time
+        """
+        headers = {**self._build_headers(), **kwargs.pop("headers", {})}
+        async with aclosing(self.session_manager.stream_items(method, url, path,
+                                                             headers=headers, **kwargs)) as items:
+            async for item in items:
+                yield item
+    
+    async def _fetch_types(self, resource_types: List[str],
+                           fetch_type: Callable[[str], Awaitable[Dict]],
+                           concurrency: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Fetch several resource types concurrently
+        
+        A failing type is logged, recorded in ``failed_types`` and left out
+        of the result; it does not cancel the other types.
+        
+        Args:
+            resource_types: Resource types to fetch
+            fetch_type: Coroutine function fetching the payload of one type
+            concurrency: Maximum number of types fetched at once, all at once when omitted
+            
+        Returns:
+            Dict mapping each successfully fetched type to its payload, in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency or max(len(resource_types), 1))
+        
+        async def fetch_bounded(resource_type: str) -> Dict:
+            async with semaphore:
+                return await fetch_type(resource_type)
+        
+        results = await asyncio.gather(
+            *(fetch_bounded(resource_type) for resource_type in resource_types),
+            return_exceptions=True
+        )
+        
+        all_resources = {}
+        for resource_type, result in zip(resource_types, results):
+            if isinstance(result, BaseException):
+                self._record_type_failure(resource_type, result)
+                continue
+            all_resources[resource_type] = result
+        return all_resources
+    
+    def _record_type_failure(self, resource_type: str, error: BaseException) -> None:
+        """Log a failed resource type and keep it in ``failed_types``"""
+        self.failed_types[resource_type] = str(error) or type(error).__name__
+        logger.error(f"{self.platform}_type_fetch_failed", type=resource_type, error=str(error))
+    
+    async def _stream_types(self, resource_types: List[str],
+                            iter_pages: Callable[[str], AsyncIterator[List[Dict]]],
+                            concurrency: Optional[int] = None,
+                            queue_depth: int = 4) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Fetch several resource types concurrently and hand over their pages as they arrive
+        
+        Each type's pages go through a bounded queue, so producers wait once
+        ``queue_depth`` pages are waiting for the consumer. A failing type is
+        logged and recorded in ``failed_types``; it does not cancel the other
+        types, but the pages it yielded before failing have been handed over.
+        
+        Args:
+            resource_types: Resource types to fetch
+            iter_pages: Async generator function yielding the pages of one type
+            concurrency: Maximum number of types fetched at once, all at once when omitted
+            queue_depth: Maximum number of fetched pages waiting for the consumer
+            
+        Yields:
+            Tuples of (resource type, raw items of one page)
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+        semaphore = asyncio.Semaphore(concurrency or max(len(resource_types), 1))
+        type_done = object()
+        
+        async def produce(resource_type: str) -> None:
+            try:
+                async with semaphore:
+                    async with aclosing(iter_pages(resource_type)) as pages:
+                        async for page in pages:
+                            await queue.put((resource_type, page))
+            except Exception as e:
+                self._record_type_failure(resource_type, e)
+            await queue.put(type_done)
+        
+        await self._ensure_session()
+        producers = [asyncio.create_task(produce(resource_type)) for resource_type in resource_types]
+        try:
+            remaining = len(producers)
+            while remaining:
+                entry = await queue.get()
+                if entry is type_done:
+                    remaining -= 1
+                    continue
+                yield entry
+        finally:
+            for task in producers:
+                task.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+            await self._close_session()
+    
+    async def _iter_offset_pages(self, fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                                 offsets: Sequence[int], window: int) -> AsyncIterator[List[Dict]]:
+        """
+        Fetch known page offsets with a bounded number of requests in flight
+        
+        Pages are yielded in offset order; at most ``window`` requests run
+        ahead of the consumer.
+        
+        Args:
+            fetch_page: Coroutine function returning the items at an offset
+            offsets: Offsets of the pages to fetch
+            window: Maximum number of pages requested ahead
+            
+        Yields:
+            Items of each page
+        """
+        remaining = iter(offsets)
+        pending: List[asyncio.Task] = []
+        try:
+            while True:
+                while len(pending) < max(window, 1):
+                    offset = next(remaining, None)
+                    if offset is None:
+                        break
+                    pending.append(asyncio.create_task(fetch_page(offset)))
+                if not pending:
+                    return
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _page_until_unchanged(self, resource_type: str,
+                                    fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                                    page_size: int, max_results: int,
+                                    is_unchanged: Callable[[str, Dict], bool]) -> List[Dict]:
+        """
+        Page through a last-updated-first listing until known data is reached
+        
+        Paging stops after the first page containing an item that is unchanged
+        since the previous snapshot, after a short page, or at ``max_results``.
+        
+        Args:
+            resource_type: Type of resource being fetched
+            fetch_page: Coroutine function returning the items at an offset
+            page_size: Number of items per page
+            max_results: Maximum number of items to page through
+            is_unchanged: Check telling whether an item matches the previous snapshot
+            
+        Returns:
+            Items of all fetched pages in order
+        """
+        items: List[Dict] = []
+        offset = 0
+        while offset < max_results:
+            page = await fetch_page(offset)
+            items.extend(page)
+            if len(page) < page_size or any(is_unchanged(resource_type, item) for item in page):
+                break
+            offset += page_size
+        
+        logger.info(f"{self.platform}_updates_fetched",
+                   type=resource_type,
+                   item_count=len(items),
+                   page_count=offset // page_size + 1)
+        return items
+    
+    async def fetch_updates(self, is_unchanged: Callable[[str, Dict], bool]) -> Dict:
+        """
+        Fetch only the resources changed since the previous snapshot
+        
+        Args:
+            is_unchanged: Check telling whether a raw item matches the previous snapshot
+            
+        Returns:
+            Dict containing the changed resources by type, in the fetch_resources shape
+            
+        Raises:
+            NotImplementedError: If the platform does not support incremental fetching
+        """
+        raise NotImplementedError(f"Incremental fetching is not supported for {self.platform}")
+    
+    async def plan_ranges(self, resource_type: str, shard_size: int) -> List[Tuple[int, Optional[int]]]:
+        """
+        Split a resource type into offset ranges for sharded runs
+        
+        Clients that cannot tell the size of a listing up front keep the
+        whole type as a single range.
+        
+        Args:
+            resource_type: Type of resource to split
+            shard_size: Preferred number of resources per range
+            
+        Returns:
+            List of (start, end) offsets, ``end`` None meaning until the listing ends
+        """
+        return [(0, None)]
+    
+    async def fetch_range(self, resource_type: str, start: int, end: Optional[int]) -> List[Dict]:
+        """
+        Fetch the raw items of one offset range planned by ``plan_ranges``
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Offset of the first item
+            end: Offset past the last item, until the listing ends when None
+            
+        Returns:
+            Raw items of the range in listing order
+            
+        Raises:
+            NotImplementedError: If the platform does not support sharding
+        """
+        raise NotImplementedError(f"Sharded fetching is not supported for {self.platform}")
+    
+    @staticmethod
+    def _split_ranges(total: int, page_size: int, shard_size: int) -> List[Tuple[int, Optional[int]]]:
+        """
+        Split ``total`` items into ranges of whole pages
+        
+        Args:
+            total: Number of items in the listing
+            page_size: Number of items per request
+            shard_size: Preferred number of items per range
+            
+        Returns:
+            List of (start, end) offsets covering the listing
+        """
+        shard = max(shard_size // page_size, 1) * page_size
+        return [(start, min(start + shard, total)) for start in range(0, total, shard)]
+    
+    async def _fetch_offsets(self, fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                             offsets: Sequence[int], concurrency: int) -> List[Dict]:
+        """
+        Fetch the pages at known offsets concurrently
+        
+        Args:
+            fetch_page: Coroutine function returning the items at an offset
+            offsets: Offsets of the pages to fetch
+            concurrency: Maximum number of pages fetched at once
+            
+        Returns:
+            Items of all pages in offset order
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def fetch_bounded(offset: int) -> List[Dict]:
+            async with semaphore:
+                return await fetch_page(offset)
+        
+        pages = await asyncio.gather(*(fetch_bounded(offset) for offset in offsets))
+        return [item for page in pages for item in page]
+    
+    def stream_pages(self) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Fetch resources page by page instead of as a whole payload
+        
+        Returns:
+            Async iterator of (resource type, raw items of one page) pairs
+            
+        Raises:
+            NotImplementedError: If the platform does not support streaming
+        """
+        raise NotImplementedError(f"Streaming is not supported for {self.platform}")
+    
     @abstractmethod
     async def fetch_resources(self) -> Dict:
         """
@@ -45,9 +435,20 @@ class BaseClient(ABC):
 class ClientFactory:
     """Factory for creating platform-specific API clients"""
     
-    def __init__(self) -> None:
-        """Initialize the client registry"""
+    def __init__(self, session_manager: Optional[HTTPSessionManager] = None,
+                 registry: Optional[PlatformRegistry] = None) -> None:
+        """
+        Initialize the client registry
+        
+        Args:
+            session_manager: HTTP session manager shared by every created client
+            registry: Platform registry importing the clients not registered explicitly
+        """
         self._clients: Dict[str, Type[BaseClient]] = {}
+        self.registry = registry
+        self.session_manager = session_manager or HTTPSessionManager()
+        # Page checkpoint handed to every created client
+        self.checkpoint: Optional[PageCheckpoint] = None
     
     def register(self, platform: str, client_class: Type[T]) -> None:
         """
@@ -83,16 +484,24 @@ class ClientFactory:
             ClientCreationError: If client creation fails
         """
         try:
-            if platform not in self._clients:
+            if platform in self._clients:
+                client_class = self._clients[platform]
+            elif self.registry is not None:
+                client_class = self.registry.client_class(platform)
+            else:
                 logger.error("client_not_registered", platform=platform)
                 raise ClientCreationError(f"No client registered for platform: {platform}")
             
-            client_class = self._clients[platform]
-            client = client_class()
+            client = client_class(session_manager=self.session_manager)
+            client.checkpoint = self.checkpoint
             logger.info("client_created", platform=platform, client_class=client_class.__name__)
             return client
         except ClientCreationError:
             raise
         except Exception as e:
             logger.error("client_creation_failed", platform=platform, error=str(e))
-            raise ClientCreationError(f"Failed to create client for platform {platform}: {str(e)}") 
\ No newline at end of file
+            raise ClientCreationError(f"Failed to create client for platform {platform}: {str(e)}") 
+    
+    async def close(self) -> None:
+        """Close the HTTP session shared by all created clients"""
+        await self.session_manager.close()
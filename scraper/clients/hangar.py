@@ -2,10 +2,14 @@
 Hangar API client implementation
 """
 
-from typing import Dict, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
 import aiohttp
 import structlog
 from .client_factory import BaseClient, ClientError
+from scraper.config import get_config
+from scraper.utils.http import HTTPSessionManager
 
 logger = structlog.get_logger(__name__)
 
@@ -13,38 +17,181 @@ class HangarClient(BaseClient):
     """Client for interacting with the Hangar API"""
     
     platform = "hangar"
+    supports_incremental = True
+    supports_streaming = True
+    supports_sharding = True
     BASE_URL = "https://hangar.papermc.io/api/v1"
+    DEFAULT_PAGE_CONCURRENCY = 4  # Concurrent page requests per type
+    MAX_INCREMENTAL_RESULTS = 10000  # Safety cap when paging by last update
     
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    # Extra project query filters per resource type
+    TYPE_FILTERS = {
+        "plugin": {},
+        "addon": {"tag": "ADDON"}
+    }
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 session_manager: Optional[HTTPSessionManager] = None) -> None:
         """
         Initialize the Hangar client
         
         Args:
             api_key: Optional API key for authenticated requests
+            session_manager: Shared HTTP session manager
+        """
+        super().__init__(api_key=api_key, session_manager=session_manager)
+        self.config = get_config()
+        platform_config = self.config["platforms"]["hangar"]
+        self.base_url = platform_config.get("api_url", self.BASE_URL)
+        self.batch_size = platform_config.get("batch_size", 25)
+        self.page_concurrency = platform_config.get("page_concurrency", self.DEFAULT_PAGE_CONCURRENCY)
+        self.type_concurrency = platform_config.get("type_concurrency")
+    
+    async def _fetch_page(self, resource_type: str, offset: int, sort: str = "-downloads") -> Dict:
+        """
+        Fetch a single project page of a specific type, reusing the run's checkpoint
+        
+        Args:
+            resource_type: Type of resource to fetch
+            offset: Offset of the first project in the page
+            sort: Project sort order
+            
+        Returns:
+            Dict containing the project list response
+        """
+        return await self._checkpointed(f"{resource_type}_{sort}_{offset}",
+                                        lambda: self._request_page(resource_type, offset, sort))
+    
+    async def _request_page(self, resource_type: str, offset: int, sort: str = "-downloads") -> Dict:
+        """
+        Fetch a single project page of a specific type
+        
+        Args:
+            resource_type: Type of resource to fetch
+            offset: Offset of the first project in the page
+            sort: Project sort order
+            
+        Returns:
+            Dict containing the project list response
+            
+        Raises:
+            ClientError: If the request fails
+        """
+        url = f"{self.base_url}/projects"
+        params = {
+            "limit": self.batch_size,
+            "offset": offset,
+            "sort": sort,
+            **self.TYPE_FILTERS.get(resource_type, {})
+        }
+        
+        logger.info("fetching_hangar_resources", url=url, params=params, type=resource_type)
+        response = await self._fetch("GET", url, params=params)
+        if response.status != 200:
+            error_text = response.text()
+            logger.error("hangar_request_failed", 
+                       status=response.status, 
+                       error=error_text,
+                       type=resource_type,
+                       offset=offset)
+            raise ClientError(f"Hangar API request failed: {error_text}")
+        
+        return response.json()
+    
+    def _of_type(self, resource_type: str, projects: List[Dict]) -> List[Dict]:
+        """
+        Drop the projects listed under another type's tag
+        
+        Args:
+            resource_type: Type the projects were fetched for
+            projects: Projects of one or more pages
+            
+        Returns:
+            Projects belonging to the type
+        """
+        # Hangar 無法排除標籤，未篩選標籤的插件列表也包含附加元件
+        if "tag" in self.TYPE_FILTERS.get(resource_type, {}):
+            return projects
+        other_tags = {filters["tag"] for filters in self.TYPE_FILTERS.values() if "tag" in filters}
+        return [project for project in projects
+                if not other_tags.intersection(project.get("settings", {}).get("tags") or [])]
+    
+    async def _fetch_by_type(self, resource_type: str) -> Dict:
+        """
+        Fetch every project of a specific type
+        
+        The first page tells us ``pagination.count``; the remaining offsets are
+        then requested concurrently, bounded by ``page_concurrency``.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Returns:
+            Dict containing the projects of all pages in order
+            
+        Raises:
+            ClientError: If any page request fails
         """
-        self.api_key = api_key
-        self.session: Optional[aiohttp.ClientSession] = None
+        first_page = await self._fetch_page(resource_type, 0)
+        total = first_page.get("pagination", {}).get("count", 0)
+        
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+        
+        async def fetch_bounded(offset: int) -> Dict:
+            async with semaphore:
+                return await self._fetch_page(resource_type, offset)
         
-    async def _ensure_session(self) -> None:
-        """Ensure aiohttp session exists"""
-        if not self.session:
-            headers = {}
-            if self.api_key:
-                headers["Authorization"] = self.api_key
-            self.session = aiohttp.ClientSession(headers=headers)
+        pages = await asyncio.gather(*(
+            fetch_bounded(offset)
+            for offset in range(self.batch_size, total, self.batch_size)
+        ))
+        
+        result = list(first_page.get("result", []))
+        for page in pages:
+            result.extend(page.get("result", []))
+        result = self._of_type(resource_type, result)
+        
+        logger.info("hangar_resources_fetched", 
+                  result_count=len(result),
+                  total=total,
+                  type=resource_type)
+        return {
+            "pagination": {"limit": len(result), "offset": 0, "count": total},
+            "result": result
+        }
     
-    async def _close_session(self) -> None:
-        """Close aiohttp session if it exists"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+    async def _iter_pages(self, resource_type: str) -> AsyncIterator[List[Dict]]:
+        """
+        Fetch the project pages of a specific type in order
+        
+        After the first page, up to ``page_concurrency`` pages are requested
+        ahead of the consumer.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Yields:
+            Projects of each page
+        """
+        first_page = await self._fetch_page(resource_type, 0)
+        total = first_page.get("pagination", {}).get("count", 0)
+        yield self._of_type(resource_type, first_page.get("result", []))
+        
+        async def fetch_result(offset: int) -> List[Dict]:
+            page = await self._fetch_page(resource_type, offset)
+            return page.get("result", [])
+        
+        async with aclosing(self._iter_offset_pages(fetch_result, range(self.batch_size, total, self.batch_size),
+                                                    self.page_concurrency)) as pages:
+            async for result in pages:
+                yield self._of_type(resource_type, result)
     
     async def fetch_resources(self) -> Dict:
         """
-        Fetch resources from Hangar
+        Fetch resources from Hangar for all configured resource types
         
         Returns:
-            Dict containing fetched resources
+            Dict containing fetched resources by type
             
         Raises:
             ClientError: If the request fails
@@ -52,30 +199,12 @@ class HangarClient(BaseClient):
         try:
             await self._ensure_session()
             
-            # Fetch popular plugins
-            url = f"{self.BASE_URL}/projects"
-            params = {
-                "limit": 100,
-                "offset": 0,
-                "sort": "-downloads"
-            }
+            # Get configured resource types
+            resource_types = self.config["platforms"]["hangar"]["resource_types"]
             
-            logger.info("fetching_hangar_resources", url=url)
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error("hangar_request_failed", 
-                               status=response.status, 
-                               error=error_text)
-                    raise ClientError(f"Hangar API request failed: {error_text}")
-                
-                data = await response.json()
-                result = data.get("result", [])
-                logger.info("hangar_resources_fetched", 
-                          result_count=len(result))
-                
-                # 只回傳資源列表部分，並加上 plugin 類型
-                return {"plugin": {"result": result}}
+            # Fetch all types concurrently; failed types are skipped
+            return await self._fetch_types(resource_types, self._fetch_by_type,
+                                           self.type_concurrency)
                 
         except aiohttp.ClientError as e:
             logger.error("hangar_request_error", error=str(e))
@@ -84,4 +213,120 @@ class HangarClient(BaseClient):
             logger.error("hangar_unexpected_error", error=str(e))
             raise ClientError(f"Unexpected error in Hangar client: {str(e)}")
         finally:
-            await self._close_session() 
\ No newline at end of file
+            await self._close_session()
+    
+    async def stream_pages(self) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Fetch resources from Hangar page by page
+        
+        Types are fetched concurrently like in ``fetch_resources``; pages are
+        handed over as they arrive. A failing type is logged and skipped.
+        
+        Yields:
+            Tuples of (resource type, projects of one page)
+        """
+        resource_types = self.config["platforms"]["hangar"]["resource_types"]
+        async with aclosing(self._stream_types(resource_types, self._iter_pages, self.type_concurrency,
+                                               queue_depth=self.page_concurrency)) as pages:
+            async for entry in pages:
+                yield entry
+    
+    async def plan_ranges(self, resource_type: str, shard_size: int) -> List[Tuple[int, Optional[int]]]:
+        """
+        Split a resource type into offset ranges
+        
+        Args:
+            resource_type: Type of resource to split
+            shard_size: Preferred number of projects per range
+            
+        Returns:
+            List of (start, end) offsets
+            
+        Raises:
+            ClientError: If the first project page cannot be fetched
+        """
+        try:
+            await self._ensure_session()
+            first_page = await self._fetch_page(resource_type, 0)
+        except aiohttp.ClientError as e:
+            raise ClientError(f"Hangar API request error: {str(e)}")
+        finally:
+            await self._close_session()
+        
+        total = first_page.get("pagination", {}).get("count", 0)
+        return self._split_ranges(total, self.batch_size, shard_size)
+    
+    async def fetch_range(self, resource_type: str, start: int, end: Optional[int]) -> List[Dict]:
+        """
+        Fetch the projects of one offset range
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Offset of the first project, a multiple of the page size
+            end: Offset past the last project, until the listing ends when None
+            
+        Returns:
+            Projects of the range in listing order
+            
+        Raises:
+            ClientError: If a page request fails
+        """
+        async def fetch_result(offset: int) -> List[Dict]:
+            page = await self._fetch_page(resource_type, offset)
+            return page.get("result", [])
+        
+        try:
+            await self._ensure_session()
+            if end is None:
+                first_page = await self._fetch_page(resource_type, 0)
+                end = first_page.get("pagination", {}).get("count", 0)
+            result = await self._fetch_offsets(fetch_result, range(start, end, self.batch_size),
+                                               self.page_concurrency)
+            return self._of_type(resource_type, result[:end - start])
+        except aiohttp.ClientError as e:
+            logger.error("hangar_request_error", error=str(e))
+            raise ClientError(f"Hangar API request error: {str(e)}")
+        finally:
+            await self._close_session()
+    
+    async def fetch_updates(self, is_unchanged: Callable[[str, Dict], bool]) -> Dict:
+        """
+        Fetch the projects updated since the previous snapshot
+        
+        Each type is listed by last update and paged until a project matches
+        the previous snapshot.
+        
+        Args:
+            is_unchanged: Check telling whether a project matches the previous snapshot
+            
+        Returns:
+            Dict containing the changed projects by type
+            
+        Raises:
+            ClientError: If the request fails
+        """
+        async def fetch_type(resource_type: str) -> Dict:
+            async def fetch_page(offset: int) -> List[Dict]:
+                data = await self._fetch_page(resource_type, offset, sort="-updated")
+                return data.get("result", [])
+            
+            result = await self._page_until_unchanged(resource_type, fetch_page, self.batch_size,
+                                                      self.MAX_INCREMENTAL_RESULTS, is_unchanged)
+            result = self._of_type(resource_type, result)
+            return {
+                "pagination": {"limit": len(result), "offset": 0, "count": len(result)},
+                "result": result
+            }
+        
+        try:
+            await self._ensure_session()
+            resource_types = self.config["platforms"]["hangar"]["resource_types"]
+            return await self._fetch_types(resource_types, fetch_type, self.type_concurrency)
+        except aiohttp.ClientError as e:
+            logger.error("hangar_request_error", error=str(e))
+            raise ClientError(f"Hangar API request error: {str(e)}")
+        except Exception as e:
+            logger.error("hangar_unexpected_error", error=str(e))
+            raise ClientError(f"Unexpected error in Hangar client: {str(e)}")
+        finally:
+            await self._close_session()
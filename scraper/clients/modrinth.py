@@ -4,12 +4,15 @@ Modrinth API client implementation
 For API documentation, see: https://docs.modrinth.com/api/
 """
 
-from typing import Dict, Optional, List
-import json
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Optional, List, Tuple
+import asyncio
 import aiohttp
 import structlog
 from .client_factory import BaseClient, ClientError
 from scraper.config import get_config
+from scraper.utils import codec
+from scraper.utils.http import HTTPSessionManager
 
 logger = structlog.get_logger(__name__)
 
@@ -17,72 +20,281 @@ class ModrinthClient(BaseClient):
     """Client for interacting with the Modrinth API"""
     
     platform = "modrinth"
+    supports_incremental = True
+    supports_streaming = True
+    supports_sharding = True
+    raw_items_key = "hits"
     BASE_URL = "https://api.modrinth.com/v2"
     USER_AGENT = "mc-top-list/1.0.0 (github.com/dubi/mc-top-list)"
     BATCH_SIZE = 100  # Maximum number of resources to fetch per request
+    DEFAULT_MAX_RESULTS = 100  # Search depth per type when not configured
+    DEFAULT_PAGE_CONCURRENCY = 4  # Concurrent page requests per type
+    DEFAULT_ENRICH_BATCH_SIZE = 200  # Project IDs per /projects request, bounded by URL length
     
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    def __init__(self, api_key: Optional[str] = None,
+                 session_manager: Optional[HTTPSessionManager] = None) -> None:
         """
         Initialize the Modrinth client
         
         Args:
             api_key: Optional API key for authenticated requests
+            session_manager: Shared HTTP session manager
         """
-        self.api_key = api_key
-        self.session: Optional[aiohttp.ClientSession] = None
+        super().__init__(api_key=api_key, session_manager=session_manager)
         self.config = get_config()
+        platform_config = self.config["platforms"]["modrinth"]
+        self.base_url = platform_config.get("api_url", self.BASE_URL)
+        self.max_results = platform_config.get("max_results", {})
+        self.page_concurrency = platform_config.get("page_concurrency", self.DEFAULT_PAGE_CONCURRENCY)
+        self.type_concurrency = platform_config.get("type_concurrency")
+        self.enrich = platform_config.get("enrich", False)
+        self.enrich_batch_size = platform_config.get("enrich_batch_size", self.DEFAULT_ENRICH_BATCH_SIZE)
+        self.enrich_concurrency = platform_config.get("enrich_concurrency", self.page_concurrency)
         
-    async def _ensure_session(self) -> None:
-        """Ensure aiohttp session exists"""
-        if not self.session:
-            headers = {
-                "User-Agent": self.USER_AGENT
-            }
-            if self.api_key:
-                headers["Authorization"] = self.api_key
-            self.session = aiohttp.ClientSession(headers=headers)
-    
-    async def _close_session(self) -> None:
-        """Close aiohttp session if it exists"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+    def _build_headers(self) -> Dict[str, str]:
+        """Build request headers"""
+        headers = {
+            "User-Agent": self.USER_AGENT
+        }
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        return headers
 
-    async def _fetch_by_type(self, resource_type: str) -> Dict:
+    def _get_max_results(self, resource_type: str) -> int:
+        """
+        Get the configured search depth for a resource type
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Returns:
+            Maximum number of hits to fetch for the type
         """
-        Fetch resources of a specific type
+        default = self.max_results.get("default", self.DEFAULT_MAX_RESULTS)
+        return self.max_results.get(resource_type, default)
+
+    async def _fetch_page(self, resource_type: str, offset: int, index: str = "downloads") -> Dict:
+        """
+        Fetch a single search page of a specific type, reusing the run's checkpoint
         
         Args:
             resource_type: Type of resource to fetch
+            offset: Offset of the first hit in the page
+            index: Search index to sort by
             
         Returns:
-            Dict containing fetched resources
+            Dict containing the search response
         """
-        url = f"{self.BASE_URL}/search"
+        return await self._checkpointed(f"{resource_type}_{index}_{offset}",
+                                        lambda: self._request_page(resource_type, offset, index))
+
+    async def _request_page(self, resource_type: str, offset: int, index: str = "downloads") -> Dict:
+        """
+        Fetch a single search page of a specific type
+        
+        Args:
+            resource_type: Type of resource to fetch
+            offset: Offset of the first hit in the page
+            index: Search index to sort by
+            
+        Returns:
+            Dict containing the search response
+            
+        Raises:
+            ClientError: If the request fails
+        """
+        url = f"{self.base_url}/search"
         params = {
             "limit": self.BATCH_SIZE,
-            "offset": 0,
-            "index": "downloads",  # Sort by downloads
-            "facets": json.dumps([["project_type:" + resource_type]]),
-            "sort": "downloads"  # Sort by downloads
+            "offset": offset,
+            "index": index,
+            "facets": codec.dumps([["project_type:" + resource_type]]).decode(),
+            "sort": index
         }
         
         logger.info("fetching_modrinth_resources", url=url, params=params, type=resource_type)
-        async with self.session.get(url, params=params) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error("modrinth_request_failed", 
-                           status=response.status, 
-                           error=error_text,
-                           type=resource_type)
-                raise ClientError(f"Modrinth API request failed: {error_text}")
-            
-            data = await response.json()
-            logger.info("modrinth_resources_fetched", 
-                      hit_count=len(data.get("hits", [])),
-                      total_hits=data.get("total_hits", 0),
-                      type=resource_type)
-            return data
+        response = await self._fetch("GET", url, params=params)
+        if response.status != 200:
+            error_text = response.text()
+            logger.error("modrinth_request_failed", 
+                       status=response.status, 
+                       error=error_text,
+                       type=resource_type,
+                       offset=offset)
+            raise ClientError(f"Modrinth API request failed: {error_text}")
+        
+        data = response.json()
+        logger.info("modrinth_resources_fetched", 
+                  hit_count=len(data.get("hits", [])),
+                  total_hits=data.get("total_hits", 0),
+                  type=resource_type,
+                  offset=offset)
+        return data
+
+    async def _fetch_by_type(self, resource_type: str) -> Dict:
+        """
+        Fetch resources of a specific type, paginating up to the configured depth
+        
+        The first page tells us ``total_hits``; the remaining offsets are then
+        requested concurrently, bounded by ``page_concurrency``.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Returns:
+            Dict containing fetched resources, with the hits of all pages in order
+            
+        Raises:
+            ClientError: If any page request fails
+        """
+        first_page = await self._fetch_page(resource_type, 0)
+        target = min(first_page.get("total_hits", 0), self._get_max_results(resource_type))
+        
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+        
+        async def fetch_bounded(offset: int) -> Dict:
+            async with semaphore:
+                return await self._fetch_page(resource_type, offset)
+        
+        pages = await asyncio.gather(*(
+            fetch_bounded(offset)
+            for offset in range(self.BATCH_SIZE, target, self.BATCH_SIZE)
+        ))
+        
+        hits = list(first_page.get("hits", []))
+        for page in pages:
+            hits.extend(page.get("hits", []))
+        if target:
+            # The last page may run past the configured depth
+            hits = hits[:target]
+        
+        return {
+            **first_page,
+            "hits": hits,
+            "offset": 0,
+            "limit": len(hits)
+        }
+
+    async def _iter_pages(self, resource_type: str) -> AsyncIterator[List[Dict]]:
+        """
+        Fetch the search pages of a specific type in order, up to the configured depth
+        
+        After the first page, up to ``page_concurrency`` pages are requested
+        ahead of the consumer. Pages are enriched one at a time when
+        enrichment is enabled.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Yields:
+            Hits of each page
+        """
+        first_page = await self._fetch_page(resource_type, 0)
+        target = min(first_page.get("total_hits", 0), self._get_max_results(resource_type))
+        
+        async def fetch_hits(offset: int) -> List[Dict]:
+            page = await self._fetch_page(resource_type, offset)
+            # The last page may run past the configured depth
+            return page.get("hits", [])[:target - offset]
+        
+        first_hits = first_page.get("hits", [])
+        pages = self._iter_offset_pages(fetch_hits, range(self.BATCH_SIZE, target, self.BATCH_SIZE),
+                                        self.page_concurrency)
+        async with aclosing(pages):
+            hits = first_hits[:target] if target else first_hits
+            while hits is not None:
+                if self.enrich:
+                    await self._enrich_hits({resource_type: {"hits": hits}})
+                yield hits
+                hits = await anext(pages, None)
+
+    async def _fetch_projects(self, project_ids: List[str]) -> List[Dict]:
+        """
+        Fetch full project objects in a single request
+        
+        Args:
+            project_ids: IDs of the projects to fetch
+            
+        Returns:
+            List of project objects; unknown IDs are omitted by the API
+            
+        Raises:
+            ClientError: If the request fails
+        """
+        url = f"{self.base_url}/projects"
+        params = {"ids": codec.dumps(project_ids).decode()}
+        
+        response = await self._fetch("GET", url, params=params)
+        if response.status != 200:
+            error_text = response.text()
+            logger.error("modrinth_projects_request_failed",
+                       status=response.status,
+                       error=error_text,
+                       project_count=len(project_ids))
+            raise ClientError(f"Modrinth API request failed: {error_text}")
+        return response.json()
+
+    async def _enrich_hits(self, all_resources: Dict[str, Dict]) -> None:
+        """
+        Attach project details the search endpoint does not return
+        
+        Project IDs of all types are deduplicated and fetched in chunks of
+        ``enrich_batch_size`` through ``/projects``, bounded by
+        ``enrich_concurrency``. Each hit gets an ``enrichment`` dict with its
+        followers, game versions, loaders and gallery count. Hits of failed
+        chunks are left as they are.
+        
+        Args:
+            all_resources: Fetched search results by type, updated in place
+        """
+        project_ids = list(dict.fromkeys(
+            hit["project_id"]
+            for data in all_resources.values()
+            for hit in data.get("hits", [])
+            if "project_id" in hit
+        ))
+        if not project_ids:
+            return
+        
+        chunks = [
+            project_ids[start:start + self.enrich_batch_size]
+            for start in range(0, len(project_ids), self.enrich_batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.enrich_concurrency)
+        
+        async def fetch_bounded(chunk: List[str]) -> List[Dict]:
+            async with semaphore:
+                return await self._fetch_projects(chunk)
+        
+        results = await asyncio.gather(*(fetch_bounded(chunk) for chunk in chunks),
+                                       return_exceptions=True)
+        
+        projects: Dict[str, Dict] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.warning("modrinth_enrichment_failed",
+                             project_count=len(chunk),
+                             error=str(result))
+                continue
+            for project in result:
+                projects[project["id"]] = project
+        
+        for data in all_resources.values():
+            for hit in data.get("hits", []):
+                project = projects.get(hit.get("project_id"))
+                if project is None:
+                    continue
+                hit["enrichment"] = {
+                    "followers": project.get("followers", 0),
+                    "game_versions": project.get("game_versions", []),
+                    "loaders": project.get("loaders", []),
+                    "gallery_count": len(project.get("gallery") or [])
+                }
+        
+        logger.info("modrinth_resources_enriched",
+                   project_count=len(project_ids),
+                   enriched_count=len(projects),
+                   request_count=len(chunks))
 
     async def fetch_resources(self) -> Dict:
         """
@@ -100,22 +312,17 @@ class ModrinthClient(BaseClient):
             # Get configured resource types
             resource_types = self.config["platforms"]["modrinth"]["resource_types"]
             
-            # Fetch resources for each type
-            all_resources = {}
-            
-            for resource_type in resource_types:
-                try:
-                    data = await self._fetch_by_type(resource_type)
-                    all_resources[resource_type] = data
-                    logger.info("modrinth_type_fetched",
-                               type=resource_type,
-                               hit_count=len(data.get("hits", [])),
-                               total_hits=data.get("total_hits", 0))
-                except Exception as e:
-                    logger.error("modrinth_type_fetch_failed", 
-                               type=resource_type,
-                               error=str(e))
-                    continue
+            # Fetch all types concurrently; failed types are skipped
+            all_resources = await self._fetch_types(resource_types, self._fetch_by_type,
+                                                    self.type_concurrency)
+            if self.enrich:
+                await self._enrich_hits(all_resources)
+            
+            for resource_type, data in all_resources.items():
+                logger.info("modrinth_type_fetched",
+                           type=resource_type,
+                           hit_count=len(data.get("hits", [])),
+                           total_hits=data.get("total_hits", 0))
             
             return all_resources
             
@@ -126,4 +333,122 @@ class ModrinthClient(BaseClient):
             logger.error("modrinth_unexpected_error", error=str(e))
             raise ClientError(f"Unexpected error in Modrinth client: {str(e)}")
         finally:
-            await self._close_session() 
\ No newline at end of file
+            await self._close_session()
+    
+    async def stream_pages(self) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Fetch resources from Modrinth page by page
+        
+        Types are fetched concurrently like in ``fetch_resources``; pages are
+        handed over as they arrive. A failing type is logged and skipped.
+        
+        Yields:
+            Tuples of (resource type, hits of one page)
+        """
+        resource_types = self.config["platforms"]["modrinth"]["resource_types"]
+        async with aclosing(self._stream_types(resource_types, self._iter_pages, self.type_concurrency,
+                                               queue_depth=self.page_concurrency)) as pages:
+            async for entry in pages:
+                yield entry
+    
+    async def plan_ranges(self, resource_type: str, shard_size: int) -> List[Tuple[int, Optional[int]]]:
+        """
+        Split a resource type into offset ranges up to the configured depth
+        
+        Args:
+            resource_type: Type of resource to split
+            shard_size: Preferred number of hits per range
+            
+        Returns:
+            List of (start, end) offsets
+            
+        Raises:
+            ClientError: If the first search page cannot be fetched
+        """
+        try:
+            await self._ensure_session()
+            first_page = await self._fetch_page(resource_type, 0)
+        except aiohttp.ClientError as e:
+            raise ClientError(f"Modrinth API request error: {str(e)}")
+        finally:
+            await self._close_session()
+        
+        target = min(first_page.get("total_hits", 0), self._get_max_results(resource_type))
+        return self._split_ranges(target, self.BATCH_SIZE, shard_size)
+    
+    async def fetch_range(self, resource_type: str, start: int, end: Optional[int]) -> List[Dict]:
+        """
+        Fetch and enrich the search hits of one offset range
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Offset of the first hit, a multiple of the page size
+            end: Offset past the last hit
+            
+        Returns:
+            Hits of the range in search order
+            
+        Raises:
+            ClientError: If a page request fails
+        """
+        if end is None:
+            end = self._get_max_results(resource_type)
+        
+        async def fetch_hits(offset: int) -> List[Dict]:
+            page = await self._fetch_page(resource_type, offset)
+            return page.get("hits", [])
+        
+        try:
+            await self._ensure_session()
+            hits = await self._fetch_offsets(fetch_hits, range(start, end, self.BATCH_SIZE),
+                                             self.page_concurrency)
+            hits = hits[:end - start]
+            if self.enrich:
+                await self._enrich_hits({resource_type: {"hits": hits}})
+            return hits
+        except aiohttp.ClientError as e:
+            logger.error("modrinth_request_error", error=str(e))
+            raise ClientError(f"Modrinth API request error: {str(e)}")
+        finally:
+            await self._close_session()
+    
+    async def fetch_updates(self, is_unchanged: Callable[[str, Dict], bool]) -> Dict:
+        """
+        Fetch the projects updated since the previous snapshot
+        
+        Each type is searched by last update and paged until a hit matches
+        the previous snapshot.
+        
+        Args:
+            is_unchanged: Check telling whether a hit matches the previous snapshot
+            
+        Returns:
+            Dict containing the changed hits by type
+            
+        Raises:
+            ClientError: If the request fails
+        """
+        async def fetch_type(resource_type: str) -> Dict:
+            async def fetch_page(offset: int) -> List[Dict]:
+                data = await self._fetch_page(resource_type, offset, index="updated")
+                return data.get("hits", [])
+            
+            hits = await self._page_until_unchanged(resource_type, fetch_page, self.BATCH_SIZE,
+                                                    self._get_max_results(resource_type), is_unchanged)
+            return {"hits": hits, "offset": 0, "limit": len(hits), "total_hits": len(hits)}
+        
+        try:
+            await self._ensure_session()
+            resource_types = self.config["platforms"]["modrinth"]["resource_types"]
+            updates = await self._fetch_types(resource_types, fetch_type, self.type_concurrency)
+            if self.enrich:
+                await self._enrich_hits(updates)
+            return updates
+        except aiohttp.ClientError as e:
+            logger.error("modrinth_request_error", error=str(e))
+            raise ClientError(f"Modrinth API request error: {str(e)}")
+        except Exception as e:
+            logger.error("modrinth_unexpected_error", error=str(e))
+            raise ClientError(f"Unexpected error in Modrinth client: {str(e)}")
+        finally:
+            await self._close_session()
@@ -4,11 +4,14 @@ Polymart API client implementation
 For API documentation, see: https://polymart.org/wiki/api
 """
 
-from typing import Dict, Optional, List
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Optional, List, Tuple
+import asyncio
 import aiohttp
 import structlog
 from .client_factory import BaseClient, ClientError
 from scraper.config import get_config
+from scraper.utils.http import HTTPSessionManager
 
 logger = structlog.get_logger(__name__)
 
@@ -16,44 +19,51 @@ class PolymartClient(BaseClient):
     """Client for interacting with the Polymart API"""
     
     platform = "polymart"
+    supports_streaming = True
+    supports_sharding = True
     USER_AGENT = "mc-top-list/1.0 (https://github.com/dqbd/mc-top-list)"
     
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    # Map our resource types to Polymart's search types
+    TYPE_MAP = {
+        "plugin": "Plugins",
+        "mod": "Mods",
+        "resourcepack": "Resource Packs",
+        "datapack": "Data Packs",
+        "pluginpack": "Setups"
+    }
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 session_manager: Optional[HTTPSessionManager] = None) -> None:
         """
         Initialize the Polymart client
         
         Args:
             api_key: Optional API key for authenticated requests
+            session_manager: Shared HTTP session manager
         """
-        self.api_key = api_key
-        self.session: Optional[aiohttp.ClientSession] = None
+        super().__init__(api_key=api_key, session_manager=session_manager)
         self.config = get_config()
         self.base_url = self.config["platforms"]["polymart"]["api_url"]
         self.batch_size = self.config["platforms"]["polymart"]["batch_size"]
+        self.type_concurrency = self.config["platforms"]["polymart"].get("type_concurrency")
+        self.prefetch_pages = self.config["platforms"]["polymart"].get("prefetch_pages", 1)
     
-    async def _ensure_session(self) -> None:
-        """Ensure aiohttp session exists"""
-        if not self.session:
-            headers = {
-                "User-Agent": self.USER_AGENT,
-                "accept": "*/*",
-                "accept-language": "en-US,en;q=0.9",
-                "content-type": "application/json",
-                "origin": "https://polymart.org",
-                "referer": "https://polymart.org/",
-                "sec-fetch-dest": "empty",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-site": "same-site"
-            }
-            if self.api_key:
-                headers["Authorization"] = self.api_key
-            self.session = aiohttp.ClientSession(headers=headers)
-    
-    async def _close_session(self) -> None:
-        """Close aiohttp session if it exists"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+    def _build_headers(self) -> Dict[str, str]:
+        """Build request headers"""
+        headers = {
+            "User-Agent": self.USER_AGENT,
+            "accept": "*/*",
+            "accept-language": "en-US,en;q=0.9",
+            "content-type": "application/json",
+            "origin": "https://polymart.org",
+            "referer": "https://polymart.org/",
+            "sec-fetch-dest": "empty",
+            "sec-fetch-mode": "cors",
+            "sec-fetch-site": "same-site"
+        }
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        return headers
 
     async def _fetch_by_type(self, resource_type: str) -> Dict:
         """
@@ -90,30 +100,30 @@ class PolymartClient(BaseClient):
         
         try:
             logger.info("fetching_polymart_resources", url=url, params=params, type=resource_type)
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error("polymart_request_failed", 
-                               status=response.status, 
-                               error=error_text,
-                               type=resource_type)
-                    raise ClientError(f"Polymart API request failed: {error_text}")
-                
-                data = await response.json()
-                if not data.get("success", False):
-                    error = data.get("error", {}).get("message", "Unknown error")
-                    logger.error("polymart_api_error", error=error, type=resource_type)
-                    raise ClientError(f"Polymart API error: {error}")
-                
-                resources = data.get("response", {}).get("resources", [])
-                logger.info("polymart_resources_fetched", 
-                          resource_count=len(resources),
-                          type=resource_type)
-                return {
-                    "resources": resources,
-                    "total": data.get("response", {}).get("total", 0)
-                }
-                
+            response = await self._fetch("GET", url, params=params)
+            if response.status != 200:
+                error_text = response.text()
+                logger.error("polymart_request_failed", 
+                           status=response.status, 
+                           error=error_text,
+                           type=resource_type)
+                raise ClientError(f"Polymart API request failed: {error_text}")
+            
+            data = response.json()
+            if not data.get("success", False):
+                error = data.get("error", {}).get("message", "Unknown error")
+                logger.error("polymart_api_error", error=error, type=resource_type)
+                raise ClientError(f"Polymart API error: {error}")
+            
+            resources = data.get("response", {}).get("resources", [])
+            logger.info("polymart_resources_fetched", 
+                      resource_count=len(resources),
+                      type=resource_type)
+            return {
+                "resources": resources,
+                "total": data.get("response", {}).get("total", 0)
+            }
+            
         except aiohttp.ClientError as e:
             logger.error("polymart_request_error", error=str(e), type=resource_type)
             raise ClientError(f"Polymart API request error: {str(e)}")
@@ -121,6 +131,140 @@ class PolymartClient(BaseClient):
             logger.error("polymart_unexpected_error", error=str(e), type=resource_type)
             raise ClientError(f"Unexpected error in Polymart client: {str(e)}")
 
+    async def _search_page(self, resource_type: str, start: int) -> List[Dict]:
+        """
+        Fetch a single search page of a specific type, reusing the run's checkpoint
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Offset of the first resource in the page
+            
+        Returns:
+            Resources of the page
+        """
+        return await self._checkpointed(f"{resource_type}_{start}",
+                                        lambda: self._request_page(resource_type, start))
+
+    async def _request_page(self, resource_type: str, start: int) -> List[Dict]:
+        """
+        Fetch a single search page of a specific type
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Offset of the first resource in the page
+            
+        Returns:
+            List of resources in the page, empty when there are none
+            
+        Raises:
+            ClientError: If the response is truncated or has no result list
+        """
+        payload = {
+            "premium": "-1",
+            "exclusive": "-1",
+            "type": self.TYPE_MAP.get(resource_type, "Plugins"),
+            "category": "All",
+            "ver": "",
+            "query": "",
+            "sort": "downloads",
+            "tier": None,
+            "seed": 869199770,
+            "payment_methods": None,
+            "max_price": None,
+            "server_software": None,
+            "start": start,
+            "limit": self.batch_size,
+            "stringify": "0"
+        }
+        
+        url = f"{self.base_url}/search"
+        logger.info("fetching_polymart_resources", 
+                   url=url,
+                   payload=payload,
+                   type=resource_type)
+        
+        # Decode the result list incrementally instead of buffering the whole body
+        try:
+            resources = [
+                resource async for resource in self._stream("POST", url, ("response", "result"), json=payload)
+            ]
+        except ValueError as e:
+            # 解析失敗不能當成最後一頁，否則會默默截斷該類型並寫入檢查點
+            logger.error("polymart_parse_error",
+                        type=resource_type,
+                        start=start,
+                        error=str(e))
+            raise ClientError(f"Malformed Polymart search response: {str(e)}")
+        if not resources:
+            logger.warning("no_resources_found",
+                         type=resource_type,
+                         start=start)
+        return resources
+
+    async def _iter_pages(self, resource_type: str) -> AsyncIterator[List[Dict]]:
+        """
+        Fetch the search pages of a specific type in order
+        
+        Keeps ``prefetch_pages`` requests in flight ahead of the last completed
+        page. Pages are yielded in download order; once a short page marks the
+        end, the speculative requests past it are cancelled.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Yields:
+            Resources of each page
+        """
+        pending: Dict[int, asyncio.Task] = {}
+        next_page = 0
+        current_page = 0
+        
+        try:
+            while True:
+                # Top up the prefetch window
+                while len(pending) < self.prefetch_pages:
+                    pending[next_page] = asyncio.create_task(
+                        self._search_page(resource_type, next_page * self.batch_size)
+                    )
+                    next_page += 1
+                
+                resources = await pending.pop(current_page)
+                yield resources
+                
+                # Check if we've reached the last page
+                if len(resources) < self.batch_size:
+                    break
+                    
+                current_page += 1
+        finally:
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+            if pending:
+                logger.info("polymart_prefetch_cancelled",
+                           type=resource_type,
+                           page_count=len(pending))
+
+    async def _search_by_type(self, resource_type: str) -> Dict:
+        """
+        Fetch all search pages of a specific type
+        
+        Args:
+            resource_type: Type of resource to fetch
+            
+        Returns:
+            Dict containing the resources of the type and their count
+        """
+        resources_for_type = []
+        async with aclosing(self._iter_pages(resource_type)) as pages:
+            async for resources in pages:
+                resources_for_type.extend(resources)
+        
+        return {
+            "result": resources_for_type,
+            "total": len(resources_for_type)
+        }
+
     async def fetch_resources(self) -> Dict:
         """
         Fetch resources from Polymart API.
@@ -133,70 +277,10 @@ class PolymartClient(BaseClient):
             
             # Get configured resource types
             resource_types = self.config["platforms"]["polymart"]["resource_types"]
-            all_resources = {}
-            
-            # Map our resource types to Polymart's types
-            type_map = {
-                "plugin": "Plugins",
-                "mod": "Mods",
-                "resourcepack": "Resource Packs",
-                "datapack": "Data Packs",
-                "pluginpack": "Setups"
-            }
             
-            for resource_type in resource_types:
-                start = 0
-                resources_for_type = []
-                
-                while True:
-                    payload = {
-                        "premium": "-1",
-                        "exclusive": "-1",
-                        "type": type_map.get(resource_type, "Plugins"),
-                        "category": "All",
-                        "ver": "",
-                        "query": "",
-                        "sort": "downloads",
-                        "tier": None,
-                        "seed": 869199770,
-                        "payment_methods": None,
-                        "max_price": None,
-                        "server_software": None,
-                        "start": start,
-                        "limit": self.batch_size,
-                        "stringify": "0"
-                    }
-                    
-                    url = f"{self.base_url}/search"
-                    logger.info("fetching_polymart_resources", 
-                               url=url,
-                               payload=payload,
-                               type=resource_type)
-                    
-                    async with self.session.post(url, json=payload) as response:
-                        data = await response.json()
-                        if not data.get("response", {}).get("result"):
-                            logger.warning("no_resources_found",
-                                         type=resource_type,
-                                         response=data)
-                            break
-                            
-                        resources = data.get("response", {}).get("result", [])
-                        resources_for_type.extend(resources)
-                        
-                        # Check if we've reached the last page
-                        if len(resources) < self.batch_size:
-                            break
-                            
-                        start += self.batch_size
-                
-                # Store resources for this type
-                all_resources[resource_type] = {
-                    "result": resources_for_type,
-                    "total": len(resources_for_type)
-                }
-            
-            return all_resources
+            # Fetch all types concurrently; failed types are skipped
+            return await self._fetch_types(resource_types, self._search_by_type,
+                                           self.type_concurrency)
             
         except Exception as e:
             logger.error("polymart_fetch_failed", error=str(e))
@@ -204,6 +288,53 @@ class PolymartClient(BaseClient):
         finally:
             await self._close_session()
 
+    async def fetch_range(self, resource_type: str, start: int, end: Optional[int]) -> List[Dict]:
+        """
+        Fetch every resource of a type as one work unit
+        
+        Polymart search responses are only decoded item by item, so the
+        listing size is not known up front and a type is never split.
+        
+        Args:
+            resource_type: Type of resource to fetch
+            start: Must be 0
+            end: Must be None
+            
+        Returns:
+            Resources of the type in search order
+            
+        Raises:
+            ClientError: If the range does not cover the whole type or fetching fails
+        """
+        if start or end is not None:
+            raise ClientError("Polymart work units must cover a whole resource type")
+        try:
+            await self._ensure_session()
+            return (await self._search_by_type(resource_type))["result"]
+        except aiohttp.ClientError as e:
+            logger.error("polymart_fetch_failed", error=str(e))
+            raise ClientError(f"Failed to fetch Polymart resources: {str(e)}")
+        finally:
+            await self._close_session()
+
+    async def stream_pages(self) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Fetch resources from Polymart page by page
+        
+        Types are fetched concurrently like in ``fetch_resources``, but pages
+        are handed over through a bounded queue as they arrive, so a run
+        never holds more than the prefetch window of every type. A failing
+        type is logged and skipped.
+        
+        Yields:
+            Tuples of (resource type, raw resources of one page)
+        """
+        resource_types = self.config["platforms"]["polymart"]["resource_types"]
+        async with aclosing(self._stream_types(resource_types, self._iter_pages, self.type_concurrency,
+                                               queue_depth=self.prefetch_pages)) as pages:
+            async for entry in pages:
+                yield entry
+
     async def fetch_resources_by_type(self) -> Dict:
         """
         Fetch resources from Polymart for all configured resource types
@@ -220,21 +351,14 @@ class PolymartClient(BaseClient):
             # Get configured resource types
             resource_types = self.config["platforms"]["polymart"]["resource_types"]
             
-            # Fetch resources for each type
-            all_resources = {}
-            
-            for resource_type in resource_types:
-                try:
-                    data = await self._fetch_by_type(resource_type)
-                    all_resources[resource_type] = data
-                    logger.info("polymart_type_fetched",
-                               type=resource_type,
-                               resource_count=len(data.get("resources", [])))
-                except Exception as e:
-                    logger.error("polymart_type_fetch_failed", 
-                               type=resource_type,
-                               error=str(e))
-                    continue
+            # Fetch all types concurrently; failed types are skipped
+            all_resources = await self._fetch_types(resource_types, self._fetch_by_type,
+                                                    self.type_concurrency)
+            
+            for resource_type, data in all_resources.items():
+                logger.info("polymart_type_fetched",
+                           type=resource_type,
+                           resource_count=len(data.get("resources", [])))
             
             return all_resources
             
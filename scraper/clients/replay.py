@@ -0,0 +1,81 @@
+"""
+Replay client serving a saved raw snapshot instead of a platform API
+"""
+
+from pathlib import Path
+from typing import ClassVar, Dict, Optional, Type
+import structlog
+from .client_factory import BaseClient
+from scraper.utils import codec
+from scraper.utils.http import HTTPSessionManager
+
+logger = structlog.get_logger(__name__)
+
+class ReplayClient(BaseClient):
+    """
+    Client reading ``data/raw/<timestamp>/*_raw.json`` files back
+    
+    Returns the same ``{type: payload}`` shape the platform client returned
+    when the snapshot was recorded, without touching the network.
+    """
+    
+    platform: ClassVar[str] = "replay"
+    snapshot_dir: ClassVar[Path]
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 session_manager: Optional[HTTPSessionManager] = None) -> None:
+        """
+        Initialize the replay client
+        
+        Args:
+            api_key: Unused, accepted for factory compatibility
+            session_manager: Unused, accepted for factory compatibility
+        """
+        self.api_key = api_key
+        self.session_manager = session_manager
+        self.session = None
+        self.failed_types: Dict[str, str] = {}
+    
+    @classmethod
+    def for_snapshot(cls, snapshot_dir: Path, platform: str) -> Type["ReplayClient"]:
+        """
+        Build a replay client class bound to a snapshot and platform
+        
+        Args:
+            snapshot_dir: Raw snapshot directory
+            platform: Platform whose files should be replayed
+            
+        Returns:
+            Client class that can be registered with ClientFactory
+        """
+        return type(f"{platform.title()}ReplayClient", (cls,), {
+            "platform": platform,
+            "snapshot_dir": snapshot_dir
+        })
+    
+    async def fetch_resources(self) -> Dict:
+        """
+        Load the platform's raw payloads from the snapshot
+        
+        Returns:
+            Dict containing the recorded resources by type, empty when the
+            snapshot has no data for the platform
+        """
+        all_resources = {}
+        prefix = f"{self.platform}_"
+        
+        for file_path in sorted(self.snapshot_dir.glob(f"{prefix}*_raw.json")):
+            resource_type = file_path.name[len(prefix):-len("_raw.json")]
+            all_resources[resource_type] = codec.read_json(file_path)
+        
+        single_file = self.snapshot_dir / f"{self.platform}_raw.json"
+        if not all_resources and single_file.exists():
+            return codec.read_json(single_file)
+        
+        if not all_resources:
+            logger.warning("replay_snapshot_missing", platform=self.platform,
+                          snapshot_dir=str(self.snapshot_dir))
+        
+        logger.info("replay_resources_loaded", platform=self.platform,
+                   types=list(all_resources))
+        return all_resources
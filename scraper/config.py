@@ -1,10 +1,18 @@
 """Configuration module."""
 
+import copy
+import functools
 import yaml
 from pathlib import Path
 
-def get_config():
-    """Get configuration from YAML file."""
+@functools.lru_cache(maxsize=1)
+def _load_config():
+    """Parse the YAML file once per process."""
     config_path = Path(__file__).parent / "config.yml"
     with open(config_path) as f:
-        return yaml.safe_load(f) 
\ No newline at end of file
+        return yaml.safe_load(f)
+
+def get_config():
+    """Get configuration from YAML file."""
+    # Callers may modify their copy
+    return copy.deepcopy(_load_config())
@@ -0,0 +1,354 @@
+"""
+Local mock of the platform APIs used by the clients
+
+Serves synthetic Modrinth ``/v2/search`` and ``/v2/projects``, Hangar
+``/api/v1/projects`` and Polymart ``/v1/search`` responses with configurable
+catalogue size, latency, error rate and rate limiting, so the fetch layer can
+be benchmarked offline. Point the clients at it through the platforms'
+``api_url`` settings in config.yml.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+from aiohttp import web
+
+from scraper.utils import codec
+
+logger = structlog.get_logger(__name__)
+
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+# Polymart search type names, mirroring PolymartClient.TYPE_MAP
+POLYMART_TYPES = {
+    "Plugins": "plugin",
+    "Mods": "mod",
+    "Resource Packs": "resourcepack",
+    "Data Packs": "datapack",
+    "Setups": "pluginpack"
+}
+
+@dataclass
+class MockSettings:
+    """
+    Behaviour of the mock server
+    
+    Attributes:
+        size: Number of resources per platform and resource type
+        latency: Base delay of every response in seconds
+        jitter: Extra random delay of up to this many seconds
+        error_rate: Fraction of requests answered with ``error_status``
+        error_status: Status code of injected errors
+        rate_limit: Requests allowed per ``rate_window``, unlimited when 0
+        rate_window: Length of the rate limit window in seconds
+        seed: Seed of the random generator driving jitter and errors
+    """
+    size: int = 1000
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit: int = 0
+    rate_window: float = 60.0
+    seed: int = 0
+
+@dataclass
+class MockStats:
+    """Counters of the requests served by the mock server"""
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    by_route: Dict[str, int] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the counters to a dict"""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "peak_in_flight": self.peak_in_flight,
+            "by_route": dict(self.by_route)
+        }
+
+class MockCatalogue:
+    """
+    Deterministic synthetic resources, generated on demand
+    
+    Resource ``index`` 0 is the most downloaded and most recently updated
+    one, so every sort order the clients use returns the same sequence and
+    nothing is kept in memory regardless of the catalogue size.
+    """
+    
+    def __init__(self, size: int) -> None:
+        """
+        Initialize the catalogue
+        
+        Args:
+            size: Number of resources per platform and resource type
+        """
+        self.size = size
+    
+    def _downloads(self, index: int) -> int:
+        """Download count of a resource"""
+        return (self.size - index) * 100
+    
+    def _updated(self, index: int) -> datetime:
+        """Last update time of a resource"""
+        return EPOCH + timedelta(hours=self.size - index)
+    
+    def page(self, offset: int, limit: int) -> range:
+        """
+        Get the indices of a page
+        
+        Args:
+            offset: Index of the first resource
+            limit: Maximum number of resources
+        
+        Returns:
+            Range of resource indices
+        """
+        offset = max(offset, 0)
+        return range(min(offset, self.size), min(offset + max(limit, 0), self.size))
+    
+    def modrinth_hit(self, resource_type: str, index: int) -> Dict[str, Any]:
+        """Build a Modrinth search hit"""
+        return {
+            "project_id": f"{resource_type}-{index:07d}",
+            "slug": f"mock-{resource_type}-{index}",
+            "title": f"Mock {resource_type} {index}",
+            "description": f"Synthetic {resource_type} number {index}",
+            "author": f"author{index % 97}",
+            "downloads": self._downloads(index),
+            "follows": index % 500,
+            "project_type": resource_type,
+            "date_created": EPOCH.isoformat(),
+            "date_modified": self._updated(index).isoformat(),
+            "versions": ["1.20.1", "1.21"],
+            "categories": ["utility"],
+            "license": "MIT",
+            "gallery": []
+        }
+    
+    def modrinth_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Build a Modrinth project for an ID handed out by ``modrinth_hit``"""
+        try:
+            index = int(project_id.rsplit("-", 1)[-1])
+        except ValueError:
+            return None
+        if not 0 <= index < self.size:
+            return None
+        return {
+            "id": project_id,
+            "followers": index % 500,
+            "game_versions": ["1.20", "1.20.1", "1.21"],
+            "loaders": ["fabric", "forge"],
+            "gallery": [{"url": f"https://example.invalid/{project_id}.png"}]
+        }
+    
+    def hangar_project(self, resource_type: str, index: int) -> Dict[str, Any]:
+        """Build a Hangar project"""
+        return {
+            "id": index,
+            "name": f"Mock{resource_type.title()}{index}",
+            "description": f"Synthetic {resource_type} number {index}",
+            "namespace": {"owner": f"owner{index % 97}"},
+            "stats": {"downloads": self._downloads(index), "stars": index % 50},
+            "createdAt": EPOCH.isoformat(),
+            "lastUpdated": self._updated(index).isoformat(),
+            "categories": ["admin_tools"],
+            "settings": {"tags": ["ADDON"] if resource_type == "addon" else []},
+            "licenseName": "MIT"
+        }
+    
+    def polymart_resource(self, resource_type: str, index: int) -> Dict[str, Any]:
+        """Build a Polymart search result"""
+        return {
+            "id": f"{index + 1}",
+            "title": f"Mock {resource_type} {index}",
+            "subtitle": f"Synthetic {resource_type} number {index}",
+            "owner": {"name": f"owner{index % 97}"},
+            "downloads": self._downloads(index),
+            "creationTime": int(EPOCH.timestamp()),
+            "lastUpdateTime": int(self._updated(index).timestamp()),
+            "version": "1.0.0",
+            "supportedServerSoftware": "Paper, Spigot"
+        }
+
+class MockPlatformServer:
+    """aiohttp application serving the mock platform APIs"""
+    
+    def __init__(self, settings: Optional[MockSettings] = None) -> None:
+        """
+        Initialize the server
+        
+        Args:
+            settings: Mock behaviour, defaults to ``MockSettings()``
+        """
+        self.settings = settings or MockSettings()
+        self.catalogue = MockCatalogue(self.settings.size)
+        self.stats = MockStats()
+        self._random = random.Random(self.settings.seed)
+        self._window_started = time.monotonic()
+        self._window_count = 0
+    
+    def create_app(self) -> web.Application:
+        """
+        Build the aiohttp application
+        
+        Returns:
+            Application with every mocked route
+        """
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/v2/search", self.modrinth_search)
+        app.router.add_get("/v2/projects", self.modrinth_projects)
+        app.router.add_get("/api/v1/projects", self.hangar_projects)
+        app.router.add_post("/v1/search", self.polymart_search)
+        app.router.add_get("/_stats", self.stats_handler)
+        return app
+    
+    def _rate_limit_headers(self) -> Optional[Dict[str, str]]:
+        """Count a request against the rate limit window and build its headers"""
+        if not self.settings.rate_limit:
+            return None
+        now = time.monotonic()
+        if now - self._window_started >= self.settings.rate_window:
+            self._window_started = now
+            self._window_count = 0
+        self._window_count += 1
+        reset = max(self.settings.rate_window - (now - self._window_started), 0.0)
+        return {
+            "X-Ratelimit-Limit": str(self.settings.rate_limit),
+            "X-Ratelimit-Remaining": str(max(self.settings.rate_limit - self._window_count, 0)),
+            "X-Ratelimit-Reset": f"{reset:.3f}"
+        }
+    
+    @web.middleware
+    async def _middleware(self, request: web.Request,
+                          handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> web.StreamResponse:
+        """Apply latency, error injection and rate limiting to every mocked route"""
+        if request.path == "/_stats":
+            return await handler(request)
+        
+        stats = self.stats
+        stats.requests += 1
+        stats.by_route[request.path] = stats.by_route.get(request.path, 0) + 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            delay = self.settings.latency + self._random.uniform(0, self.settings.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+            
+            headers = self._rate_limit_headers()
+            if headers is not None and self._window_count > self.settings.rate_limit:
+                stats.rate_limited += 1
+                return web.json_response({"error": "rate limited"}, status=429,
+                                         headers={**headers, "Retry-After": headers["X-Ratelimit-Reset"]})
+            
+            if self._random.random() < self.settings.error_rate:
+                stats.errors += 1
+                return web.json_response({"error": "injected failure"},
+                                         status=self.settings.error_status, headers=headers)
+            
+            response = await handler(request)
+            if headers is not None:
+                response.headers.update(headers)
+            return response
+        finally:
+            stats.in_flight -= 1
+    
+    def _json(self, data: Any) -> web.Response:
+        """Encode a JSON response with the shared codec"""
+        return web.Response(body=codec.dumps(data), content_type="application/json")
+    
+    async def modrinth_search(self, request: web.Request) -> web.Response:
+        """Serve ``GET /v2/search``"""
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", 10))
+        resource_type = "mod"
+        for group in json.loads(request.query.get("facets", "[]")):
+            for facet in group:
+                if facet.startswith("project_type:"):
+                    resource_type = facet.split(":", 1)[1]
+        
+        return self._json({
+            "hits": [self.catalogue.modrinth_hit(resource_type, i) for i in self.catalogue.page(offset, limit)],
+            "offset": offset,
+            "limit": limit,
+            "total_hits": self.catalogue.size
+        })
+    
+    async def modrinth_projects(self, request: web.Request) -> web.Response:
+        """Serve ``GET /v2/projects?ids=[...]``"""
+        projects = (self.catalogue.modrinth_project(project_id)
+                    for project_id in json.loads(request.query.get("ids", "[]")))
+        return self._json([project for project in projects if project is not None])
+    
+    async def hangar_projects(self, request: web.Request) -> web.Response:
+        """Serve ``GET /api/v1/projects``"""
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", 25))
+        resource_type = "addon" if request.query.get("tag") == "ADDON" else "plugin"
+        
+        return self._json({
+            "pagination": {"limit": limit, "offset": offset, "count": self.catalogue.size},
+            "result": [self.catalogue.hangar_project(resource_type, i) for i in self.catalogue.page(offset, limit)]
+        })
+    
+    async def polymart_search(self, request: web.Request) -> web.Response:
+        """Serve ``POST /v1/search``"""
+        payload = await request.json(loads=codec.loads)
+        start = int(payload.get("start", 0))
+        limit = int(payload.get("limit", 10))
+        resource_type = POLYMART_TYPES.get(payload.get("type"), "plugin")
+        
+        return self._json({
+            "response": {
+                "total": self.catalogue.size,
+                "result": [self.catalogue.polymart_resource(resource_type, i)
+                           for i in self.catalogue.page(start, limit)]
+            }
+        })
+    
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        """Serve ``GET /_stats`` with the request counters"""
+        return self._json(self.stats.to_dict())
+
+def api_urls(base_url: str) -> Dict[str, str]:
+    """
+    Get the ``api_url`` of every platform when served from ``base_url``
+    
+    Args:
+        base_url: Root URL of the mock server
+    
+    Returns:
+        Dict mapping platform names to API base URLs
+    """
+    base_url = base_url.rstrip("/")
+    return {
+        "modrinth": f"{base_url}/v2",
+        "hangar": f"{base_url}/api/v1",
+        "polymart": f"{base_url}/v1"
+    }
+
+def run_mock_server(host: str, port: int, settings: MockSettings) -> None:
+    """
+    Serve the mock platform APIs until interrupted
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        settings: Mock behaviour
+    """
+    server = MockPlatformServer(settings)
+    logger.info("mock_server_starting", host=host, port=port,
+                api_urls=api_urls(f"http://{host}:{port}"))
+    web.run_app(server.create_app(), host=host, port=port, print=None)
@@ -14,10 +14,12 @@ class Platform:
         name: Platform identifier (e.g., 'modrinth', 'hangar')
         batch_size: Number of items to fetch per request
         api_url: Base URL for the platform's API
+        deadline: Seconds the platform may take per run, unbounded when None
     """
     name: str
     batch_size: int
     api_url: Optional[str] = None
+    deadline: Optional[float] = None
     
     def __post_init__(self):
         """Set default API URLs based on platform name"""
@@ -1,5 +1,6 @@
 """Resource model module."""
 
+import sys
 from dataclasses import dataclass, field, asdict
 from typing import List, Optional, Literal, Union, Dict, Any
 from datetime import datetime
@@ -46,11 +47,19 @@ class Source:
     url: str
     external_id: str
 
-@dataclass
+def _intern(value: Optional[str]) -> Optional[str]:
+    """共用重複出現的字串物件"""
+    return sys.intern(value) if type(value) is str else value
+
+@dataclass(slots=True)
 class Resource:
     """
     Normalized resource model representing a Minecraft resource
     
+    Instances have no ``__dict__``, and the low-cardinality strings
+    (platform, type, license, categories, versions and loaders) are interned
+    so that a snapshot's resources share one object per distinct value.
+    
     Attributes:
         id: Unique identifier
         name: Resource name
@@ -66,6 +75,9 @@ class Resource:
         website_url: Resource homepage URL
         source_url: Source code URL
         license: Resource license
+        followers: Follower count
+        loaders: Supported mod loaders or platforms
+        gallery_count: Number of gallery images
     """
     id: str
     name: str
@@ -81,6 +93,19 @@ class Resource:
     website_url: str = field(default="")
     source_url: Optional[str] = None
     license: Optional[str] = None
+    followers: int = 0
+    loaders: List[str] = field(default_factory=list)
+    gallery_count: int = 0
+
+    def __post_init__(self) -> None:
+        intern = sys.intern
+        self.resource_type = _intern(self.resource_type)
+        self.platform = _intern(self.platform)
+        self.license = _intern(self.license)
+        # 逐項呼叫 _intern 的開銷在大量建立時很明顯，這裡直接內聯判斷
+        self.versions = [intern(v) if type(v) is str else v for v in self.versions]
+        self.categories = [intern(c) if type(c) is str else c for c in self.categories]
+        self.loaders = [intern(l) if type(l) is str else l for l in self.loaders]
 
     def to_dict(self) -> Dict[str, Any]:
         """轉換為符合 schema 的字典格式"""
@@ -98,5 +123,17 @@ class Resource:
             "categories": self.categories,
             "website_url": self.website_url,
             "source_url": self.source_url,
-            "license": self.license
-        } 
\ No newline at end of file
+            "license": self.license,
+            "followers": self.followers,
+            "loaders": self.loaders,
+            "gallery_count": self.gallery_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Resource":
+        """從 ``to_dict`` 的輸出建立資源"""
+        data = dict(data)
+        for key in ("created_at", "updated_at"):
+            if isinstance(data.get(key), str):
+                data[key] = datetime.fromisoformat(data[key].replace("Z", "+00:00"))
+        return cls(**data) 
\ No newline at end of file
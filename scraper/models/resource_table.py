@@ -0,0 +1,458 @@
+"""Columnar resource table module."""
+
+from datetime import datetime
+from itertools import chain
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .resource import Resource
+from ..utils import codec
+
+NUMERIC_COLUMNS = ("downloads", "followers", "gallery_count")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+CATEGORICAL_COLUMNS = ("platform", "resource_type", "license", "author")
+MULTI_COLUMNS = ("versions", "categories", "loaders")
+
+def _encode(values: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Dictionary-encode values, numbering distinct values in order of appearance"""
+    categories = list(dict.fromkeys(values))
+    index = {value: code for code, value in enumerate(categories)}
+    return np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values)), categories
+
+def _timestamp(value: Any) -> float:
+    """POSIX seconds of a datetime or ISO 8601 string, NaN if missing or invalid"""
+    if not value:
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return np.nan
+
+def _group(codes: np.ndarray, category_count: int) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    """
+    Sort positions by code, keeping their order within a code
+    
+    Returns:
+        Positions sorted by code, the start of each code's run in them, and
+        the codes present in order of their first occurrence
+    """
+    # Stable sorts of 16-bit integers use radix sort
+    keys = codes.astype(np.int16) if category_count < 2 ** 15 else codes
+    order = np.argsort(keys, kind="stable")
+    counts = np.bincount(codes, minlength=category_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = np.flatnonzero(counts)
+    # The first position of each run is the code's first occurrence
+    first_seen = present[np.argsort(order[starts[present]], kind="stable")]
+    return order, np.append(starts, len(codes)), first_seen.tolist()
+
+class Categorical:
+    """
+    Dictionary-encoded column
+    
+    Attributes:
+        codes: Index of each row's value in ``categories``
+        categories: Distinct values in order of first appearance
+    """
+    
+    def __init__(self, codes: np.ndarray, categories: List[Any]) -> None:
+        self.codes = codes
+        self.categories = categories
+        self._index = {value: code for code, value in enumerate(categories)}
+    
+    @classmethod
+    def encode(cls, values: List[Any]) -> "Categorical":
+        """
+        Encode a column
+        
+        Args:
+            values: One value per row
+        
+        Returns:
+            Encoded column
+        """
+        return cls(*_encode(values))
+    
+    def code(self, value: Any) -> int:
+        """Code of a value, -1 if no row has it"""
+        return self._index.get(value, -1)
+    
+    def eq(self, value: Any) -> np.ndarray:
+        """
+        Match rows holding a value
+        
+        Args:
+            value: Value to look for
+        
+        Returns:
+            Boolean row mask
+        """
+        return self.codes == self.code(value)
+    
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        Match rows holding any of several values
+        
+        Args:
+            values: Values to look for
+        
+        Returns:
+            Boolean row mask
+        """
+        return np.isin(self.codes, [self.code(value) for value in values])
+    
+    def group_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row index and code of every value occurrence"""
+        return np.arange(len(self.codes)), self.codes
+    
+    def take(self, rows: np.ndarray) -> "Categorical":
+        """Select rows, keeping the dictionary"""
+        return Categorical(self.codes[rows], self.categories)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+
+class MultiCategorical(Categorical):
+    """
+    Dictionary-encoded list column, stored as flattened codes with row offsets
+    
+    Attributes:
+        codes: Codes of every row's values, one row after the other
+        offsets: Row ``i`` holds ``codes[offsets[i]:offsets[i + 1]]``
+        categories: Distinct values in order of first appearance
+    """
+    
+    def __init__(self, codes: np.ndarray, offsets: np.ndarray, categories: List[Any]) -> None:
+        super().__init__(codes, categories)
+        self.offsets = offsets
+    
+    @classmethod
+    def encode(cls, values: Sequence[Sequence[Any]]) -> "MultiCategorical":
+        """
+        Encode a list column
+        
+        Args:
+            values: One list of values per row
+        
+        Returns:
+            Encoded column
+        """
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        codes, categories = _encode(list(chain.from_iterable(values)))
+        return cls(codes, offsets, categories)
+    
+    def lengths(self) -> np.ndarray:
+        """Number of values in each row"""
+        return np.diff(self.offsets)
+    
+    def group_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row index and code of every value occurrence"""
+        return np.repeat(np.arange(len(self)), self.lengths()), self.codes
+    
+    def eq(self, value: Any) -> np.ndarray:
+        """
+        Match rows whose list holds a value
+        
+        Args:
+            value: Value to look for
+        
+        Returns:
+            Boolean row mask
+        """
+        return self.isin([value])
+    
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        Match rows whose list holds any of several values
+        
+        Args:
+            values: Values to look for
+        
+        Returns:
+            Boolean row mask
+        """
+        rows, codes = self.group_rows()
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows[np.isin(codes, [self.code(value) for value in values])]] = True
+        return mask
+    
+    def take(self, rows: np.ndarray) -> "MultiCategorical":
+        """Select rows, keeping the dictionary"""
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position of each kept value in the flattened codes
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return MultiCategorical(self.codes[positions], offsets, self.categories)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+Column = Union[np.ndarray, Categorical]
+
+class ResourceTable:
+    """
+    Columnar view of many resources for bulk analytics
+    
+    Counters are ``int64`` arrays, timestamps ``float64`` POSIX seconds (NaN
+    when missing), and the repeated string fields dictionary-encoded
+    ``Categorical`` columns. The source records are kept as they were, so
+    selected rows can be handed on unchanged. Filtering, grouping, sums and
+    top-N selection run on whole columns instead of looping over records.
+    
+    Groups are returned in order of first appearance and keep the rows'
+    order, which is what the equivalent loop over the records would produce.
+    
+    A column is encoded from the records when it is first used, so build
+    one table and run every statistic on it rather than a table per
+    statistic.
+    """
+    
+    def __init__(self, records: List[Any], dict_records: bool = False, type_key: str = "resource_type",
+                 columns: Optional[Dict[str, Column]] = None) -> None:
+        """
+        Initialize the table
+        
+        Args:
+            records: Source record of each row, Resource objects or resource dicts
+            dict_records: Whether the records are dicts
+            type_key: Dict key holding the resource type
+            columns: Columns already encoded for these records
+        """
+        self.records = records
+        self._dict_records = dict_records
+        self.type_key = type_key
+        self.columns: Dict[str, Column] = columns or {}
+    
+    @classmethod
+    def from_resources(cls, resources: Sequence[Resource]) -> "ResourceTable":
+        """
+        Build a table from transformer output or loaded snapshots
+        
+        Args:
+            resources: Resources, one row each
+        
+        Returns:
+            Table whose records are the resources
+        """
+        return cls(list(resources))
+    
+    @classmethod
+    def from_dicts(cls, records: Sequence[Dict[str, Any]], type_key: str = "resource_type") -> "ResourceTable":
+        """
+        Build a table from resource dicts, as written by ``Resource.to_dict``
+        
+        Args:
+            records: Resource dicts, one row each
+            type_key: Key holding the resource type
+        
+        Returns:
+            Table whose records are the dicts
+        """
+        return cls(list(records), dict_records=True, type_key=type_key)
+    
+    @classmethod
+    def from_processed(cls, paths: Iterable[Path]) -> "ResourceTable":
+        """
+        Build a table straight from processed snapshot files
+        
+        Args:
+            paths: ``data/processed/<timestamp>/<platform>_processed.json`` files
+        
+        Returns:
+            Table whose records are the snapshot's resource dicts
+        """
+        records = []
+        for path in paths:
+            data = codec.read_json(path)
+            for resource_type, type_resources in data.get("resources", {}).items():
+                for resource in type_resources:
+                    resource["resource_type"] = resource_type
+                    records.append(resource)
+        return cls.from_dicts(records)
+    
+    def _values(self, name: str) -> List[Any]:
+        """Read a field of every record"""
+        if self._dict_records:
+            key = self.type_key if name == "resource_type" else name
+            return [record.get(key) for record in self.records]
+        return list(map(attrgetter(name), self.records))
+    
+    def _encode(self, name: str) -> Column:
+        """Encode a column from the records"""
+        values = self._values(name)
+        count = len(values)
+        if name in NUMERIC_COLUMNS:
+            return np.fromiter((value or 0 for value in values), dtype=np.int64, count=count)
+        if name in TIMESTAMP_COLUMNS:
+            return np.fromiter(map(_timestamp, values), dtype=np.float64, count=count)
+        if name in MULTI_COLUMNS:
+            return MultiCategorical.encode([value or () for value in values])
+        if name in CATEGORICAL_COLUMNS:
+            return Categorical.encode(values)
+        raise KeyError(name)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, name: str) -> Column:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = self._encode(name)
+        return column
+    
+    def _rows(self, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Row indices of an optional selection, every row when None"""
+        if rows is None:
+            return np.arange(len(self))
+        rows = np.asarray(rows)
+        return np.flatnonzero(rows) if rows.dtype == bool else rows.astype(np.intp, copy=False)
+    
+    def take(self, rows: np.ndarray) -> "ResourceTable":
+        """
+        Select rows
+        
+        Args:
+            rows: Row indices or a boolean mask
+        
+        Returns:
+            Table of the selected rows, in the given order
+        """
+        rows = self._rows(rows)
+        columns = {name: column.take(rows) if isinstance(column, Categorical) else column[rows]
+                   for name, column in self.columns.items()}
+        return ResourceTable([self.records[i] for i in rows.tolist()], self._dict_records, self.type_key, columns)
+    
+    def filter(self, mask: np.ndarray) -> "ResourceTable":
+        """
+        Keep the rows matching a mask
+        
+        Args:
+            mask: Boolean row mask, e.g. ``table["downloads"] > 1000``
+        
+        Returns:
+            Table of the matching rows
+        """
+        return self.take(np.asarray(mask, dtype=bool))
+    
+    def rows(self, rows: Optional[np.ndarray] = None) -> List[Any]:
+        """
+        Get source records
+        
+        Args:
+            rows: Row indices or a boolean mask, every row when None
+        
+        Returns:
+            Records of the selected rows
+        """
+        return [self.records[i] for i in self._rows(rows).tolist()]
+    
+    def _occurrences(self, column: str, rows: Optional[np.ndarray]) -> Tuple[Categorical, np.ndarray, np.ndarray]:
+        """Row index and code of every value occurrence of a categorical column within a selection"""
+        encoded: Categorical = self[column]
+        positions, codes = encoded.group_rows()
+        if rows is not None:
+            keep = np.zeros(len(self), dtype=bool)
+            keep[self._rows(rows)] = True
+            selected = keep[positions]
+            positions, codes = positions[selected], codes[selected]
+        return encoded, positions, codes
+    
+    def group_indices(self, column: str, rows: Optional[np.ndarray] = None) -> Dict[Any, np.ndarray]:
+        """
+        Group rows by a categorical column
+        
+        A list column puts a row in the group of each of its values.
+        
+        Args:
+            column: Categorical or list column
+            rows: Only group these rows, every row when None
+        
+        Returns:
+            Row indices of each value in row order, values in order of first appearance
+        """
+        encoded, positions, codes = self._occurrences(column, rows)
+        order, bounds, first_seen = _group(codes, len(encoded.categories))
+        positions = positions[order]
+        return {encoded.categories[code]: positions[bounds[code]:bounds[code + 1]] for code in first_seen}
+    
+    def count_by(self, column: str, rows: Optional[np.ndarray] = None) -> Dict[Any, int]:
+        """
+        Count rows per value of a categorical column
+        
+        Args:
+            column: Categorical or list column
+            rows: Only count these rows, every row when None
+        
+        Returns:
+            Row count of each value, values in order of first appearance
+        """
+        return {value: len(group) for value, group in self.group_indices(column, rows).items()}
+    
+    def sum_by(self, column: str, values: str = "downloads", rows: Optional[np.ndarray] = None) -> Dict[Any, int]:
+        """
+        Sum a numeric column per value of a categorical column
+        
+        Args:
+            column: Categorical or list column to group by
+            values: Numeric column to sum
+            rows: Only sum these rows, every row when None
+        
+        Returns:
+            Sum of each value, values in order of first appearance
+        """
+        encoded, positions, codes = self._occurrences(column, rows)
+        order, bounds, first_seen = _group(codes, len(encoded.categories))
+        if not first_seen:
+            return {}
+        # reduceat needs increasing offsets, so sum the runs in code order
+        present = sorted(first_seen)
+        totals = dict(zip(present, np.add.reduceat(self[values][positions[order]], bounds[present]).tolist()))
+        return {encoded.categories[code]: totals[code] for code in first_seen}
+    
+    def sum(self, values: str = "downloads", rows: Optional[np.ndarray] = None) -> int:
+        """
+        Sum a numeric column
+        
+        Args:
+            values: Numeric column
+            rows: Only sum these rows, every row when None
+        
+        Returns:
+            The sum
+        """
+        column = self[values]
+        return column[self._rows(rows)].sum().item() if rows is not None else column.sum().item()
+    
+    def top_n(self, n: int, by: str = "downloads", rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Select the rows with the largest values
+        
+        Ties keep the rows' order, like a stable descending sort.
+        
+        Args:
+            n: Number of rows
+            by: Numeric column to rank by
+            rows: Only rank these rows, every row when None
+        
+        Returns:
+            Row indices, largest value first
+        """
+        candidates = self._rows(rows)
+        values = self[by][candidates]
+        if n <= 0 or not len(candidates):
+            return candidates[:0]
+        if n < len(candidates):
+            # Only rows reaching the n-th largest value can make the cut
+            threshold = np.partition(values, len(values) - n)[len(values) - n]
+            reaching = np.flatnonzero(values >= threshold)
+            candidates, values = candidates[reaching], values[reaching]
+        return candidates[np.argsort(-values, kind="stable")[:n]]
@@ -0,0 +1,172 @@
+"""
+Lazy registry of platform clients and transformers
+
+A platform's client and transformer are looked up in this order:
+
+1. ``client``/``transformer`` import paths in the platform's config section
+2. The built-in Modrinth, Hangar and Polymart implementations
+3. ``mc_top_list.clients``/``mc_top_list.transformers`` entry points of
+   installed packages, named after the platform
+
+Nothing is imported until a platform's client or transformer is first
+requested, so a run only pays for the platforms it actually scrapes.
+Entry points are only scanned for platforms that are not found otherwise.
+"""
+
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type
+
+import structlog
+
+if TYPE_CHECKING:
+    from scraper.clients.client_factory import BaseClient
+    from scraper.services.transformers.base import BaseTransformer
+
+logger = structlog.get_logger(__name__)
+
+ENTRY_POINT_GROUPS = {
+    "client": "mc_top_list.clients",
+    "transformer": "mc_top_list.transformers"
+}
+
+BUILTIN_PLATFORMS: Dict[str, Dict[str, str]] = {
+    "modrinth": {
+        "client": "scraper.clients.modrinth:ModrinthClient",
+        "transformer": "scraper.services.transformers.modrinth:ModrinthTransformer"
+    },
+    "hangar": {
+        "client": "scraper.clients.hangar:HangarClient",
+        "transformer": "scraper.services.transformers.hangar:HangarTransformer"
+    },
+    "polymart": {
+        "client": "scraper.clients.polymart:PolymartClient",
+        "transformer": "scraper.services.transformers.polymart:PolymartTransformer"
+    }
+}
+
+class RegistryError(Exception):
+    """Raised when no implementation is found for a platform"""
+    pass
+
+class PlatformRegistry:
+    """Resolves and imports platform implementations on first use"""
+    
+    def __init__(self, config: Optional[Dict] = None) -> None:
+        """
+        Initialize the registry
+        
+        Args:
+            config: Scraper configuration, read for per-platform import paths
+        """
+        self.platforms_config: Dict[str, Dict] = (config or {}).get("platforms", {})
+        self._entry_points: Optional[Dict[str, Dict[str, EntryPoint]]] = None
+        self._loaded: Dict[Tuple[str, str], Any] = {}
+        self._transformers: Dict[str, "BaseTransformer"] = {}
+    
+    def names(self) -> List[str]:
+        """
+        Get the configured platforms
+        
+        Returns:
+            Platform identifiers in configuration order
+        """
+        return list(self.platforms_config)
+    
+    def _discover(self) -> Dict[str, Dict[str, EntryPoint]]:
+        """Scan the installed packages' entry points once"""
+        if self._entry_points is None:
+            self._entry_points = {
+                kind: {entry_point.name: entry_point for entry_point in entry_points(group=group)}
+                for kind, group in ENTRY_POINT_GROUPS.items()
+            }
+        return self._entry_points
+    
+    def _resolve(self, platform: str, kind: str) -> EntryPoint:
+        """Find where a platform's client or transformer is defined"""
+        group = ENTRY_POINT_GROUPS[kind]
+        path = self.platforms_config.get(platform, {}).get(kind) or BUILTIN_PLATFORMS.get(platform, {}).get(kind)
+        if path:
+            return EntryPoint(name=platform, value=path, group=group)
+        
+        entry_point = self._discover()[kind].get(platform)
+        if entry_point is None:
+            raise RegistryError(f"No {kind} found for platform: {platform}")
+        return entry_point
+    
+    def load(self, platform: str, kind: str) -> Any:
+        """
+        Import a platform's client or transformer class
+        
+        Args:
+            platform: Platform identifier
+            kind: ``client`` or ``transformer``
+        
+        Returns:
+            The imported class
+        
+        Raises:
+            RegistryError: If the platform has no such implementation
+        """
+        key = (platform, kind)
+        if key not in self._loaded:
+            entry_point = self._resolve(platform, kind)
+            self._loaded[key] = entry_point.load()
+            logger.debug("platform_implementation_loaded", platform=platform, kind=kind,
+                         target=entry_point.value)
+        return self._loaded[key]
+    
+    def client_class(self, platform: str) -> Type["BaseClient"]:
+        """
+        Get a platform's client class
+        
+        Args:
+            platform: Platform identifier
+        
+        Returns:
+            Client class
+        
+        Raises:
+            RegistryError: If the platform has no client
+        """
+        return self.load(platform, "client")
+    
+    def transformer(self, platform: str) -> "BaseTransformer":
+        """
+        Get a platform's transformer, created on first use
+        
+        Args:
+            platform: Platform identifier
+        
+        Returns:
+            Transformer instance shared by every caller
+        
+        Raises:
+            RegistryError: If the platform has no transformer
+        """
+        if platform not in self._transformers:
+            self._transformers[platform] = self.load(platform, "transformer")()
+        return self._transformers[platform]
+
+class LazyTransformers(Mapping[str, "BaseTransformer"]):
+    """Read-only mapping of the configured platforms to transformers, imported on access"""
+    
+    def __init__(self, registry: PlatformRegistry) -> None:
+        """
+        Initialize the mapping
+        
+        Args:
+            registry: Registry resolving the transformers
+        """
+        self.registry = registry
+    
+    def __getitem__(self, platform: str) -> "BaseTransformer":
+        try:
+            return self.registry.transformer(platform)
+        except RegistryError as e:
+            raise KeyError(platform) from e
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.names())
+    
+    def __len__(self) -> int:
+        return len(self.registry.names())
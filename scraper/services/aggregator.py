@@ -1,12 +1,12 @@
 """Resource aggregation service."""
 
-from typing import Dict, List
-from collections import defaultdict
+from typing import Dict, List, Optional
 import structlog
 from datetime import datetime
 from pathlib import Path
 
 from ..models.resource import Resource, ResourceCategory, ResourceType
+from ..models.resource_table import ResourceTable
 from ..services.storage.json_storage import JsonStorage
 from ..services.storage.latest_symlink import update_latest_symlink
 from ..services.html_generator import HtmlGenerator
@@ -47,41 +47,65 @@ class ResourceAggregator:
             for type_id, config in resource_types.items()
         ]
         
-        # 按資源類型分組
-        grouped = {
+        # 以欄位方式一次計算所有門檻與分組
+        table = ResourceTable.from_resources(resources)
+        popular = table["downloads"] > 1000  # 可配置的閾值
+        thirty_days_ago = datetime.now().timestamp() - (30 * 24 * 60 * 60)
+        new = table["created_at"] > thirty_days_ago
+        
+        resource_dicts = [self._resource_dict(resource) for resource in resources]
+        
+        grouped_resources = {}
+        for resource_type, rows in table.group_indices("resource_type").items():
+            categories = {
+                ResourceCategory.POPULAR.value: rows[popular[rows]],
+                ResourceCategory.NEW.value: rows[new[rows]],
+                ResourceCategory.ALL.value: rows
+            }
+            # 分類依第一筆符合的資源出現順序排列，同一筆資源則依 popular、new、all
+            order = sorted(
+                (category for category, category_rows in categories.items() if len(category_rows)),
+                key=lambda category: (categories[category][0], list(categories).index(category))
+            )
+            grouped_resources[resource_type] = {
+                category: [resource_dicts[i] for i in categories[category].tolist()]
+                for category in order
+            }
+        
+        return {
             "tabs": tabs,
-            "resources": defaultdict(lambda: defaultdict(list))
+            "resources": grouped_resources
         }
+    
+    @staticmethod
+    def _resource_dict(resource: Resource) -> Dict:
+        """
+        Convert a resource for the aggregated output
         
-        for resource in resources:
-            # 轉換為字典格式
-            resource_dict = resource.to_dict()
-            
-            # 確保網址欄位存在
-            if not resource_dict.get("website_url"):
-                if resource.platform == "modrinth":
-                    resource_dict["website_url"] = f"https://modrinth.com/{resource.resource_type}/{resource.id}"
-                elif resource.platform == "hangar":
-                    resource_dict["website_url"] = f"https://hangar.papermc.io/{resource.author}/{resource.id}"
-            
-            # 加入到對應的分類
-            if resource.downloads > 1000:  # 可配置的閾值
-                grouped["resources"][resource.resource_type][ResourceCategory.POPULAR.value].append(resource_dict)
-            
-            thirty_days_ago = datetime.now().timestamp() - (30 * 24 * 60 * 60)
-            if resource.created_at.timestamp() > thirty_days_ago:
-                grouped["resources"][resource.resource_type][ResourceCategory.NEW.value].append(resource_dict)
+        Args:
+            resource: Resource to convert
             
-            grouped["resources"][resource.resource_type][ResourceCategory.ALL.value].append(resource_dict)
+        Returns:
+            Resource dict with a website URL filled in where it can be derived
+        """
+        resource_dict = resource.to_dict()
+        
+        # 確保網址欄位存在
+        if not resource_dict.get("website_url"):
+            if resource.platform == "modrinth":
+                resource_dict["website_url"] = f"https://modrinth.com/{resource.resource_type}/{resource.id}"
+            elif resource.platform == "hangar":
+                resource_dict["website_url"] = f"https://hangar.papermc.io/{resource.author}/{resource.id}"
         
-        return grouped
+        return resource_dict
     
-    def aggregate(self, timestamp: str) -> Dict:
+    def aggregate(self, timestamp: str, degraded: Optional[Dict[str, str]] = None) -> Dict:
         """
         Aggregate resources from all platforms.
         
         Args:
             timestamp: Timestamp of data to aggregate
+            degraded: Platforms that failed or only partly completed, with the reason
             
         Returns:
             Dict containing aggregated resources
@@ -113,7 +137,8 @@ class ResourceAggregator:
                 "metadata": {
                     "timestamp": timestamp,
                     "total_resources": len(all_resources),
-                    "platforms": platforms
+                    "platforms": platforms,
+                    "degraded_platforms": degraded or {}
                 },
                 "resources": grouped
             }
@@ -5,23 +5,33 @@ Handles the core business logic for fetching and processing Minecraft resources
 from various platforms.
 """
 
-from typing import Dict, List, Optional, TypedDict
+from contextlib import aclosing
+from typing import Callable, Dict, List, Optional, Tuple, TypedDict
 import asyncio
+import multiprocessing
+import os
+import socket
 import structlog
 from datetime import datetime
 from pathlib import Path
+from yarl import URL
 
 from scraper.clients.client_factory import ClientFactory, BaseClient
-from scraper.clients.modrinth import ModrinthClient
-from scraper.clients.hangar import HangarClient
-from scraper.clients.polymart import PolymartClient
+from scraper.clients.replay import ReplayClient
 from scraper.models.resource import Resource
 from scraper.models.platform import Platform
-from scraper.services.transformers.modrinth import ModrinthTransformer
-from scraper.services.transformers.hangar import HangarTransformer
-from scraper.services.transformers.polymart import PolymartTransformer
+from scraper.services.transformers.base import BaseTransformer
 from scraper.services.storage.json_storage import JsonStorage
 from scraper.services.aggregator import ResourceAggregator
+from scraper.services.work_queue import LeaseQueue, WorkUnit
+from scraper.config import get_config
+from scraper.registry import LazyTransformers, PlatformRegistry
+from scraper.utils import codec
+from scraper.utils.checkpoint import PageCheckpoint
+from scraper.utils.fetch_metrics import FetchMetrics
+from scraper.utils.http import HTTPSessionManager
+from scraper.utils.http_cache import HTTPCache
+from scraper.utils.http_record import HTTPRecorder
 
 # Initialize structured logging
 logger = structlog.get_logger(__name__)
@@ -50,32 +60,81 @@ class StorageError(ScraperError):
 class ScraperService:
     """Core service for resource scraping operations"""
     
-    def __init__(self, storage_dir: Optional[Path] = None) -> None:
+    TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+    
+    def __init__(self, storage_dir: Optional[Path] = None,
+                 replay_dir: Optional[Path] = None, record: bool = False,
+                 incremental: bool = False, resume: Optional[str] = None,
+                 platforms: Optional[List[str]] = None) -> None:
         """
         Initialize the scraper service
         
         Args:
             storage_dir: Base directory for data storage
+            replay_dir: Raw snapshot directory to replay instead of calling the platform APIs
+            record: Record every request/response pair of the run next to the raw data
+            incremental: Fetch only changes since the previous processed snapshot where supported
+            resume: Timestamp of an interrupted run to continue, reusing its checkpointed pages
+            platforms: Only scrape these configured platforms, all of them when None
+            
+        Raises:
+            ScraperError: If ``resume`` is not a run timestamp or a platform is not configured
         """
         self.base_dir = storage_dir or Path(__file__).parent.parent.parent
-        self.client_factory = ClientFactory()
+        self.config = get_config()
+        self.replay_dir = replay_dir
+        self.record = record
+        self.incremental = incremental
+        if resume is not None:
+            try:
+                datetime.strptime(resume, self.TIMESTAMP_FORMAT)
+            except ValueError:
+                raise ScraperError(f"Invalid run timestamp to resume: {resume}")
+        self.resume = resume
+        unknown = sorted(set(platforms or []) - set(self.config.get("platforms", {})))
+        if unknown:
+            raise ScraperError(f"Platforms not configured: {', '.join(unknown)}")
+        self.selected_platforms = platforms
+        # Pages buffered between the stages of a streamed platform
+        self.pipeline_depth = self.config.get("pipeline", {}).get("queue_depth", 8)
+        self.sharding = self.config.get("sharding", {})
+        # Platforms that failed or only partly completed in the last run, with the reason
+        self.degraded: Dict[str, str] = {}
+        self.registry = PlatformRegistry(self.config)
+        self.client_factory = ClientFactory(session_manager=self._create_session_manager(),
+                                            registry=self.registry)
         self._register_clients()
         self._init_transformers()
         self._init_storage()
         
+    def _create_session_manager(self) -> HTTPSessionManager:
+        """
+        Create the HTTP session manager shared by all clients of a run
+        
+        Returns:
+            Session manager, with the on-disk response cache when enabled
+        """
+        http_config = self.config.get("http", {})
+        cache_config = http_config.get("cache", {})
+        cache = None
+        if cache_config.get("enabled", False):
+            cache = HTTPCache(self.base_dir / cache_config.get("dir", "data/http_cache"))
+        return HTTPSessionManager(http_config, cache=cache)
+        
     def _register_clients(self) -> None:
-        """Register platform-specific API clients"""
-        self.client_factory.register("modrinth", ModrinthClient)
-        self.client_factory.register("hangar", HangarClient)
-        self.client_factory.register("polymart", PolymartClient)
+        """
+        Register platform-specific API clients
+        
+        Platform clients are imported by the registry when a platform is first
+        run; only a replay registers its snapshot readers up front.
+        """
+        if self.replay_dir is not None:
+            for platform in self.config.get("platforms", {}):
+                self.client_factory.register(platform, ReplayClient.for_snapshot(self.replay_dir, platform))
         
     def _init_transformers(self) -> None:
-        """Initialize platform-specific transformers"""
-        self.transformers = {
-            "modrinth": ModrinthTransformer(),
-            "hangar": HangarTransformer(),
-            "polymart": PolymartTransformer()
-        }
+        """Initialize platform-specific transformers, imported on first access"""
+        self.transformers = LazyTransformers(self.registry)
         
     def _init_storage(self) -> None:
         """Initialize storage service"""
@@ -101,17 +160,46 @@ class ScraperService:
         try:
             client: BaseClient = self.client_factory.create(platform)
             logger.info("fetching_resources", platform=platform)
-            return await client.fetch_resources()
+            raw_data = await client.fetch_resources()
         except Exception as e:
             logger.error("resource_fetch_failed", platform=platform, error=str(e))
             raise ResourceFetchError(f"Failed to fetch resources from {platform}: {str(e)}")
+        self._mark_failed_types(platform, client)
+        return raw_data
 
-    async def process_platform(self, platform: Platform) -> Optional[List[Resource]]:
+    async def fetch_updates(self, platform: str,
+                            is_unchanged: Callable[[str, Dict], bool]) -> Optional[Dict]:
+        """
+        Fetch only the resources changed since the previous snapshot
+        
+        Args:
+            platform: Platform identifier
+            is_unchanged: Check telling whether a raw item matches the previous snapshot
+            
+        Returns:
+            Dict containing the changed resources, or None if the platform
+            does not support incremental fetching
+            
+        Raises:
+            ResourceFetchError: If fetching resources fails
+        """
+        try:
+            client: BaseClient = self.client_factory.create(platform)
+            if not client.supports_incremental:
+                return None
+            logger.info("fetching_resource_updates", platform=platform)
+            return await client.fetch_updates(is_unchanged)
+        except Exception as e:
+            logger.error("resource_fetch_failed", platform=platform, error=str(e))
+            raise ResourceFetchError(f"Failed to fetch resource updates from {platform}: {str(e)}")
+
+    async def process_platform(self, platform: Platform, raw_data: Optional[Dict] = None) -> Optional[List[Resource]]:
         """
         Process resources for a single platform
         
         Args:
             platform: Platform configuration object
+            raw_data: Already fetched raw data; fetched from the platform when omitted
             
         Returns:
             List of processed Resource objects
@@ -120,18 +208,20 @@ class ScraperService:
             ResourceProcessingError: If processing resources fails
         """
         try:
-            raw_data = await self.fetch_resources(platform.name)
+            if raw_data is None:
+                raw_data = await self.fetch_resources(platform.name)
             transformer = self.transformers.get(platform.name)
             if not transformer:
                 logger.error("no_transformer_found", platform=platform.name)
                 raise ResourceProcessingError(f"No transformer found for platform: {platform.name}")
                 
-            resources = transformer.transform(raw_data)
+            # Transform off the event loop so other platforms keep fetching meanwhile
+            resources = await asyncio.to_thread(transformer.transform, raw_data)
             logger.info("platform_processing_success", 
                        platform=platform.name, 
                        resource_count=len(resources))
             return resources
-        except ResourceFetchError as e:
+        except (ResourceFetchError, ResourceProcessingError):
             raise
         except Exception as e:
             logger.error("platform_processing_failed", 
@@ -139,6 +229,379 @@ class ScraperService:
                         error=str(e))
             raise ResourceProcessingError(f"Failed to process platform {platform.name}: {str(e)}")
 
+    async def stream_platform(self, platform: Platform, timestamp: datetime) -> Optional[List[Resource]]:
+        """
+        Fetch, transform and store a platform's resources as a pipeline
+        
+        Pages flow from the client through a transform stage (run off the
+        event loop) into the raw snapshot writer as they arrive. The stages
+        are connected by queues holding at most ``pipeline.queue_depth``
+        pages, so a slow stage holds the earlier ones back and memory is
+        bounded by the queue depth rather than by the raw payload; only
+        the normalized resources are kept.
+        
+        Args:
+            platform: Platform configuration object
+            timestamp: Data collection timestamp of the run
+            
+        Returns:
+            List of processed resources, or None if the platform does not
+            support streaming
+            
+        Raises:
+            ResourceFetchError: If streaming resources fails
+        """
+        transformer = self.transformers[platform.name]
+        # Transformed pages in arrival order, with the resource type they were fetched for
+        pages: List[Tuple[str, List[Resource]]] = []
+        try:
+            client: BaseClient = self.client_factory.create(platform.name)
+            if not client.supports_streaming:
+                return None
+            logger.info("streaming_resources", platform=platform.name, queue_depth=self.pipeline_depth)
+            
+            fetched: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_depth)
+            transformed: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_depth)
+            done = object()
+            
+            async def fetch_stage() -> None:
+                async with aclosing(client.stream_pages()) as pages:
+                    async for entry in pages:
+                        await fetched.put(entry)
+                await fetched.put(done)
+            
+            async def transform_stage() -> None:
+                while (entry := await fetched.get()) is not done:
+                    resource_type, items = entry
+                    page_resources = await asyncio.to_thread(self._transform_page, platform.name,
+                                                             transformer, resource_type, items)
+                    await transformed.put((resource_type, items, page_resources))
+                await transformed.put(done)
+            
+            async def store_stage() -> None:
+                with self.storage.open_raw_stream(timestamp, platform.name, client.raw_items_key) as writer:
+                    while (entry := await transformed.get()) is not done:
+                        resource_type, items, page_resources = entry
+                        await asyncio.to_thread(writer.write_page, resource_type, items)
+                        pages.append((resource_type, page_resources))
+                    # 中途失敗的類型只有部分資料，不保留看似完整的原始檔
+                    writer.discard(list(client.failed_types))
+            
+            stages = [asyncio.create_task(stage()) for stage in (fetch_stage, transform_stage, store_stage)]
+            try:
+                await asyncio.gather(*stages)
+            except BaseException:
+                for task in stages:
+                    task.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                raise
+        except Exception as e:
+            logger.error("resource_fetch_failed", platform=platform.name, error=str(e))
+            raise ResourceFetchError(f"Failed to stream resources from {platform.name}: {str(e)}")
+        self._mark_failed_types(platform.name, client)
+        # 與非串流路徑一致，失敗類型已處理的頁面不進入結果
+        resources = [resource for resource_type, page_resources in pages
+                     if resource_type not in client.failed_types
+                     for resource in page_resources]
+        
+        logger.info("platform_processing_completed",
+                   platform=platform.name,
+                   resource_count=len(resources))
+        return resources
+
+    def _mark_failed_types(self, platform: str, client: BaseClient) -> None:
+        """
+        Mark a platform degraded when some of its resource types failed
+        
+        Args:
+            platform: Platform identifier
+            client: Client that fetched the platform
+        """
+        if not client.failed_types:
+            return
+        failures = ", ".join(f"{resource_type} ({error})" for resource_type, error in client.failed_types.items())
+        self.degraded[platform] = f"Resource types failed: {failures}"
+        logger.warning("platform_degraded", platform=platform, reason=self.degraded[platform])
+
+    @staticmethod
+    def _transform_page(platform: str, transformer: BaseTransformer, resource_type: str, items: List[Dict]) -> List[Resource]:
+        """
+        Transform one page of raw items, skipping invalid ones
+        
+        Args:
+            platform: Platform identifier
+            transformer: Platform transformer
+            resource_type: Resource type of the items
+            items: Raw items of the page
+            
+        Returns:
+            Normalized resources of the valid items
+        """
+        resources = []
+        for item in items:
+            try:
+                resources.append(transformer.transform_item(resource_type, item))
+            except (KeyError, ValueError) as e:
+                logger.warning("invalid_data", platform=platform, error=str(e))
+        return resources
+
+    async def _run_platform(self, platform: Platform,
+                            timestamp: Optional[datetime] = None) -> Tuple[Optional[Dict], Optional[List[Resource]]]:
+        """
+        Fetch and transform a single platform as one pipeline task
+        
+        The platform API is hit exactly once; the transform starts as soon as
+        this platform's fetch finishes, independently of the other platforms.
+        Given the run timestamp, full fetches of streaming clients go through
+        ``stream_platform``, which writes the raw data itself, so no raw
+        payload is returned.
+        
+        Args:
+            platform: Platform configuration object
+            timestamp: Data collection timestamp of the run
+            
+        Returns:
+            Tuple of (raw data, processed resources)
+        """
+        if self.incremental:
+            previous = self._load_previous_resources(platform.name)
+            if previous:
+                raw_data = await self.fetch_updates(platform.name,
+                                                    self._build_unchanged_check(platform.name, previous))
+                if raw_data is not None:
+                    delta = await self.process_platform(platform, raw_data=raw_data)
+                    resources = self._merge_resources(previous, delta or [])
+                    logger.info("incremental_merge_completed",
+                               platform=platform.name,
+                               changed_count=len(delta or []),
+                               resource_count=len(resources))
+                    return raw_data, resources
+        
+        if timestamp is not None and self.replay_dir is None:
+            resources = await self.stream_platform(platform, timestamp)
+            if resources is not None:
+                return None, resources
+        
+        raw_data = await self.fetch_resources(platform.name)
+        resources = await self.process_platform(platform, raw_data=raw_data)
+        return raw_data, resources
+
+    async def _run_platform_guarded(self, platform: Platform,
+                                    timestamp: datetime) -> Optional[Tuple[Optional[Dict], Optional[List[Resource]]]]:
+        """
+        Run a platform within its deadline, isolating its failures
+        
+        A platform exceeding its deadline or failing is recorded in
+        ``self.degraded`` instead of aborting the run.
+        
+        Args:
+            platform: Platform configuration object
+            timestamp: Data collection timestamp of the run
+            
+        Returns:
+            Tuple of (raw data, processed resources), or None if the platform failed
+        """
+        try:
+            return await asyncio.wait_for(self._run_platform(platform, timestamp), platform.deadline)
+        except asyncio.TimeoutError:
+            reason = f"Deadline of {platform.deadline}s exceeded"
+        except Exception as e:
+            reason = str(e) or type(e).__name__
+        
+        self.degraded[platform.name] = reason
+        logger.error("platform_degraded", platform=platform.name, reason=reason)
+        return None
+
+    def _mark_tripped_platforms(self, platforms: List[Platform]) -> None:
+        """
+        Mark platforms whose API host tripped its circuit breaker as degraded
+        
+        Args:
+            platforms: Platforms of the run
+        """
+        tripped = set(self.client_factory.session_manager.circuit_breakers.tripped_hosts())
+        for platform in platforms:
+            host = URL(platform.api_url).host if platform.api_url else None
+            if host in tripped and platform.name not in self.degraded:
+                self.degraded[platform.name] = f"Circuit breaker opened for {host}"
+                logger.warning("platform_degraded", platform=platform.name,
+                              reason=self.degraded[platform.name])
+
+    def _load_previous_resources(self, platform: str) -> List[Resource]:
+        """
+        Load a platform's resources from the latest processed snapshot
+        
+        Args:
+            platform: Platform identifier
+            
+        Returns:
+            Previously processed resources, empty if there is no snapshot
+        """
+        timestamps = self.storage.list_processed_timestamps()
+        if not timestamps:
+            return []
+        return self.storage.load_processed_data(timestamps[-1], platform)
+
+    def _build_unchanged_check(self, platform: str,
+                               previous: List[Resource]) -> Callable[[str, Dict], bool]:
+        """
+        Build the check telling whether a raw item matches the previous snapshot
+        
+        An item is unchanged when its normalized ``updated_at`` and download
+        count both equal the stored resource of the same type and id.
+        
+        Args:
+            platform: Platform identifier
+            previous: Previously processed resources
+            
+        Returns:
+            Check taking a resource type and a raw item
+        """
+        known = {
+            (resource.resource_type, resource.id): (resource.updated_at, resource.downloads)
+            for resource in previous
+        }
+        transformer = self.transformers[platform]
+        
+        def is_unchanged(resource_type: str, item: Dict) -> bool:
+            try:
+                resource = transformer.transform_item(resource_type, item)
+            except (KeyError, ValueError):
+                return False
+            return known.get((resource_type, resource.id)) == (resource.updated_at, resource.downloads)
+        
+        return is_unchanged
+
+    @staticmethod
+    def _merge_resources(previous: List[Resource], delta: List[Resource]) -> List[Resource]:
+        """
+        Merge changed resources into the previous snapshot
+        
+        Resources not part of the delta keep their previous values, including
+        their download counts.
+        
+        Args:
+            previous: Previously processed resources
+            delta: Freshly fetched changed resources
+            
+        Returns:
+            Merged resources, previous order first and new resources last
+        """
+        merged = {(resource.resource_type, resource.id): resource for resource in previous}
+        for resource in delta:
+            merged[(resource.resource_type, resource.id)] = resource
+        return list(merged.values())
+
+    def _get_platforms(self) -> List[Platform]:
+        """
+        Build platform configurations from config.yml
+        
+        Returns:
+            List of Platform objects in configuration order
+        """
+        platforms_config = self.config.get("platforms", {})
+        return [
+            Platform(name=name, batch_size=config.get("batch_size", 100), api_url=config.get("api_url"),
+                     deadline=config.get("deadline"))
+            for name, config in platforms_config.items()
+            if self.selected_platforms is None or name in self.selected_platforms
+        ]
+
+    def _get_run_timestamp(self) -> datetime:
+        """
+        Get the timestamp the run's data is stored under
+        
+        A replay reuses the timestamp of the replayed snapshot so the day's
+        processed and aggregated data are regenerated in place; a resumed
+        run continues under the interrupted run's timestamp.
+        
+        Returns:
+            Run timestamp
+        """
+        if self.resume is not None:
+            return datetime.strptime(self.resume, self.TIMESTAMP_FORMAT)
+        if self.replay_dir is not None:
+            try:
+                return datetime.strptime(self.replay_dir.resolve().name, self.TIMESTAMP_FORMAT)
+            except ValueError:
+                logger.warning("replay_dir_not_timestamped", replay_dir=str(self.replay_dir))
+        return datetime.now()
+
+    def _open_checkpoint(self, timestamp_str: str) -> PageCheckpoint:
+        """
+        Checkpoint every page fetched by the run's clients
+        
+        Args:
+            timestamp_str: Run timestamp
+            
+        Returns:
+            Checkpoint in ``data/raw/<timestamp>/.partial``
+        """
+        checkpoint = PageCheckpoint(self.base_dir / "data" / "raw" / timestamp_str / ".partial")
+        if self.resume is not None and not checkpoint.exists():
+            logger.warning("resume_checkpoint_missing", path=str(checkpoint.root))
+        self.client_factory.checkpoint = checkpoint
+        return checkpoint
+    
+    def _close_checkpoint(self, checkpoint: PageCheckpoint) -> None:
+        """
+        Drop a completed run's checkpoint
+        
+        Args:
+            checkpoint: Checkpoint opened by ``_open_checkpoint``
+        """
+        logger.info("checkpoint_stats", reused=checkpoint.hits, saved=checkpoint.saved)
+        checkpoint.clear()
+
+    async def _store_results(self, raw_results: Dict[str, Dict], processed_results: Dict[str, List[Resource]],
+                             timestamp: datetime, platforms: List[Platform]) -> Dict:
+        """
+        Save a run's raw and processed data and aggregate it
+        
+        Args:
+            raw_results: Raw data by platform, already on disk for streamed platforms
+            processed_results: Processed resources by platform
+            timestamp: Data collection timestamp of the run
+            platforms: Platforms of the run
+            
+        Returns:
+            Aggregated result
+            
+        Raises:
+            ScraperError: If every platform is degraded
+        """
+        timestamp_str = timestamp.strftime(self.TIMESTAMP_FORMAT)
+        if len(self.degraded) == len(platforms):
+            raise ScraperError(f"All platforms failed: {self.degraded}")
+        
+        # 儲存原始和處理後的資料（重播時原始資料已在快照中）
+        if self.replay_dir is None:
+            await self.storage.save_raw_data(raw_results, timestamp)
+        await self.storage.save_processed_data(processed_results, timestamp)
+        
+        # 執行資料聚合
+        aggregated_result = self.aggregator.aggregate(timestamp_str, degraded=self.degraded)
+        
+        # 輸出聚合結果
+        print("\n=== 聚合結果 ===")
+        print(f"總資源數: {aggregated_result['metadata']['total_resources']}")
+        print(f"平台: {aggregated_result['metadata']['platforms']}")
+        
+        print("\n資源統計:")
+        for tab in aggregated_result['resources']['tabs']:
+            res_type = tab['id']
+            categories = aggregated_result['resources']['resources'].get(res_type, {})
+            if categories:
+                print(f"\n{tab['label']}:")
+                for category, resources in categories.items():
+                    print(f"  {category}: {len(resources)} 個資源")
+        
+        logger.info("scraping_completed", 
+                   platform_count=len(platforms),
+                   total_resources=aggregated_result['metadata']['total_resources'])
+        
+        return aggregated_result
+
     async def run(self) -> Dict[str, List[Resource]]:
         """
         Execute the complete scraping process
@@ -149,74 +612,429 @@ class ScraperService:
         Raises:
             ScraperError: If the scraping process fails
         """
-        timestamp = datetime.now()
-        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
+        timestamp = self._get_run_timestamp()
+        timestamp_str = timestamp.strftime(self.TIMESTAMP_FORMAT)
+        if self.record:
+            self.client_factory.session_manager.recorder = HTTPRecorder(
+                self.base_dir / "data" / "raw" / timestamp_str / "http_record.jsonl"
+            )
         raw_results: Dict[str, Dict] = {}
         processed_results: Dict[str, List[Resource]] = {}
+        self.degraded = {}
+        checkpoint = self._open_checkpoint(timestamp_str) if self.replay_dir is None else None
         
-        platforms = [
-            Platform(name="modrinth", batch_size=100),
-            Platform(name="hangar", batch_size=50),
-            Platform(name="polymart", batch_size=100)
-        ]
+        platforms = self._get_platforms()
+        
+        # 每個平台一個 task：抓取一次後立即轉換，所有平台同時進行；
+        # 逾時或失敗的平台會被標記為 degraded，不會中斷整個流程
+        tasks = {
+            platform.name: asyncio.create_task(self._run_platform_guarded(platform, timestamp),
+                                               name=f"scrape_{platform.name}")
+            for platform in platforms
+        }
         
         try:
             # 抓取和處理資料
-            for platform in platforms:
-                # Fetch and store raw data
-                raw_data = await self.fetch_resources(platform.name)
-                raw_results[platform.name] = raw_data
-                
-                # Process and store transformed data
-                resources = await self.process_platform(platform)
+            try:
+                outcomes = await asyncio.gather(*tasks.values())
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+                raise
+            
+            for platform_name, outcome in zip(tasks, outcomes):
+                if outcome is None:
+                    continue
+                raw_data, resources = outcome
+                # 串流的平台已在抓取時寫入原始資料
+                if raw_data is not None:
+                    raw_results[platform_name] = raw_data
                 if resources:
-                    processed_results[platform.name] = resources
+                    processed_results[platform_name] = resources
             
-            # 儲存原始和處理後的資料
-            await self.storage.save_raw_data(raw_results, timestamp)
-            await self.storage.save_processed_data(processed_results, timestamp)
+            self._mark_tripped_platforms(platforms)
+            await self._store_results(raw_results, processed_results, timestamp, platforms)
+            if checkpoint is not None:
+                self._close_checkpoint(checkpoint)
             
-            # 執行資料聚合
-            aggregated_result = self.aggregator.aggregate(timestamp_str)
+            cache = self.client_factory.session_manager.cache
+            if cache is not None:
+                logger.info("http_cache_stats", hits=cache.hits, misses=cache.misses)
+            coalescer = self.client_factory.session_manager.coalescer
+            if coalescer is not None:
+                logger.info("http_coalesce_stats", coalesced=coalescer.coalesced, memo_hits=coalescer.memo_hits)
+            logger.info("http_concurrency_stats", hosts=self.client_factory.session_manager.concurrency.stats())
+            recorder = self.client_factory.session_manager.recorder
+            if recorder is not None:
+                logger.info("http_exchanges_recorded", count=recorder.count, path=str(recorder.path))
+            
+            return processed_results
+            
+        except ScraperError:
+            raise
+        except Exception as e:
+            logger.error("scraping_process_failed", error=str(e))
+            raise ScraperError(f"Scraping process failed: {str(e)}")
+        finally:
+            if self.replay_dir is None:
+                self._write_fetch_metrics(timestamp_str)
+            await self.client_factory.close()
+    
+    def _write_fetch_metrics(self, timestamp_str: str, path: Optional[Path] = None) -> None:
+        """
+        Write the run's fetch metrics next to its raw data
+        
+        Args:
+            timestamp_str: Run timestamp
+            path: Output file, ``data/raw/<timestamp>/fetch_metrics.json`` when omitted
+        """
+        path = path or self.base_dir / "data" / "raw" / timestamp_str / "fetch_metrics.json"
+        try:
+            self.client_factory.session_manager.write_metrics(path, timestamp=timestamp_str,
+                                                              degraded_platforms=self.degraded)
+        except OSError as e:
+            logger.warning("fetch_metrics_write_failed", path=str(path), error=str(e))
+            return
+        logger.info("fetch_metrics_written", path=str(path))
+    
+    def _work_queue(self, run_id: str) -> LeaseQueue:
+        """
+        Open the lease queue of a sharded run
+        
+        Args:
+            run_id: Run timestamp
+            
+        Returns:
+            Queue in ``data/work/<run_id>``
+        """
+        return LeaseQueue(self.base_dir / "data" / "work" / run_id,
+                          lease_timeout=self.sharding.get("lease_timeout", 120),
+                          max_attempts=self.sharding.get("max_attempts", 3))
+    
+    async def _plan_units(self, platforms: List[Platform]) -> List[WorkUnit]:
+        """
+        Split every platform's resource types into work units
+        
+        A platform whose planning fails is marked degraded and left out.
+        
+        Args:
+            platforms: Platforms of the run
+            
+        Returns:
+            Work units of all platforms
+        """
+        shard_size = self.sharding.get("shard_size", 1000)
+        units = []
+        for platform in platforms:
+            try:
+                client: BaseClient = self.client_factory.create(platform.name)
+                if not client.supports_sharding:
+                    raise ScraperError(f"Sharded fetching is not supported for {platform.name}")
+                for resource_type in self.config["platforms"][platform.name]["resource_types"]:
+                    ranges = await client.plan_ranges(resource_type, shard_size)
+                    units.extend(WorkUnit(platform.name, resource_type, start, end) for start, end in ranges)
+            except Exception as e:
+                logger.error("work_unit_planning_failed", platform=platform.name, error=str(e))
+                self.degraded[platform.name] = f"Planning failed: {str(e)}"
+                units = [unit for unit in units if unit.platform != platform.name]
+        return units
+    
+    def _start_workers(self, run_id: str, count: int) -> List[multiprocessing.Process]:
+        """
+        Start local worker processes draining a sharded run
+        
+        Args:
+            run_id: Run timestamp
+            count: Number of processes
+            
+        Returns:
+            The started processes
+        """
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_worker, args=(self.base_dir, run_id), name=f"scrape_worker_{index}")
+            for index in range(count)
+        ]
+        for process in processes:
+            process.start()
+        return processes
+    
+    async def run_sharded(self, workers: int) -> Dict[str, List[Resource]]:
+        """
+        Execute the scraping process split into work units
+        
+        The run is planned into (platform, resource type, offset range)
+        units queued in ``data/work/<timestamp>``. ``workers`` local
+        processes drain the queue, helped by any ``scraper worker`` started
+        on other hosts sharing the data directory. The units' results are
+        then merged into the usual raw and processed snapshots.
+        
+        Args:
+            workers: Number of local worker processes, 0 to rely on other hosts only
             
-            # 輸出聚合結果
-            print("\n=== 聚合結果 ===")
-            print(f"總資源數: {aggregated_result['metadata']['total_resources']}")
-            print(f"平台: {aggregated_result['metadata']['platforms']}")
+        Returns:
+            Dict mapping platform names to lists of Resource objects
             
-            print("\n資源統計:")
-            for tab in aggregated_result['resources']['tabs']:
-                res_type = tab['id']
-                categories = aggregated_result['resources']['resources'].get(res_type, {})
-                if categories:
-                    print(f"\n{tab['label']}:")
-                    for category, resources in categories.items():
-                        print(f"  {category}: {len(resources)} 個資源")
+        Raises:
+            ScraperError: If the scraping process fails
+        """
+        timestamp = self._get_run_timestamp()
+        run_id = timestamp.strftime(self.TIMESTAMP_FORMAT)
+        self.degraded = {}
+        platforms = self._get_platforms()
+        processes: List[multiprocessing.Process] = []
+        
+        try:
+            checkpoint = self._open_checkpoint(run_id)
+            queue = self._work_queue(run_id)
+            units = await self._plan_units(platforms)
+            queue.add(units)
+            logger.info("work_units_planned", run_id=run_id, unit_count=len(units), workers=workers)
             
-            logger.info("scraping_completed", 
-                       platform_count=len(platforms),
-                       total_resources=aggregated_result['metadata']['total_resources'])
+            processes = self._start_workers(run_id, workers)
+            poll_interval = self.sharding.get("poll_interval", 1.0)
+            while (pending := queue.pending()):
+                if processes and not any(process.is_alive() for process in processes):
+                    raise ScraperError(f"All local workers exited with {pending} work units pending")
+                await asyncio.sleep(poll_interval)
             
+            raw_results, processed_results = self._merge_units(queue, platforms)
+            await self._store_results(raw_results, processed_results, timestamp, platforms)
+            self._close_checkpoint(checkpoint)
             return processed_results
             
-        except (ResourceFetchError, ResourceProcessingError, StorageError) as e:
+        except ScraperError:
             raise
         except Exception as e:
             logger.error("scraping_process_failed", error=str(e))
             raise ScraperError(f"Scraping process failed: {str(e)}")
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            await self.client_factory.close()
+    
+    def _merge_units(self, queue: LeaseQueue,
+                     platforms: List[Platform]) -> Tuple[Dict[str, Dict], Dict[str, List[Resource]]]:
+        """
+        Combine the results of a sharded run's work units
+        
+        Raw items are concatenated per resource type in offset order. A
+        platform with failed units is kept but marked degraded.
+        
+        Args:
+            queue: Drained queue of the run
+            platforms: Platforms of the run
+            
+        Returns:
+            Tuple of (raw data by platform, processed resources by platform)
+        """
+        raw_results: Dict[str, Dict] = {}
+        processed_results: Dict[str, List[Resource]] = {}
+        failed: Dict[str, int] = {}
+        totals: Dict[str, int] = {}
+        
+        for unit in queue.units():
+            totals[unit.platform] = totals.get(unit.platform, 0) + 1
+            status = queue.status(unit) or {}
+            if status.get("status") != "ok":
+                failed[unit.platform] = failed.get(unit.platform, 0) + 1
+                continue
+            
+            result = queue.result(unit)
+            type_data = raw_results.setdefault(unit.platform, {}).setdefault(
+                unit.resource_type, {result["items_key"]: [], "total": 0}
+            )
+            type_data[result["items_key"]].extend(result["items"])
+            type_data["total"] += len(result["items"])
+            processed_results.setdefault(unit.platform, []).extend(
+                Resource.from_dict(resource) for resource in result["resources"]
+            )
+        
+        for platform in platforms:
+            if failed.get(platform.name):
+                self.degraded[platform.name] = (
+                    f"{failed[platform.name]} of {totals[platform.name]} work units failed"
+                )
+        
+        logger.info("work_units_merged",
+                   unit_count=sum(totals.values()),
+                   failed_count=sum(failed.values()))
+        self._merge_worker_metrics(queue)
+        return raw_results, processed_results
+    
+    def _merge_worker_metrics(self, queue: LeaseQueue) -> None:
+        """
+        Combine the workers' fetch metrics into the run's ``fetch_metrics.json``
+        
+        Counters and latency histograms of every worker and of the planning
+        requests are added up per host. Concurrency limits and rates are live
+        state of each worker's session, so they are kept per worker.
+        
+        Args:
+            queue: Drained queue of the run
+        """
+        run_id = queue.root.name
+        session_manager = self.client_factory.session_manager
+        merged = FetchMetrics()
+        merged.add_dict(session_manager.metrics.to_dict())
+        workers = {}
+        for path in sorted((queue.root / "metrics").glob("*.json")):
+            try:
+                data = codec.read_json(path)
+            except (OSError, ValueError) as e:
+                logger.warning("worker_metrics_unreadable", path=str(path), error=str(e))
+                continue
+            merged.add_dict(data)
+            workers[path.stem] = {
+                host: {section: host_data[section] for section in ("concurrency", "rate_limit") if section in host_data}
+                for host, host_data in data.get("hosts", {}).items()
+            }
+        
+        path = self.base_dir / "data" / "raw" / run_id / "fetch_metrics.json"
+        try:
+            merged.write(path, timestamp=run_id, degraded_platforms=self.degraded, workers=workers)
+        except OSError as e:
+            logger.warning("fetch_metrics_write_failed", path=str(path), error=str(e))
+            return
+        logger.info("fetch_metrics_written", path=str(path), worker_count=len(workers))
+    
+    async def work(self, run_id: Optional[str] = None) -> int:
+        """
+        Drain the work units of a sharded run
+        
+        Units are leased one at a time; the lease is renewed while the unit
+        runs, and a unit whose worker dies is taken over by another worker
+        once its lease expires. Returns when no unit is pending any more.
+        
+        Args:
+            run_id: Run timestamp, the latest run in ``data/work`` when omitted
+            
+        Returns:
+            Number of units completed by this worker
+            
+        Raises:
+            ScraperError: If there is no sharded run to work on
+        """
+        work_dir = self.base_dir / "data" / "work"
+        if run_id is None:
+            runs = sorted(d.name for d in work_dir.iterdir() if d.is_dir()) if work_dir.exists() else []
+            if not runs:
+                raise ScraperError(f"No sharded run found in {work_dir}")
+            run_id = runs[-1]
+        
+        queue = self._work_queue(run_id)
+        self._open_checkpoint(run_id)
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        metrics_path = queue.root / "metrics" / f"{worker_id}.json"
+        lease_timeout = self.sharding.get("lease_timeout", 120)
+        poll_interval = self.sharding.get("poll_interval", 1.0)
+        completed = 0
+        logger.info("worker_started", run_id=run_id, worker=worker_id)
+        
+        async def keep_leased(unit: WorkUnit) -> None:
+            while True:
+                await asyncio.sleep(lease_timeout / 3)
+                queue.heartbeat(unit)
+        
+        try:
+            while True:
+                unit = queue.claim(worker_id)
+                if unit is None:
+                    if not queue.pending():
+                        break
+                    # Remaining units are leased by other workers
+                    await asyncio.sleep(poll_interval)
+                    continue
+                
+                heartbeat = asyncio.create_task(keep_leased(unit))
+                try:
+                    result = await self._run_unit(unit)
+                except Exception as e:
+                    logger.error("work_unit_attempt_failed", unit=unit.unit_id, worker=worker_id, error=str(e))
+                    self._write_fetch_metrics(run_id, metrics_path)
+                    queue.fail(unit, str(e))
+                    continue
+                finally:
+                    heartbeat.cancel()
+                # 指標先於完成標記寫入，協調者合併時即包含此工作單元的請求
+                self._write_fetch_metrics(run_id, metrics_path)
+                queue.complete(unit, result)
+                completed += 1
+                logger.info("work_unit_completed", unit=unit.unit_id, worker=worker_id,
+                           item_count=len(result["items"]))
+        finally:
+            self._write_fetch_metrics(run_id, metrics_path)
+            await self.client_factory.close()
+        
+        logger.info("worker_finished", run_id=run_id, worker=worker_id, completed=completed)
+        return completed
+    
+    async def _run_unit(self, unit: WorkUnit) -> Dict:
+        """
+        Fetch and transform one work unit
+        
+        Args:
+            unit: Leased work unit
+            
+        Returns:
+            Result with the raw items, their payload key and the processed resources
+        """
+        client: BaseClient = self.client_factory.create(unit.platform)
+        items = await client.fetch_range(unit.resource_type, unit.start, unit.end)
+        resources = await asyncio.to_thread(self._transform_page, unit.platform,
+                                            self.transformers[unit.platform], unit.resource_type, items)
+        return {
+            "items_key": client.raw_items_key,
+            "items": items,
+            "resources": [resource.to_dict() for resource in resources]
+        }
+
+def run_worker(storage_dir: Optional[Path] = None, run_id: Optional[str] = None) -> int:
+    """
+    Worker process entry point for sharded runs
+    
+    Args:
+        storage_dir: Base directory for data storage
+        run_id: Run timestamp, the latest sharded run when omitted
+        
+    Returns:
+        Number of units completed by this worker
+    """
+    return asyncio.run(ScraperService(storage_dir=storage_dir).work(run_id))
 
-async def main() -> Dict[str, List[Resource]]:
+async def main(storage_dir: Optional[Path] = None,
+               replay_dir: Optional[Path] = None,
+               record: bool = False,
+               incremental: bool = False,
+               workers: Optional[int] = None,
+               resume: Optional[str] = None,
+               platforms: Optional[List[str]] = None) -> Dict[str, List[Resource]]:
     """
     Service entry point
     
+    Args:
+        storage_dir: Base directory for data storage
+        replay_dir: Raw snapshot directory to replay instead of calling the platform APIs
+        record: Record every request/response pair of the run
+        incremental: Fetch only changes since the previous processed snapshot where supported
+        workers: Split the run into work units drained by this many local worker processes
+        resume: Timestamp of an interrupted run to continue
+        platforms: Only scrape these configured platforms
+    
     Returns:
         Dict mapping platform names to lists of Resource objects
         
     Raises:
         ScraperError: If service execution fails
     """
-    service = ScraperService()
+    service = ScraperService(storage_dir=storage_dir, replay_dir=replay_dir, record=record,
+                             incremental=incremental, resume=resume, platforms=platforms)
     try:
+        if workers is not None:
+            return await service.run_sharded(workers)
         return await service.run()
     except Exception as e:
         logger.error("service_execution_failed", error=str(e))
@@ -2,18 +2,121 @@
 JSON file storage implementation
 """
 
-import json
 import logging
-from typing import Dict, List, Any, Union
+import os
+from typing import Dict, IO, List, Any, Optional, Union
 from datetime import datetime
 from pathlib import Path
 
 from .base import BaseStorage
 from ...models.resource import Resource
 from ...config import get_config
+from ...utils import codec
 
 logger = logging.getLogger(__name__)
 
+class RawStreamWriter:
+    """
+    Writes raw resources to per-type raw files one item at a time
+    
+    Produces the same ``{platform}_{type}_raw.json`` files with a
+    ``{"result": [...], "total": n}`` payload (``hits`` instead of
+    ``result`` for Modrinth) as ``save_raw_data``, without
+    holding the platform's payload in memory. Items go to temporary files
+    that are only moved into place by ``close``; leaving the writer through
+    an exception discards them, so an interrupted stream never looks like a
+    complete snapshot.
+    """
+    
+    def __init__(self, timestamp_dir: Path, platform: str, items_key: str = "result") -> None:
+        """
+        Initialize the writer
+        
+        Args:
+            timestamp_dir: Raw data directory of the run
+            platform: Platform identifier
+            items_key: Key holding the items in the payload (``hits`` for Modrinth)
+        """
+        self.timestamp_dir = timestamp_dir
+        self.platform = platform
+        self.items_key = items_key
+        self._files: Dict[str, IO[bytes]] = {}
+        self._counts: Dict[str, int] = {}
+    
+    def write(self, resource_type: str, item: Dict[str, Any]) -> None:
+        """
+        Append a raw resource to its type's file
+        
+        Args:
+            resource_type: Resource type of the item
+            item: Raw resource data
+        """
+        f = self._files.get(resource_type)
+        if f is None:
+            self.timestamp_dir.mkdir(parents=True, exist_ok=True)
+            logger.info("Streaming raw data for %s %s to %s", self.platform, resource_type,
+                        self._file_path(resource_type))
+            f = self._files[resource_type] = open(self._partial_path(resource_type), "wb")
+            self._counts[resource_type] = 0
+            f.write(b'{' + codec.dumps(self.items_key) + b': [\n')
+        elif self._counts[resource_type]:
+            f.write(b",\n")
+        f.write(codec.dumps(item))
+        self._counts[resource_type] += 1
+    
+    def write_page(self, resource_type: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Append a page of raw resources to their type's file
+        
+        Args:
+            resource_type: Resource type of the items
+            items: Raw resource data
+        """
+        for item in items:
+            self.write(resource_type, item)
+    
+    def _file_path(self, resource_type: str) -> Path:
+        """Path of a type's raw file"""
+        return self.timestamp_dir / f"{self.platform}_{resource_type}_raw.json"
+    
+    def _partial_path(self, resource_type: str) -> Path:
+        """Temporary path a type's raw file is written to until the stream completes"""
+        return self.timestamp_dir / f".{self.platform}_{resource_type}_raw.json.partial"
+    
+    def close(self) -> None:
+        """Terminate every open file and move it into place"""
+        for resource_type, f in self._files.items():
+            f.write(f'\n], "total": {self._counts[resource_type]}}}\n'.encode())
+            f.close()
+            os.replace(self._partial_path(resource_type), self._file_path(resource_type))
+        self._files.clear()
+    
+    def discard(self, resource_types: Optional[List[str]] = None) -> None:
+        """
+        Close and delete open files instead of completing them
+        
+        Args:
+            resource_types: Types whose files are discarded, every open file when None
+        """
+        if resource_types is None:
+            resource_types = list(self._files)
+        for resource_type in resource_types:
+            f = self._files.pop(resource_type, None)
+            if f is None:
+                continue
+            f.close()
+            self._partial_path(resource_type).unlink(missing_ok=True)
+            logger.warning("Discarded incomplete raw data for %s %s", self.platform, resource_type)
+    
+    def __enter__(self) -> "RawStreamWriter":
+        return self
+    
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
 class JsonStorage(BaseStorage):
     """Storage implementation using JSON files"""
     
@@ -53,8 +156,7 @@ class JsonStorage(BaseStorage):
                     for resource_type, type_data in platform_data.items():
                         file_path = timestamp_dir / f"{platform}_{resource_type}_raw.json"
                         logger.info("Saving raw data for %s %s to %s", platform, resource_type, file_path)
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            json.dump(type_data, f, indent=2, ensure_ascii=False)
+                        codec.write_json(file_path, type_data)
                 else:
                     # For platforms with single resource type (like Hangar)
                     # Extract the result data and save it with the resource type
@@ -62,19 +164,32 @@ class JsonStorage(BaseStorage):
                         result_data = platform_data.get("result", [])
                         file_path = timestamp_dir / f"{platform}_plugin_raw.json"
                         logger.info("Saving raw data for %s to %s", platform, file_path)
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            json.dump({"result": result_data}, f, indent=2, ensure_ascii=False)
+                        codec.write_json(file_path, {"result": result_data})
                     else:
                         # For other single type platforms
                         file_path = timestamp_dir / f"{platform}_raw.json"
                         logger.info("Saving raw data for %s to %s", platform, file_path)
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            json.dump(platform_data, f, indent=2, ensure_ascii=False)
+                        codec.write_json(file_path, platform_data)
                     
         except Exception as e:
             logger.error("Failed to save raw data: %s", str(e))
             raise
     
+    def open_raw_stream(self, timestamp: datetime, platform: str, items_key: str = "result") -> RawStreamWriter:
+        """
+        Open a writer streaming a platform's raw resources to disk
+        
+        Args:
+            timestamp: Data collection timestamp
+            platform: Platform identifier
+            items_key: Key holding the items in each type's payload
+            
+        Returns:
+            Writer to use as a context manager
+        """
+        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
+        return RawStreamWriter(self.base_dir / "data" / "raw" / timestamp_str, platform, items_key)
+    
     async def save_processed_data(self, resources: Dict[str, List[Resource]], timestamp: datetime) -> None:
         """
         Save processed resource data as JSON
@@ -102,12 +217,11 @@ class JsonStorage(BaseStorage):
                     grouped_resources[resource_type].append(resource_dict)
                 
                 logger.info("Saving processed data for %s to %s", platform, file_path)
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump({
-                        "timestamp": timestamp.isoformat(),
-                        "platform": platform,
-                        "resources": grouped_resources
-                    }, f, indent=2, ensure_ascii=False)
+                codec.write_json(file_path, {
+                    "timestamp": timestamp,
+                    "platform": platform,
+                    "resources": grouped_resources
+                })
                     
         except Exception as e:
             logger.error("Failed to save processed data: %s", str(e))
@@ -123,13 +237,22 @@ class JsonStorage(BaseStorage):
         Returns:
             Resource object
         """
-        # Convert datetime strings to datetime objects
-        if "created_at" in data:
-            data["created_at"] = datetime.fromisoformat(data["created_at"].replace("Z", "+00:00"))
-        if "updated_at" in data:
-            data["updated_at"] = datetime.fromisoformat(data["updated_at"].replace("Z", "+00:00"))
-            
-        return Resource(**data)
+        return Resource.from_dict(data)
+    
+    def list_processed_timestamps(self) -> List[str]:
+        """
+        List the timestamps that have processed data.
+        
+        Returns:
+            Timestamp directory names, oldest first
+        """
+        processed_dir = self.base_dir / "data" / "processed"
+        if not processed_dir.exists():
+            return []
+        return sorted(
+            d.name for d in processed_dir.iterdir()
+            if d.is_dir() and not d.is_symlink()
+        )
     
     def load_processed_data(self, timestamp: str, platform: str) -> List[Resource]:
         """
@@ -146,15 +269,14 @@ class JsonStorage(BaseStorage):
         if not file_path.exists():
             return []
             
-        with open(file_path) as f:
-            data = json.load(f)
-            resources = []
-            for resource_type, type_resources in data.get("resources", {}).items():
-                for resource in type_resources:
-                    # 加回 resource_type
-                    resource["resource_type"] = resource_type
-                    resources.append(self._parse_resource(resource))
-            return resources
+        data = codec.read_json(file_path)
+        resources = []
+        for resource_type, type_resources in data.get("resources", {}).items():
+            for resource in type_resources:
+                # 加回 resource_type
+                resource["resource_type"] = resource_type
+                resources.append(self._parse_resource(resource))
+        return resources
     
     def save_aggregated_data(self, timestamp: str, data: Dict) -> None:
         """
@@ -170,5 +292,4 @@ class JsonStorage(BaseStorage):
         
         # Save aggregated data
         output_file = output_dir / "aggregated.json"
-        with open(output_file, "w") as f:
-            json.dump(data, f, indent=2, default=str) 
\ No newline at end of file
+        codec.write_json(output_file, data) 
\ No newline at end of file
@@ -20,4 +20,22 @@ class BaseTransformer(ABC):
         Returns:
             List of normalized Resource objects
         """
-        pass 
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def transform_item(self, resource_type: str, item: Dict) -> Resource:
+        """
+        Transform a single raw item into a normalized resource
+        
+        Args:
+            resource_type: Resource type the item was fetched as
+            item: Raw item from platform API
+            
+        Returns:
+            Normalized Resource object
+            
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+        """
+        pass
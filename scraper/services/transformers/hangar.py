@@ -25,62 +25,79 @@ class HangarTransformer(BaseTransformer):
             List of normalized Resource objects
         """
         resources = []
+        total_results = 0
         
         try:
-            # 從新的資料結構中取得 plugin 類型的資源
-            plugin_data = raw_data.get("plugin", {})
-            results = plugin_data.get("result", [])
-            
-            for result in results:
-                try:
-                    # Get stats safely
-                    stats = result.get("stats", {})
-                    if not isinstance(stats, dict):
-                        stats = {}
-                    
-                    # Get dates safely
-                    created_at = result.get("createdAt", "2025-01-01T00:00:00Z")
-                    updated_at = result.get("lastUpdated", created_at)
-                    
-                    # Get namespace info safely
-                    namespace = result.get("namespace", {})
-                    if not isinstance(namespace, dict):
-                        namespace = {}
-                    
-                    # Create resource object
-                    resource = Resource(
-                        id=str(result["id"]),
-                        name=result["name"],
-                        description=result.get("description", ""),
-                        author=namespace.get("owner", "Unknown"),
-                        downloads=stats.get("downloads", 0),
-                        resource_type="plugin",  # Hangar only hosts plugins
-                        platform="hangar",
-                        created_at=datetime.fromisoformat(created_at.replace("Z", "+00:00")),
-                        updated_at=datetime.fromisoformat(updated_at.replace("Z", "+00:00")),
-                        versions=result.get("gameVersions", []),
-                        categories=result.get("categories", []),
-                        website_url=f"https://hangar.papermc.io/{namespace.get('owner', 'unknown')}/{result['name']}",
-                        source_url=None,  # Not available in API response
-                        license=result.get("licenseName", "unknown")
-                    )
-                    resources.append(resource)
-                except KeyError as e:
-                    logger.warning("missing_required_field", 
-                                 error=str(e), 
-                                 resource_id=result.get("id", "unknown"))
-                    continue
-                except ValueError as e:
-                    logger.warning("invalid_data", 
-                                 error=str(e), 
-                                 resource_id=result.get("id", "unknown"))
-                    continue
+            # 遍歷每個資源類型
+            for resource_type, type_data in raw_data.items():
+                results = type_data.get("result", [])
+                total_results += len(results)
+                
+                for result in results:
+                    try:
+                        resources.append(self.transform_item(resource_type, result))
+                    except KeyError as e:
+                        logger.warning("missing_required_field", 
+                                     error=str(e), 
+                                     resource_id=result.get("id", "unknown"))
+                        continue
+                    except ValueError as e:
+                        logger.warning("invalid_data", 
+                                     error=str(e), 
+                                     resource_id=result.get("id", "unknown"))
+                        continue
                 
             logger.info("hangar_resources_transformed", 
                        resource_count=len(resources),
-                       total_results=len(results))
+                       total_results=total_results)
             return resources
             
         except Exception as e:
             logger.error("hangar_transform_failed", error=str(e))
-            raise ValueError(f"Failed to transform Hangar data: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Failed to transform Hangar data: {str(e)}")
+    
+    def transform_item(self, resource_type: str, result: Dict) -> Resource:
+        """
+        Transform a single Hangar project into a normalized resource
+        
+        Args:
+            resource_type: Resource type the project was fetched as
+            result: Project data from Hangar API
+            
+        Returns:
+            Normalized Resource object
+            
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+        """
+        # Get stats safely
+        stats = result.get("stats", {})
+        if not isinstance(stats, dict):
+            stats = {}
+        
+        # Get dates safely
+        created_at = result.get("createdAt", "2025-01-01T00:00:00Z")
+        updated_at = result.get("lastUpdated", created_at)
+        
+        # Get namespace info safely
+        namespace = result.get("namespace", {})
+        if not isinstance(namespace, dict):
+            namespace = {}
+        
+        return Resource(
+            id=str(result["id"]),
+            name=result["name"],
+            description=result.get("description", ""),
+            author=namespace.get("owner", "Unknown"),
+            downloads=stats.get("downloads", 0),
+            resource_type=resource_type,
+            platform="hangar",
+            created_at=datetime.fromisoformat(created_at.replace("Z", "+00:00")),
+            updated_at=datetime.fromisoformat(updated_at.replace("Z", "+00:00")),
+            versions=result.get("gameVersions", []),
+            categories=result.get("categories", []),
+            website_url=f"https://hangar.papermc.io/{namespace.get('owner', 'unknown')}/{result['name']}",
+            source_url=None,  # Not available in API response
+            license=result.get("licenseName", "unknown")
+        )
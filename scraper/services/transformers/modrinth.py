@@ -32,46 +32,7 @@ class ModrinthTransformer(BaseTransformer):
                 hits = type_data.get("hits", [])
                 for hit in hits:
                     try:
-                        # Get license info safely
-                        license_id = "unknown"
-                        license_data = hit.get("license", {})
-                        if isinstance(license_data, dict):
-                            license_id = license_data.get("id", "unknown")
-                        elif isinstance(license_data, str):
-                            license_id = license_data
-                        
-                        # Create website URL based on project type
-                        if resource_type == "mod":
-                            website_url = f"https://modrinth.com/mod/{hit.get('slug', hit['project_id'])}"
-                        elif resource_type == "plugin":
-                            website_url = f"https://modrinth.com/plugin/{hit.get('slug', hit['project_id'])}"
-                        elif resource_type == "modpack":
-                            website_url = f"https://modrinth.com/modpack/{hit.get('slug', hit['project_id'])}"
-                        elif resource_type == "resourcepack":
-                            website_url = f"https://modrinth.com/resourcepack/{hit.get('slug', hit['project_id'])}"
-                        elif resource_type == "datapack":
-                            website_url = f"https://modrinth.com/datapack/{hit.get('slug', hit['project_id'])}"
-                        else:
-                            website_url = f"https://modrinth.com/project/{hit.get('slug', hit['project_id'])}"
-                        
-                        # Create resource object
-                        resource = Resource(
-                            id=hit["project_id"],
-                            name=hit["title"],
-                            description=hit.get("description", ""),
-                            author=hit.get("author", "Unknown"),
-                            downloads=hit.get("downloads", 0),
-                            resource_type=resource_type,  # Use actual project type
-                            platform="modrinth",
-                            created_at=datetime.fromisoformat(hit.get("date_created", "2025-01-01T00:00:00Z")),
-                            updated_at=datetime.fromisoformat(hit.get("date_modified", "2025-01-01T00:00:00Z")),
-                            versions=hit.get("versions", []),
-                            categories=hit.get("categories", []),
-                            website_url=website_url,
-                            source_url=hit.get("source_url"),
-                            license=license_id
-                        )
-                        resources.append(resource)
+                        resources.append(self.transform_item(resource_type, hit))
                     except KeyError as e:
                         logger.warning("missing_required_field", 
                                      error=str(e), 
@@ -93,4 +54,64 @@ class ModrinthTransformer(BaseTransformer):
             
         except Exception as e:
             logger.error("modrinth_transform_failed", error=str(e))
-            raise ValueError(f"Failed to transform Modrinth data: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Failed to transform Modrinth data: {str(e)}")
+    
+    def transform_item(self, resource_type: str, hit: Dict) -> Resource:
+        """
+        Transform a single Modrinth search hit into a normalized resource
+        
+        Args:
+            resource_type: Resource type the hit was fetched as
+            hit: Search hit from Modrinth API
+            
+        Returns:
+            Normalized Resource object
+            
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+        """
+        # Get license info safely
+        license_id = "unknown"
+        license_data = hit.get("license", {})
+        if isinstance(license_data, dict):
+            license_id = license_data.get("id", "unknown")
+        elif isinstance(license_data, str):
+            license_id = license_data
+        
+        # Create website URL based on project type
+        if resource_type == "mod":
+            website_url = f"https://modrinth.com/mod/{hit.get('slug', hit['project_id'])}"
+        elif resource_type == "plugin":
+            website_url = f"https://modrinth.com/plugin/{hit.get('slug', hit['project_id'])}"
+        elif resource_type == "modpack":
+            website_url = f"https://modrinth.com/modpack/{hit.get('slug', hit['project_id'])}"
+        elif resource_type == "resourcepack":
+            website_url = f"https://modrinth.com/resourcepack/{hit.get('slug', hit['project_id'])}"
+        elif resource_type == "datapack":
+            website_url = f"https://modrinth.com/datapack/{hit.get('slug', hit['project_id'])}"
+        else:
+            website_url = f"https://modrinth.com/project/{hit.get('slug', hit['project_id'])}"
+        
+        # Project details from the bulk /projects enrichment, if any
+        enrichment = hit.get("enrichment", {})
+        
+        return Resource(
+            id=hit["project_id"],
+            name=hit["title"],
+            description=hit.get("description", ""),
+            author=hit.get("author", "Unknown"),
+            downloads=hit.get("downloads", 0),
+            resource_type=resource_type,  # Use actual project type
+            platform="modrinth",
+            created_at=datetime.fromisoformat(hit.get("date_created", "2025-01-01T00:00:00Z")),
+            updated_at=datetime.fromisoformat(hit.get("date_modified", "2025-01-01T00:00:00Z")),
+            versions=enrichment.get("game_versions") or hit.get("versions", []),
+            categories=hit.get("categories", []),
+            website_url=website_url,
+            source_url=hit.get("source_url"),
+            license=license_id,
+            followers=enrichment.get("followers", hit.get("follows", 0)),
+            loaders=enrichment.get("loaders", []),
+            gallery_count=enrichment.get("gallery_count", len(hit.get("gallery") or []))
+        )
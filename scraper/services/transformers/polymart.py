@@ -37,54 +37,7 @@ class PolymartTransformer(BaseTransformer):
 
                 for resource in resources_data:
                     try:
-                        # Get version info
-                        version = resource.get("version", "")
-                        versions = [version] if version else []
-                        
-                        # Get author info
-                        author = "Unknown"
-                        author_data = resource.get("owner", {})
-                        if isinstance(author_data, dict):
-                            author = author_data.get("name", "Unknown")
-                        
-                        # Create website URL
-                        website_url = resource.get("url", "")
-                        if not website_url:
-                            website_url = f"https://polymart.org/resource/{resource.get('id', '')}"
-                        
-                        # Parse timestamps
-                        try:
-                            created_at = datetime.fromtimestamp(resource.get("creationTime", 0))
-                            updated_at = datetime.fromtimestamp(resource.get("lastUpdateTime", 0))
-                        except (ValueError, TypeError):
-                            created_at = datetime.now()
-                            updated_at = datetime.now()
-                            
-                        # Get categories
-                        categories = []
-                        if resource.get("supportedServerSoftware"):
-                            categories.extend(
-                                [s.strip().lower() for s in resource["supportedServerSoftware"].split(",")]
-                            )
-                        
-                        # Create resource object
-                        resource_obj = Resource(
-                            id=str(resource.get("id", "")),
-                            name=resource.get("title", "Unknown"),
-                            description=resource.get("subtitle", "") or "",
-                            author=author,
-                            downloads=resource.get("downloads", 0),
-                            resource_type=resource_type,
-                            platform="polymart",
-                            created_at=created_at,
-                            updated_at=updated_at,
-                            versions=versions,
-                            categories=categories,
-                            website_url=website_url,
-                            source_url=resource.get("sourceCodeLink"),
-                            license="unknown"
-                        )
-                        resources.append(resource_obj)
+                        resources.append(self.transform_item(resource_type, resource))
                     except KeyError as e:
                         logger.warning("missing_required_field", 
                                      error=str(e), 
@@ -106,4 +59,66 @@ class PolymartTransformer(BaseTransformer):
             
         except Exception as e:
             logger.error("polymart_transform_failed", error=str(e))
-            raise ValueError(f"Failed to transform Polymart data: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Failed to transform Polymart data: {str(e)}")
+    
+    def transform_item(self, resource_type: str, resource: Dict) -> Resource:
+        """
+        Transform a single Polymart search result into a normalized resource
+        
+        Args:
+            resource_type: Resource type the result was fetched as
+            resource: Search result from Polymart API
+            
+        Returns:
+            Normalized Resource object
+            
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+        """
+        # Get version info
+        version = resource.get("version", "")
+        versions = [version] if version else []
+        
+        # Get author info
+        author = "Unknown"
+        author_data = resource.get("owner", {})
+        if isinstance(author_data, dict):
+            author = author_data.get("name", "Unknown")
+        
+        # Create website URL
+        website_url = resource.get("url", "")
+        if not website_url:
+            website_url = f"https://polymart.org/resource/{resource.get('id', '')}"
+        
+        # Parse timestamps
+        try:
+            created_at = datetime.fromtimestamp(resource.get("creationTime", 0))
+            updated_at = datetime.fromtimestamp(resource.get("lastUpdateTime", 0))
+        except (ValueError, TypeError):
+            created_at = datetime.now()
+            updated_at = datetime.now()
+            
+        # Get categories
+        categories = []
+        if resource.get("supportedServerSoftware"):
+            categories.extend(
+                [s.strip().lower() for s in resource["supportedServerSoftware"].split(",")]
+            )
+        
+        return Resource(
+            id=str(resource.get("id", "")),
+            name=resource.get("title", "Unknown"),
+            description=resource.get("subtitle", "") or "",
+            author=author,
+            downloads=resource.get("downloads", 0),
+            resource_type=resource_type,
+            platform="polymart",
+            created_at=created_at,
+            updated_at=updated_at,
+            versions=versions,
+            categories=categories,
+            website_url=website_url,
+            source_url=resource.get("sourceCodeLink"),
+            license="unknown"
+        )
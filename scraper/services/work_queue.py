@@ -0,0 +1,263 @@
+"""
+File-based lease queue distributing scrape work units between processes
+
+The queue lives in a directory on the data volume, so workers in several
+processes, or on several hosts sharing the volume, can drain it together.
+Only atomic filesystem operations are used: a unit is leased by creating
+its lock file with ``O_EXCL``, a stale lease (no heartbeat within
+``lease_timeout``) is taken over by renaming the lock file away first, and
+results are written to a temporary file and moved into place.
+
+Layout::
+
+    units/<unit_id>.json     unit definitions
+    leases/<unit_id>.lock    current lease, its mtime is the last heartbeat
+    failures/<unit_id>.json  errors of failed attempts
+    results/<unit_id>.json   output of completed units
+    done/<unit_id>.json      completion marker, ``ok`` or ``failed``
+"""
+
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from scraper.utils import codec
+
+logger = structlog.get_logger(__name__)
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """
+    A slice of one platform's resource type
+    
+    Attributes:
+        platform: Platform identifier
+        resource_type: Resource type to fetch
+        start: Offset of the first resource
+        end: Offset past the last resource, until the listing ends when None
+    """
+    platform: str
+    resource_type: str
+    start: int = 0
+    end: Optional[int] = None
+    
+    @property
+    def unit_id(self) -> str:
+        """Identifier of the unit, sorting in platform, type and offset order"""
+        return f"{self.platform}__{self.resource_type}__{self.start:09d}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the unit to a dict"""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkUnit":
+        """Create a unit from ``to_dict`` output"""
+        return cls(**data)
+
+def _write_atomic(path: Path, data: Any) -> None:
+    """Write JSON next to ``path`` and move it into place"""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    codec.write_json(tmp_path, data)
+    os.replace(tmp_path, path)
+
+class LeaseQueue:
+    """Work unit queue shared through a directory"""
+    
+    def __init__(self, root: Path, lease_timeout: float = 120.0, max_attempts: int = 3) -> None:
+        """
+        Initialize the queue
+        
+        Args:
+            root: Queue directory
+            lease_timeout: Seconds without heartbeat after which a lease may be taken over
+            max_attempts: Attempts per unit before it is marked failed
+        """
+        self.root = root
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        for name in ("units", "leases", "failures", "results", "done"):
+            (root / name).mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, kind: str, unit_id: str, suffix: str = ".json") -> Path:
+        """Path of one of a unit's files"""
+        return self.root / kind / f"{unit_id}{suffix}"
+    
+    def add(self, units: List[WorkUnit]) -> int:
+        """
+        Add units, keeping the ones already queued
+        
+        Args:
+            units: Units to add
+        
+        Returns:
+            Number of units added
+        """
+        added = 0
+        for unit in units:
+            path = self._path("units", unit.unit_id)
+            if not path.exists():
+                _write_atomic(path, unit.to_dict())
+                added += 1
+        return added
+    
+    def units(self) -> List[WorkUnit]:
+        """
+        Get every queued unit
+        
+        Returns:
+            Units in identifier order
+        """
+        return [WorkUnit.from_dict(codec.read_json(path))
+                for path in sorted((self.root / "units").glob("*.json"))]
+    
+    def is_done(self, unit: WorkUnit) -> bool:
+        """Whether a unit has completed or failed for good"""
+        return self._path("done", unit.unit_id).exists()
+    
+    def claim(self, worker_id: str) -> Optional[WorkUnit]:
+        """
+        Lease the first unit that is neither done nor leased
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+        
+        Returns:
+            The leased unit, or None if no unit is available right now
+        """
+        for unit in self.units():
+            if not self.is_done(unit) and self._acquire(unit, worker_id):
+                # It may have completed between the check and the lease
+                if self.is_done(unit):
+                    self.release(unit)
+                    continue
+                return unit
+        return None
+    
+    def _acquire(self, unit: WorkUnit, worker_id: str) -> bool:
+        """Create the unit's lock file, taking over a stale lease"""
+        lock_path = self._path("leases", unit.unit_id, ".lock")
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._break_stale_lease(unit, lock_path, worker_id):
+                    return False
+                continue
+            with os.fdopen(fd, "wb") as f:
+                f.write(codec.dumps({"worker": worker_id, "leased_at": time.time()}))
+            return True
+        return False
+    
+    def _break_stale_lease(self, unit: WorkUnit, lock_path: Path, worker_id: str) -> bool:
+        """Remove an expired lock file; only one of several racing workers succeeds"""
+        try:
+            if time.time() - lock_path.stat().st_mtime < self.lease_timeout:
+                return False
+            stale_path = lock_path.with_name(f"{lock_path.name}.stale.{worker_id}")
+            os.rename(lock_path, stale_path)
+        except FileNotFoundError:
+            # Released or taken over by someone else meanwhile
+            return True
+        stale_path.unlink(missing_ok=True)
+        logger.warning("work_unit_lease_expired", unit=unit.unit_id, worker=worker_id)
+        # 反覆拖垮 worker 的工作單元同樣受 max_attempts 限制
+        self._check_exhausted(unit, self._record_failure(unit, "lease expired"), "lease expired")
+        return True
+    
+    def heartbeat(self, unit: WorkUnit) -> None:
+        """
+        Renew a held lease
+        
+        Args:
+            unit: Leased unit
+        """
+        try:
+            os.utime(self._path("leases", unit.unit_id, ".lock"))
+        except FileNotFoundError:
+            logger.warning("work_unit_lease_lost", unit=unit.unit_id)
+    
+    def release(self, unit: WorkUnit) -> None:
+        """
+        Give a lease up without completing the unit
+        
+        Args:
+            unit: Leased unit
+        """
+        self._path("leases", unit.unit_id, ".lock").unlink(missing_ok=True)
+    
+    def complete(self, unit: WorkUnit, result: Dict[str, Any]) -> None:
+        """
+        Store a unit's result and mark it done
+        
+        Args:
+            unit: Leased unit
+            result: JSON-serializable output of the unit
+        """
+        _write_atomic(self._path("results", unit.unit_id), result)
+        _write_atomic(self._path("done", unit.unit_id), {"status": "ok"})
+        self.release(unit)
+    
+    def fail(self, unit: WorkUnit, error: str) -> None:
+        """
+        Record a failed attempt, marking the unit failed once attempts run out
+        
+        Args:
+            unit: Leased unit
+            error: Failure description
+        """
+        self._check_exhausted(unit, self._record_failure(unit, error), error)
+        self.release(unit)
+    
+    def _check_exhausted(self, unit: WorkUnit, attempts: int, error: str) -> None:
+        """Mark a unit failed for good once its attempts reach ``max_attempts``"""
+        if attempts >= self.max_attempts:
+            _write_atomic(self._path("done", unit.unit_id), {"status": "failed", "error": error})
+            logger.error("work_unit_failed", unit=unit.unit_id, attempts=attempts, error=error)
+    
+    def _record_failure(self, unit: WorkUnit, error: str) -> int:
+        """Append an error to the unit's failure log and return the attempt count"""
+        path = self._path("failures", unit.unit_id)
+        errors = codec.read_json(path) if path.exists() else []
+        errors.append(error)
+        _write_atomic(path, errors)
+        return len(errors)
+    
+    def status(self, unit: WorkUnit) -> Optional[Dict[str, Any]]:
+        """
+        Get a unit's completion marker
+        
+        Args:
+            unit: Queued unit
+        
+        Returns:
+            The marker, None while the unit is pending
+        """
+        path = self._path("done", unit.unit_id)
+        return codec.read_json(path) if path.exists() else None
+    
+    def result(self, unit: WorkUnit) -> Dict[str, Any]:
+        """
+        Load a completed unit's result
+        
+        Args:
+            unit: Completed unit
+        
+        Returns:
+            The result passed to ``complete``
+        """
+        return codec.read_json(self._path("results", unit.unit_id))
+    
+    def pending(self) -> int:
+        """
+        Count the units that are neither completed nor failed
+        
+        Returns:
+            Number of pending units
+        """
+        return sum(1 for unit in self.units() if not self.is_done(unit))
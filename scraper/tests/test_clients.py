@@ -0,0 +1,231 @@
+"""
+Tests for platform API clients
+"""
+
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ..clients.modrinth import ModrinthClient
+from ..clients.polymart import PolymartClient
+from ..clients.hangar import HangarClient
+from ..clients.client_factory import ClientError
+from ..services.transformers.hangar import HangarTransformer
+from ..services.transformers.modrinth import ModrinthTransformer
+from ..utils.http import HTTPSessionManager
+
+def make_modrinth_page(offset, count, total_hits):
+    """Build a fake Modrinth search page"""
+    return {
+        "hits": [{"project_id": f"p{i}"} for i in range(offset, min(offset + count, total_hits))],
+        "offset": offset,
+        "limit": count,
+        "total_hits": total_hits
+    }
+
+@pytest.mark.asyncio
+async def test_modrinth_paginates_to_configured_depth():
+    """Test that Modrinth pages are fanned out up to max_results, in order"""
+    client = ModrinthClient()
+    client.max_results = {"default": 100, "mod": 250}
+    client.page_concurrency = 2
+    
+    requested = []
+    in_flight = 0
+    peak = 0
+    
+    async def fake_fetch_page(resource_type, offset):
+        nonlocal in_flight, peak
+        requested.append(offset)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return make_modrinth_page(offset, client.BATCH_SIZE, 1000)
+    
+    client._fetch_page = fake_fetch_page
+    data = await client._fetch_by_type("mod")
+    
+    assert sorted(requested) == [0, 100, 200]
+    assert peak <= 2
+    assert [hit["project_id"] for hit in data["hits"]] == [f"p{i}" for i in range(250)]
+    assert data["total_hits"] == 1000
+
+@pytest.mark.asyncio
+async def test_modrinth_stops_at_total_hits():
+    """Test that no pages are requested past total_hits"""
+    client = ModrinthClient()
+    client.max_results = {"default": 5000}
+    requested = []
+    
+    async def fake_fetch_page(resource_type, offset):
+        requested.append(offset)
+        return make_modrinth_page(offset, client.BATCH_SIZE, 150)
+    
+    client._fetch_page = fake_fetch_page
+    data = await client._fetch_by_type("plugin")
+    
+    assert sorted(requested) == [0, 100]
+    assert len(data["hits"]) == 150
+
+@pytest.mark.asyncio
+async def test_types_fetched_concurrently_and_failures_isolated():
+    """Test that types run in parallel under the cap and a failed type is skipped"""
+    client = PolymartClient()
+    in_flight = 0
+    peak = 0
+    
+    async def fake_search(resource_type):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if resource_type == "mod":
+            raise RuntimeError("boom")
+        return {"result": [{"id": resource_type}], "total": 1}
+    
+    types = ["plugin", "mod", "resourcepack", "datapack", "pluginpack"]
+    result = await client._fetch_types(types, fake_search, concurrency=2)
+    
+    assert list(result) == ["plugin", "resourcepack", "datapack", "pluginpack"]
+    assert result["plugin"] == {"result": [{"id": "plugin"}], "total": 1}
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_polymart_prefetch_keeps_order_and_cancels_past_end():
+    """Test that prefetched Polymart pages come back in order and the overrun is cancelled"""
+    client = PolymartClient()
+    client.batch_size = 10
+    client.prefetch_pages = 3
+    total = 45
+    started = []
+    
+    async def fake_search_page(resource_type, start):
+        started.append(start)
+        # The first page answers last to make sure order does not depend on timing
+        await asyncio.sleep(0.03 if start == 0 else 0.01)
+        return [{"id": i} for i in range(start, min(start + client.batch_size, total))]
+    
+    client._search_page = fake_search_page
+    data = await client._search_by_type("plugin")
+    
+    assert [r["id"] for r in data["result"]] == list(range(total))
+    assert data["total"] == total
+    # Never more than the window ahead of the short page, and nothing is left in flight
+    assert max(started) <= 40 + (client.prefetch_pages - 1) * client.batch_size
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+@pytest.mark.asyncio
+async def test_polymart_malformed_page_is_an_error():
+    """Test that a page without a result list fails instead of ending the type"""
+    async def handler(request):
+        body = await request.json()
+        if body["type"] == "Mods":
+            return web.json_response({"response": {"success": False}})
+        return web.json_response({"response": {"result": []}})
+    
+    app = web.Application()
+    app.router.add_post("/search", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({})
+        client = PolymartClient(session_manager=manager)
+        client.base_url = str(test_server.make_url("")).rstrip("/")
+        try:
+            assert await client._request_page("plugin", 0) == []
+            with pytest.raises(ClientError):
+                await client._request_page("mod", 0)
+        finally:
+            await manager.close()
+
+@pytest.mark.asyncio
+async def test_hangar_paginates_by_pagination_count():
+    """Test that Hangar reads pagination.count and fetches every remaining page"""
+    client = HangarClient()
+    client.batch_size = 50
+    requested = []
+    
+    async def fake_fetch_page(resource_type, offset):
+        requested.append((resource_type, offset))
+        count = 120 if resource_type == "plugin" else 10
+        return {
+            "pagination": {"limit": 50, "offset": offset, "count": count},
+            "result": [
+                {"id": i, "name": f"{resource_type}{i}", "namespace": {"owner": "dev"}}
+                for i in range(offset, min(offset + 50, count))
+            ]
+        }
+    
+    client._fetch_page = fake_fetch_page
+    data = await client.fetch_resources()
+    
+    assert sorted(requested) == [("addon", 0), ("plugin", 0), ("plugin", 50), ("plugin", 100)]
+    assert [p["id"] for p in data["plugin"]["result"]] == list(range(120))
+    assert data["plugin"]["pagination"]["count"] == 120
+    
+    resources = HangarTransformer().transform(data)
+    assert {r.resource_type for r in resources} == {"plugin", "addon"}
+    assert len(resources) == 130
+
+@pytest.mark.asyncio
+async def test_hangar_lists_addons_under_addon_only():
+    """Test that an addon in the untagged plugin listing is not counted as a plugin"""
+    client = HangarClient()
+    addon = {"id": 2, "name": "SkriptAddon", "namespace": {"owner": "dev"}, "settings": {"tags": ["ADDON"]}}
+    plugin = {"id": 1, "name": "Skript", "namespace": {"owner": "dev"}, "settings": {"tags": []}}
+    
+    async def fake_fetch_page(resource_type, offset, sort="-downloads"):
+        result = [plugin, addon] if resource_type == "plugin" else [addon]
+        return {"pagination": {"limit": 25, "offset": offset, "count": len(result)}, "result": result}
+    
+    client._fetch_page = fake_fetch_page
+    data = await client.fetch_resources()
+    
+    resources = HangarTransformer().transform(data)
+    assert sorted((r.name, r.resource_type) for r in resources) == [("Skript", "plugin"), ("SkriptAddon", "addon")]
+    
+    pages = [entry async for entry in client.stream_pages()]
+    assert sorted((resource_type, [p["id"] for p in projects]) for resource_type, projects in pages) == [
+        ("addon", [2]), ("plugin", [1])
+    ]
+    assert [p["id"] for p in await client.fetch_range("plugin", 0, None)] == [1]
+
+@pytest.mark.asyncio
+async def test_modrinth_enriches_hits_in_bulk():
+    """Test that hits are enriched through chunked /projects requests"""
+    client = ModrinthClient()
+    client.enrich_batch_size = 40
+    requested = []
+    
+    async def fake_fetch_projects(project_ids):
+        requested.append(list(project_ids))
+        if "p40" in project_ids:
+            raise ClientError("boom")
+        return [
+            {"id": project_id, "followers": 7, "game_versions": ["1.20.1", "1.21"],
+             "loaders": ["fabric"], "gallery": [{}, {}]}
+            for project_id in project_ids
+        ]
+    
+    client._fetch_projects = fake_fetch_projects
+    all_resources = {
+        "mod": make_modrinth_page(0, 100, 100),
+        # The same project listed under two types is requested once
+        "modpack": {"hits": [{"project_id": "p0"}]}
+    }
+    await client._enrich_hits(all_resources)
+    
+    assert sorted(len(chunk) for chunk in requested) == [20, 40, 40]
+    hits = all_resources["mod"]["hits"]
+    assert hits[0]["enrichment"] == all_resources["modpack"]["hits"][0]["enrichment"]
+    # Hits of the failed chunk keep their search data only
+    assert "enrichment" not in hits[40]
+    
+    resource = ModrinthTransformer().transform_item("mod", {
+        **hits[0], "title": "P0", "versions": ["1.21"]
+    })
+    assert resource.followers == 7
+    assert resource.versions == ["1.20.1", "1.21"]
+    assert resource.loaders == ["fabric"]
+    assert resource.gallery_count == 2
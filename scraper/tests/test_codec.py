@@ -0,0 +1,47 @@
+"""
+Tests for the JSON codec
+"""
+
+import pytest
+from datetime import datetime, timezone
+
+from ..models.resource import Resource, ResourceType
+from ..utils import codec
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Run a test with orjson and with the standard library fallback"""
+    if request.param == "orjson":
+        if codec.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+    return request.param
+
+def test_codec_round_trips_native_types(backend):
+    """Test that datetimes, enums and dataclasses encode without a default hook"""
+    created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    resource = Resource(id="r", name="Ré", description="", author="a", downloads=1,
+                        resource_type=ResourceType.MOD, created_at=created, updated_at=created)
+    
+    data = codec.loads(codec.dumps({"at": created, "type": ResourceType.PLUGIN, "resource": resource}))
+    
+    assert data["at"] == "2024-01-02T03:04:05+00:00"
+    assert data["type"] == "plugin"
+    assert data["resource"]["name"] == "Ré"
+    assert data["resource"]["created_at"] == data["at"]
+
+def test_codec_output_matches_between_backends(monkeypatch, tmp_path):
+    """Test that both backends write files the other one reads identically"""
+    if codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    payload = {"hits": [{"id": 1, "title": "雪"}], "total": 1}
+    
+    codec.write_json(tmp_path / "fast.json", payload)
+    fast = (tmp_path / "fast.json").read_bytes()
+    monkeypatch.setattr(codec, "orjson", None)
+    codec.write_json(tmp_path / "std.json", payload)
+    
+    assert (tmp_path / "std.json").read_bytes() == fast
+    assert codec.read_json(tmp_path / "fast.json") == payload
+    assert codec.dumps(payload, sort_keys=True) == codec.dumps(dict(reversed(payload.items())), sort_keys=True)
@@ -0,0 +1,491 @@
+"""
+Tests for the shared HTTP layer
+"""
+
+import asyncio
+import json
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ..utils.http import HTTPSessionManager
+from ..utils.http_cache import HTTPCache
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..utils.concurrency import AdaptiveLimit
+from ..utils.fetch_metrics import FetchMetrics, LatencyHistogram
+from ..utils.http_record import HTTPRecorder
+from ..utils.json_stream import JSONItemStream
+from ..utils.rate_limit import RateLimiter, TokenBucket
+from ..utils.retry import RetryPolicy, parse_retry_after
+from ..clients.client_factory import ClientFactory
+from ..clients.modrinth import ModrinthClient
+from ..clients.hangar import HangarClient
+
+@pytest.fixture
+async def server():
+    """Start a local HTTP server echoing request headers"""
+    async def handler(request):
+        return web.json_response({"user_agent": request.headers.get("User-Agent")})
+    
+    app = web.Application()
+    app.router.add_get("/echo", handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield test_server
+    await test_server.close()
+
+@pytest.mark.asyncio
+async def test_session_is_reused_until_closed(server):
+    """Test that the manager hands out one pooled session per run"""
+    manager = HTTPSessionManager({"limit_per_host": 2})
+    first = await manager.get_session()
+    second = await manager.get_session()
+    
+    assert first is second
+    assert first.connector.limit_per_host == 2
+    
+    async with manager.request("GET", str(server.make_url("/echo"))) as response:
+        assert response.status == 200
+    
+    await manager.close()
+    assert manager.closed
+
+@pytest.mark.asyncio
+async def test_factory_clients_share_session_manager(server):
+    """Test that clients created by the factory share one session and keep their own headers"""
+    factory = ClientFactory(session_manager=HTTPSessionManager({}))
+    factory.register("modrinth", ModrinthClient)
+    factory.register("hangar", HangarClient)
+    
+    modrinth = factory.create("modrinth")
+    hangar = factory.create("hangar")
+    assert modrinth.session_manager is hangar.session_manager
+    
+    async with modrinth._request("GET", str(server.make_url("/echo"))) as response:
+        data = await response.json()
+    assert data["user_agent"] == ModrinthClient.USER_AGENT
+    
+    # Releasing a shared session must not close it for the other clients
+    await modrinth._close_session()
+    assert not factory.session_manager.closed
+    
+    await factory.close()
+    assert factory.session_manager.closed
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_to_rate():
+    """Test that the bucket spaces requests once the burst is spent"""
+    bucket = TokenBucket("example.org", rate=50, burst=2)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(5):
+        await bucket.acquire()
+    
+    # 2 from the burst, 3 more at 50/s
+    assert loop.time() - start >= 0.05
+
+def test_token_bucket_follows_rate_limit_headers():
+    """Test that the rate is re-tuned from X-Ratelimit headers"""
+    bucket = TokenBucket("api.modrinth.com", rate=1, burst=20)
+    bucket.update_from_headers({
+        "X-Ratelimit-Limit": "300",
+        "X-Ratelimit-Remaining": "120",
+        "X-Ratelimit-Reset": "30"
+    })
+    assert bucket.rate == pytest.approx(4.0)
+    
+    bucket.update_from_headers({"X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "5"})
+    assert bucket.tokens == 0
+    assert bucket._blocked_until > 0
+
+def test_rate_limiter_uses_host_settings():
+    """Test that hosts get their configured bucket and others the default"""
+    limiter = RateLimiter({"default": {"rate": 3}, "api.polymart.org": {"rate": 1, "burst": 2}})
+    
+    assert limiter.for_host("api.polymart.org").rate == 1
+    assert limiter.for_host("api.polymart.org").burst == 2
+    assert limiter.for_host("other.org").rate == 3
+    assert limiter.for_host("other.org") is limiter.for_host("other.org")
+
+def test_retry_policy_backoff_and_budget():
+    """Test jittered backoff bounds, Retry-After and the run budget"""
+    policy = RetryPolicy(max_attempts=3, base_delay=0.1, max_delay=1, total_budget=2)
+    
+    assert 0 <= policy.next_delay(0) <= 0.1
+    assert 0 <= policy.next_delay(1) <= 0.2
+    assert policy.next_delay(2) is None  # attempts exhausted
+    assert policy.next_delay(0, retry_after=5) is None  # over budget
+    assert policy.next_delay(0, retry_after=1.5) == 1.5
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("soon") is None
+
+@pytest.mark.asyncio
+async def test_request_retries_transient_errors():
+    """Test that 503 and 429 responses are retried until a success"""
+    statuses = [503, 429, 200]
+    calls = []
+    
+    async def handler(request):
+        calls.append(request.path)
+        status = statuses[len(calls) - 1]
+        headers = {"Retry-After": "0"} if status == 429 else {}
+        return web.json_response({"status": status}, status=status, headers=headers)
+    
+    app = web.Application()
+    app.router.add_get("/flaky", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({"retry": {"base_delay": 0.01}})
+        try:
+            async with manager.request("GET", str(test_server.make_url("/flaky"))) as response:
+                assert response.status == 200
+        finally:
+            await manager.close()
+    
+    assert len(calls) == 3
+    assert manager.retry_policy.retries == 2
+
+@pytest.mark.asyncio
+async def test_fetch_revalidates_cached_responses(tmp_path):
+    """Test that cached entries are revalidated and a 304 replays the body"""
+    conditional = []
+    
+    async def handler(request):
+        conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"hits": [1, 2, 3]}, headers={"ETag": '"v1"'})
+    
+    app = web.Application()
+    app.router.add_post("/search", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({}, cache=HTTPCache(tmp_path))
+        url = str(test_server.make_url("/search"))
+        try:
+            first = await manager.fetch("POST", url, json={"start": 0})
+            second = await manager.fetch("POST", url, json={"start": 0})
+            other = await manager.fetch("POST", url, json={"start": 100})
+        finally:
+            await manager.close()
+    
+    assert conditional == [None, '"v1"', None]
+    assert first.json() == second.json() == {"hits": [1, 2, 3]}
+    assert second.from_cache and not other.from_cache
+    assert manager.cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_fetch_records_exchanges(tmp_path, server):
+    """Test that recorded exchanges hold the request and the full response"""
+    manager = HTTPSessionManager({})
+    manager.recorder = HTTPRecorder(tmp_path / "http_record.jsonl")
+    try:
+        await manager.fetch("GET", str(server.make_url("/echo")), params={"q": "x"},
+                            headers={"User-Agent": "test", "Authorization": "secret"})
+    finally:
+        await manager.close()
+    
+    entries = [json.loads(line) for line in manager.recorder.path.read_text().splitlines()]
+    assert len(entries) == 1
+    assert entries[0]["request"]["params"] == {"q": "x"}
+    assert "Authorization" not in entries[0]["request"]["headers"]
+    assert entries[0]["response"]["status"] == 200
+    assert json.loads(entries[0]["response"]["text"]) == {"user_agent": "test"}
+
+def test_json_item_stream_is_independent_of_chunking():
+    """Test that items decode identically however the body is split"""
+    doc = {
+        "success": True,
+        "other": [{"result": [0]}],
+        "response": {
+            "note": "a \"result\": [ in a string",
+            "result": [{"id": i, "name": "\u00e9\u2603" * i} for i in range(20)] + [12345, "x"]
+        }
+    }
+    body = json.dumps(doc, ensure_ascii=False).encode()
+    for size in (1, 3, 64, len(body)):
+        parser = JSONItemStream(("response", "result"))
+        items = []
+        for start in range(0, len(body), size):
+            items.extend(parser.feed(body[start:start + size]))
+        items.extend(parser.close())
+        assert items == doc["response"]["result"]
+    
+    parser = JSONItemStream(("response", "result"))
+    parser.feed(b'{"response": {"result": [1, 2')
+    with pytest.raises(ValueError):
+        parser.close()
+
+@pytest.mark.asyncio
+async def test_stream_items_yields_before_body_completes():
+    """Test that items are handed over while the response is still being sent"""
+    first_item_seen = asyncio.Event()
+    
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b'{"response": {"result": [{"id": 1},')
+        # The rest of the body is only sent once the client has the first item
+        await asyncio.wait_for(first_item_seen.wait(), 5)
+        await response.write(b' {"id": 2}]}}')
+        await response.write_eof()
+        return response
+    
+    app = web.Application()
+    app.router.add_post("/search", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({})
+        items = []
+        try:
+            async for item in manager.stream_items("POST", str(test_server.make_url("/search")),
+                                                   ("response", "result"), json={}):
+                items.append(item)
+                first_item_seen.set()
+        finally:
+            await manager.close()
+    
+    assert items == [{"id": 1}, {"id": 2}]
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_after_repeated_failures():
+    """Test that a failing host opens its circuit and later gets a single trial request"""
+    calls = []
+    
+    async def handler(request):
+        calls.append(request.path)
+        return web.json_response({}, status=503)
+    
+    app = web.Application()
+    app.router.add_get("/down", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({
+            "retry": {"max_attempts": 1},
+            "circuit_breaker": {"failure_threshold": 2, "reset_timeout": 0.05}
+        })
+        url = str(test_server.make_url("/down"))
+        try:
+            for _ in range(2):
+                result = await manager.fetch("GET", url)
+                assert result.status == 503
+            with pytest.raises(CircuitOpenError):
+                await manager.fetch("GET", url)
+            assert len(calls) == 2
+            
+            await asyncio.sleep(0.06)
+            await manager.fetch("GET", url)
+            assert len(calls) == 3
+            with pytest.raises(CircuitOpenError):
+                await manager.fetch("GET", url)
+        finally:
+            await manager.close()
+    
+    assert manager.circuit_breakers.tripped_hosts() == [test_server.host]
+
+def test_circuit_breaker_closes_on_success():
+    """Test that a successful trial request closes the circuit"""
+    breaker = CircuitBreaker("example.org", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    breaker.check()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.check()
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_request_reopens_circuit():
+    """Test that a cancelled trial request does not leave the circuit half-open"""
+    started = asyncio.Event()
+    
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+        return web.json_response({})
+    
+    app = web.Application()
+    app.router.add_get("/slow", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({
+            "coalesce": {"enabled": False},
+            "circuit_breaker": {"failure_threshold": 1, "reset_timeout": 0}
+        })
+        breaker = manager.circuit_breakers.for_host(test_server.host)
+        breaker.record_failure()
+        url = str(test_server.make_url("/slow"))
+        try:
+            trial = asyncio.ensure_future(manager.fetch("GET", url))
+            await started.wait()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            
+            assert breaker.state == CircuitBreaker.OPEN
+            # The next request after the reset timeout is a new trial
+            breaker.check()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+        finally:
+            await manager.close()
+
+@pytest.mark.asyncio
+async def test_identical_gets_are_coalesced_and_memoized():
+    """Test that concurrent identical GETs share one request and later ones are memoized"""
+    calls = []
+    
+    async def handler(request):
+        calls.append(request.query.get("page"))
+        await asyncio.sleep(0.02)
+        return web.json_response({"page": request.query.get("page")})
+    
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    app.router.add_post("/page", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({"coalesce": {"memoize": True}})
+        url = str(test_server.make_url("/page"))
+        try:
+            results = await asyncio.gather(*(
+                manager.fetch("GET", url, params={"page": page}) for page in ("1", "1", "1", "2")
+            ))
+            again = await manager.fetch("GET", url, params={"page": "1"})
+            # Requests with a body are never shared
+            await asyncio.gather(*(manager.fetch("POST", url, params={"page": "3"}, json={})
+                                   for _ in range(2)))
+        finally:
+            await manager.close()
+    
+    assert sorted(calls) == ["1", "2", "3", "3"]
+    assert [r.json()["page"] for r in results] == ["1", "1", "1", "2"]
+    assert again.json() == {"page": "1"}
+    assert manager.coalescer.coalesced == 2
+    assert manager.coalescer.memo_hits == 1
+    # Memoization is opt-in, in-flight coalescing is not
+    assert not HTTPSessionManager({}).coalescer.memoize
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_grows_and_backs_off_once_per_burst():
+    """Test that the limit grows additively and one burst of failures halves it once"""
+    limit = AdaptiveLimit("example.org", initial=2, max_limit=4, decrease=0.5)
+    for _ in range(8):
+        async with limit.slot() as started:
+            limit.record_success(started)
+    assert limit.limit == 4
+    
+    burst = []
+    for _ in range(3):
+        async with limit.slot() as started:
+            burst.append(started)
+    for started in burst:
+        limit.record_failure(started)
+    assert limit.limit == 2
+    assert limit.decreases == 1
+    
+    async with limit.slot() as started:
+        limit.record_failure(started)
+    assert limit.limit == 1
+
+@pytest.mark.asyncio
+async def test_request_concurrency_adapts_to_server_errors():
+    """Test that in-flight requests stay under the host limit, which shrinks on 503s"""
+    in_flight = []
+    peak = [0]
+    
+    async def handler(request):
+        in_flight.append(request)
+        peak[0] = max(peak[0], len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        if request.query.get("fail"):
+            return web.json_response({}, status=503)
+        return web.json_response({})
+    
+    app = web.Application()
+    app.router.add_get("/work", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({
+            "retry": {"max_attempts": 1},
+            "rate_limits": {"default": {"rate": 1000, "burst": 1000}},
+            "coalesce": {"enabled": False},
+            "circuit_breaker": {"failure_threshold": 100},
+            "concurrency": {"default": {"initial": 2, "max_limit": 3}}
+        })
+        url = str(test_server.make_url("/work"))
+        try:
+            await asyncio.gather(*(manager.fetch("GET", url) for _ in range(12)))
+            limit = manager.concurrency.for_host(test_server.host)
+            assert limit.limit == 3
+            assert peak[0] <= 3
+            
+            await asyncio.gather(*(manager.fetch("GET", url, params={"fail": "1"}) for _ in range(3)))
+        finally:
+            await manager.close()
+    
+    assert limit.limit == 1.5
+    assert manager.concurrency.stats()[test_server.host]["decreases"] == 1
+
+def test_latency_histogram_percentiles():
+    """Test that percentiles fall within one bucket of the exact value"""
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    
+    assert histogram.count == 100
+    assert 0.050 <= histogram.percentile(50) < 0.050 * 1.2
+    assert 0.095 <= histogram.percentile(95) < 0.095 * 1.2
+    assert histogram.percentile(99) <= histogram.max == 0.1
+    assert LatencyHistogram().percentile(50) is None
+
+def test_fetch_metrics_of_workers_add_up():
+    """Test that metrics files of several workers merge into the metrics of all their requests"""
+    workers = [FetchMetrics(), FetchMetrics()]
+    combined = FetchMetrics()
+    for i in range(40):
+        latency = 0.002 * (i + 1)
+        for metrics in (workers[i % 2], combined):
+            metrics.record_response("api.modrinth.com", 200 if i % 5 else 429, latency, 100, 300)
+    workers[1].record_error("api.hangar.io", TimeoutError(), 30.0)
+    combined.record_error("api.hangar.io", TimeoutError(), 30.0)
+    
+    merged = FetchMetrics()
+    for metrics in workers:
+        merged.add_dict(json.loads(json.dumps(metrics.to_dict())))
+    
+    assert merged.to_dict() == combined.to_dict()
+
+@pytest.mark.asyncio
+async def test_request_records_fetch_metrics(tmp_path):
+    """Test that statuses, retries and compressed/uncompressed bytes are recorded per host"""
+    statuses = [503, 200]
+    body = json.dumps({"items": ["x" * 10] * 200})
+    
+    async def handler(request):
+        status = statuses.pop(0)
+        response = web.Response(text=body, status=status, content_type="application/json")
+        response.enable_compression()
+        return response
+    
+    app = web.Application()
+    app.router.add_get("/data", handler)
+    async with TestServer(app) as test_server:
+        manager = HTTPSessionManager({"retry": {"base_delay": 0.01}})
+        try:
+            result = await manager.fetch("GET", str(test_server.make_url("/data")))
+        finally:
+            await manager.close()
+    
+    assert result.status == 200
+    manager.write_metrics(tmp_path / "fetch_metrics.json", timestamp="run")
+    written = json.loads((tmp_path / "fetch_metrics.json").read_text())
+    host = written["hosts"][test_server.host]
+    assert written["timestamp"] == "run"
+    assert host["requests"] == 2
+    assert host["retries"] == 1
+    assert host["status_counts"] == {"200": 1, "503": 1}
+    assert host["bytes_uncompressed"] >= len(body)
+    assert 0 < host["bytes_compressed"] < len(body)
+    assert host["latency"]["count"] == 2
+    assert host["latency"]["p50"] is not None
+    assert host["concurrency"] == manager.concurrency.stats()[test_server.host]
+    assert host["rate_limit"] == manager.rate_limiter.stats()[test_server.host]
+    assert written["totals"]["requests"] == 2
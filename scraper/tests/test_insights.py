@@ -0,0 +1,55 @@
+"""
+Tests for the weekly insights statistics
+"""
+
+from insights.services.generator import WeeklyInsightsGenerator
+from ..utils import codec
+
+def _resource(name, platform, downloads, versions):
+    """Build an aggregated resource entry"""
+    return {
+        "id": f"{platform}-{name.lower()}",
+        "name": name,
+        "author": "dev",
+        "downloads": downloads,
+        "platform": platform,
+        "website_url": f"https://example.com/{platform}/{name}",
+        "versions": versions,
+        "updated_at": "2024-06-01T00:00:00Z"
+    }
+
+def test_report_statistics_from_aggregated_snapshot(tmp_path):
+    """Test version trends, category highlights and platform stats of a merged snapshot"""
+    path = tmp_path / "data" / "aggregated" / "latest" / "aggregated.json"
+    path.parent.mkdir(parents=True)
+    codec.write_json(path, {
+        "metadata": {"total_resources": 4},
+        "resources": {"tabs": [], "resources": {
+            "mod": {"popular": [
+                _resource("Sodium", "modrinth", 100, ["1.20.4", "1.20"]),
+                _resource("Sodium", "polymart", 20, ["1.20.4"]),
+                _resource("Lithium", "modrinth", 50, ["1.20"])
+            ]},
+            "plugin": {"popular": [_resource("EssentialsX", "hangar", 70, ["1.20.4"])]}
+        }}
+    })
+    
+    report = WeeklyInsightsGenerator(tmp_path)._load_data()["report"]
+    
+    assert report["version_updates"] == {"popular_versions": [
+        ("1.20.4", {"count": 2, "resources": ["Sodium", "EssentialsX"]}),
+        ("1.20", {"count": 2, "resources": ["Sodium", "Lithium"]})
+    ]}
+    
+    highlights = report["category_highlights"]
+    assert list(highlights) == ["mod", "plugin"]
+    assert highlights["mod"]["total_resources"] == 2
+    assert highlights["mod"]["total_downloads"] == 170
+    assert [r["name"] for r in highlights["mod"]["top_resources"]] == ["Sodium", "Lithium"]
+    assert highlights["plugin"]["total_downloads"] == 70
+    
+    assert report["platform_stats"] == {
+        "modrinth": {"total_resources": 2, "total_downloads": 150, "resource_types": {"mod": 2}},
+        "polymart": {"total_resources": 1, "total_downloads": 20, "resource_types": {"mod": 1}},
+        "hangar": {"total_resources": 1, "total_downloads": 70, "resource_types": {"plugin": 1}}
+    }
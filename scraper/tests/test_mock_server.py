@@ -0,0 +1,66 @@
+"""
+Tests for the mock platform API server
+"""
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from ..clients.hangar import HangarClient
+from ..clients.modrinth import ModrinthClient
+from ..clients.polymart import PolymartClient
+from ..mock_server import MockPlatformServer, MockSettings, api_urls
+from ..utils.http import HTTPSessionManager
+
+UNLIMITED = {"default": {"rate": 1000, "burst": 1000}}
+
+@pytest.mark.asyncio
+async def test_clients_fetch_full_catalogues_from_mock_server():
+    """Test that every client pages through the synthetic catalogues"""
+    mock = MockPlatformServer(MockSettings(size=230))
+    async with TestServer(mock.create_app()) as test_server:
+        urls = api_urls(str(test_server.make_url("/")))
+        manager = HTTPSessionManager({"rate_limits": UNLIMITED})
+        try:
+            modrinth = ModrinthClient(session_manager=manager)
+            modrinth.base_url = urls["modrinth"]
+            modrinth.max_results = {"default": 1000}
+            hangar = HangarClient(session_manager=manager)
+            hangar.base_url = urls["hangar"]
+            polymart = PolymartClient(session_manager=manager)
+            polymart.base_url = urls["polymart"]
+            
+            modrinth_data = await modrinth.fetch_resources()
+            hangar_data = await hangar.fetch_resources()
+            polymart_data = await polymart.fetch_resources()
+        finally:
+            await manager.close()
+    
+    assert {len(data["hits"]) for data in modrinth_data.values()} == {230}
+    assert all("enrichment" in hit for hit in modrinth_data["mod"]["hits"])
+    assert {len(data["result"]) for data in hangar_data.values()} == {230}
+    assert {len(data["result"]) for data in polymart_data.values()} == {230}
+    assert mock.stats.errors == 0 and mock.stats.peak_in_flight >= 1
+
+@pytest.mark.asyncio
+async def test_mock_server_injects_errors_and_rate_limits():
+    """Test that injected failures are retried and rate limit headers drive the client"""
+    mock = MockPlatformServer(MockSettings(size=50, error_rate=0.3, rate_limit=1000, rate_window=60, seed=1))
+    async with TestServer(mock.create_app()) as test_server:
+        manager = HTTPSessionManager({
+            "rate_limits": UNLIMITED,
+            "retry": {"base_delay": 0.001, "max_attempts": 10}
+        })
+        try:
+            hangar = HangarClient(session_manager=manager)
+            hangar.base_url = api_urls(str(test_server.make_url("/")))["hangar"]
+            hangar.batch_size = 10
+            data = await hangar.fetch_resources()
+        finally:
+            await manager.close()
+    
+    assert len(data["plugin"]["result"]) == 50
+    assert mock.stats.errors > 0
+    assert manager.retry_policy.retries == mock.stats.errors
+    # The bucket was re-tuned from X-Ratelimit-Remaining/Reset (~1000 requests per 60s)
+    bucket = manager.rate_limiter.for_host(test_server.host)
+    assert bucket.rate < 20
@@ -0,0 +1,60 @@
+"""
+Tests for the lazy platform registry
+"""
+
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from ..clients.hangar import HangarClient
+from ..registry import LazyTransformers, PlatformRegistry, RegistryError
+from ..services.scraper_service import ScraperError, ScraperService
+from ..services.transformers.base import BaseTransformer
+
+class EchoTransformer(BaseTransformer):
+    """Transformer of a third-party platform"""
+    
+    def transform(self, raw_data):
+        return []
+    
+    def transform_item(self, resource_type, item):
+        raise KeyError("id")
+
+def test_platforms_resolve_from_config_builtins_and_entry_points(monkeypatch):
+    """Test the lookup order and that entry points are only scanned when needed"""
+    scans = []
+    
+    def fake_entry_points(group):
+        scans.append(group)
+        if group == "mc_top_list.transformers":
+            return [EntryPoint(name="echo", value=f"{__name__}:EchoTransformer", group=group)]
+        return []
+    
+    monkeypatch.setattr("scraper.registry.entry_points", fake_entry_points)
+    registry = PlatformRegistry({"platforms": {
+        "hangar": {},
+        "modrinth": {"transformer": f"{__name__}:EchoTransformer"},
+        "echo": {}
+    }})
+    
+    assert registry.client_class("hangar") is HangarClient
+    assert isinstance(registry.transformer("modrinth"), EchoTransformer)
+    assert scans == []
+    
+    assert isinstance(registry.transformer("echo"), EchoTransformer)
+    assert registry.transformer("echo") is registry.transformer("echo")
+    with pytest.raises(RegistryError):
+        registry.client_class("echo")
+    assert len(scans) == 2
+    
+    transformers = LazyTransformers(registry)
+    assert list(transformers) == ["hangar", "modrinth", "echo"]
+    assert transformers.get("missing") is None
+
+def test_service_runs_only_selected_platforms(tmp_path):
+    """Test that a platform selection limits the run and rejects unknown platforms"""
+    service = ScraperService(storage_dir=tmp_path, platforms=["hangar"])
+    assert [platform.name for platform in service._get_platforms()] == ["hangar"]
+    
+    with pytest.raises(ScraperError):
+        ScraperService(storage_dir=tmp_path, platforms=["hangar", "spigot"])
@@ -0,0 +1,66 @@
+"""
+Tests for the Resource model
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from ..models.resource import Resource
+
+def _resource(resource_id: str) -> Resource:
+    """Build a resource whose repeated values start out as distinct string objects"""
+    return Resource(
+        id=resource_id,
+        name="Example",
+        description="An example resource",
+        author="someone",
+        downloads=42,
+        resource_type="".join(["plug", "in"]),
+        platform="".join(["han", "gar"]),
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=datetime(2024, 6, 1, tzinfo=timezone.utc),
+        versions=["".join(["1.20", ".4"])],
+        categories=["".join(["econ", "omy"])],
+        license="".join(["M", "IT"]),
+        loaders=["".join(["pa", "per"])]
+    )
+
+def test_resources_share_repeated_strings():
+    """Test that low-cardinality fields are interned and instances have no __dict__"""
+    first, second = _resource("1"), _resource("2")
+    
+    assert first.platform is second.platform
+    assert first.resource_type is second.resource_type
+    assert first.license is second.license
+    assert first.versions[0] is second.versions[0]
+    assert first.categories[0] is second.categories[0]
+    assert first.loaders[0] is second.loaders[0]
+    with pytest.raises(AttributeError):
+        first.__dict__
+
+def test_to_dict_round_trips():
+    """Test that the dict format is unchanged and loads back into an equal resource"""
+    resource = _resource("1")
+    data = resource.to_dict()
+    
+    assert data == {
+        "id": "1",
+        "name": "Example",
+        "description": "An example resource",
+        "author": "someone",
+        "downloads": 42,
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-06-01T00:00:00+00:00",
+        "resource_type": "plugin",
+        "platform": "hangar",
+        "versions": ["1.20.4"],
+        "categories": ["economy"],
+        "website_url": "",
+        "source_url": None,
+        "license": "MIT",
+        "followers": 0,
+        "loaders": ["paper"],
+        "gallery_count": 0
+    }
+    assert Resource.from_dict(data) == resource
@@ -0,0 +1,66 @@
+"""
+Tests for the columnar resource table
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ..models.resource import Resource
+from ..models.resource_table import ResourceTable
+from ..utils import codec
+
+def _resource(resource_id: str, downloads: int, resource_type: str, platform: str, versions: list) -> Resource:
+    """Build a minimal resource"""
+    return Resource(id=resource_id, name=f"Resource {resource_id}", description="", author="someone",
+                    downloads=downloads, resource_type=resource_type, platform=platform,
+                    created_at=datetime(2024, 1, int(resource_id), tzinfo=timezone.utc), versions=versions)
+
+def test_grouping_sums_and_top_n_follow_row_order():
+    """Test that vectorized results match a loop over the rows, ties and first appearance included"""
+    resources = [
+        _resource("1", 50, "plugin", "hangar", ["1.20", "1.21"]),
+        _resource("2", 900, "mod", "modrinth", ["1.21"]),
+        _resource("3", 50, "plugin", "modrinth", []),
+        _resource("4", 900, "plugin", "polymart", ["1.20"]),
+        _resource("5", 10, "mod", "modrinth", ["1.19", "1.21"])
+    ]
+    table = ResourceTable.from_resources(resources)
+    
+    groups = table.group_indices("resource_type")
+    assert list(groups) == ["plugin", "mod"]
+    assert groups["plugin"].tolist() == [0, 2, 3]
+    assert table.count_by("platform") == {"hangar": 1, "modrinth": 3, "polymart": 1}
+    assert table.sum_by("resource_type") == {"plugin": 1000, "mod": 910}
+    assert table.count_by("versions") == {"1.20": 2, "1.21": 3, "1.19": 1}
+    assert table.sum_by("versions") == {"1.20": 950, "1.21": 960, "1.19": 10}
+    assert table.sum("downloads", groups["mod"]) == 910
+    
+    assert table.top_n(3).tolist() == [1, 3, 0]
+    assert table.top_n(2, rows=groups["plugin"]).tolist() == [3, 0]
+    assert table.rows(table.top_n(1)) == [resources[1]]
+    
+    recent = table.filter(table["created_at"] >= datetime(2024, 1, 3, tzinfo=timezone.utc).timestamp())
+    assert [r.id for r in recent.rows()] == ["3", "4", "5"]
+    assert recent["versions"].eq("1.21").tolist() == [False, False, True]
+    assert recent.count_by("resource_type", recent["platform"].eq("modrinth")) == {"plugin": 1, "mod": 1}
+
+def test_table_loads_processed_snapshot(tmp_path):
+    """Test that processed snapshot files load without creating Resource objects"""
+    resources = [_resource("1", 5, "plugin", "hangar", ["1.20"]), _resource("2", 7, "addon", "hangar", [])]
+    grouped = {}
+    for resource in resources:
+        data = resource.to_dict()
+        grouped.setdefault(data.pop("resource_type"), []).append(data)
+    path = tmp_path / "hangar_processed.json"
+    codec.write_json(path, {"platform": "hangar", "resources": grouped})
+    
+    table = ResourceTable.from_processed([path])
+    expected = ResourceTable.from_resources(resources)
+    
+    assert len(table) == 2
+    assert table.count_by("resource_type") == {"plugin": 1, "addon": 1}
+    assert np.array_equal(table["created_at"], expected["created_at"])
+    assert table.rows()[0]["id"] == "1"
+    # The classmethod stays reachable from instances
+    assert len(table.from_dicts(table.rows())) == 2
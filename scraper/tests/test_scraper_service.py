@@ -2,19 +2,30 @@
 Tests for scraper service
 """
 
+import asyncio
+import json
 import pytest
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock
 
-from ..services.scraper_service import ScraperService
+from aiohttp.test_utils import TestServer
+
+from ..clients.hangar import HangarClient
+from ..clients.modrinth import ModrinthClient
+from ..clients.polymart import PolymartClient
+from ..services.scraper_service import ScraperError, ScraperService
 from ..models.platform import Platform
 from ..models.resource import Resource
+from ..mock_server import MockPlatformServer, MockSettings, api_urls
+from ..utils.http import HTTPSessionManager
 
 @pytest.fixture
 def mock_client():
     """Create a mock API client"""
     client = AsyncMock()
+    client.supports_streaming = False
+    client.failed_types = {}
     client.fetch_resources.return_value = {
         "hits": [
             {
@@ -83,4 +94,383 @@ async def test_run(service, mock_storage):
     
     # Verify storage calls
     assert mock_storage.save_raw_data.called
-    assert mock_storage.save_processed_data.called 
\ No newline at end of file
+    assert mock_storage.save_processed_data.called 
+
+@pytest.mark.asyncio
+async def test_run_fetches_each_platform_once(tmp_path):
+    """Test that the pipelined run hits every platform API exactly once"""
+    service = ScraperService(storage_dir=tmp_path)
+    
+    clients = {}
+    for name in ("modrinth", "hangar", "polymart"):
+        client = AsyncMock()
+        client.supports_streaming = False
+        client.failed_types = {}
+        client.fetch_resources.return_value = {}
+        clients[name] = client
+    service.client_factory.create = Mock(side_effect=lambda platform: clients[platform])
+    
+    service.storage = AsyncMock()
+    service.aggregator = Mock()
+    service.aggregator.aggregate.return_value = {
+        "metadata": {"total_resources": 0, "platforms": []},
+        "resources": {"tabs": [], "resources": {}}
+    }
+    
+    await service.run()
+    
+    for client in clients.values():
+        client.fetch_resources.assert_called_once()
+    raw_results = service.storage.save_raw_data.call_args[0][0]
+    assert set(raw_results) == {"modrinth", "hangar", "polymart"}
+    metrics_files = list((tmp_path / "data" / "raw").glob("*/fetch_metrics.json"))
+    assert len(metrics_files) == 1
+
+@pytest.mark.asyncio
+async def test_run_replays_raw_snapshot(tmp_path, monkeypatch):
+    """Test that a raw snapshot is reprocessed without any client or network"""
+    monkeypatch.chdir(tmp_path)
+    snapshot_dir = tmp_path / "data" / "raw" / "20250101_030000"
+    snapshot_dir.mkdir(parents=True)
+    (snapshot_dir / "modrinth_mod_raw.json").write_text(json.dumps({
+        "hits": [{
+            "project_id": "test-mod",
+            "title": "Test Mod",
+            "downloads": 5000,
+            "date_created": "2024-01-01T00:00:00+00:00",
+            "date_modified": "2024-01-02T00:00:00+00:00"
+        }],
+        "total_hits": 1
+    }))
+    (snapshot_dir / "hangar_plugin_raw.json").write_text(json.dumps({
+        "result": [{"id": 1, "name": "TestPlugin", "namespace": {"owner": "dev"}}]
+    }))
+    
+    service = ScraperService(storage_dir=tmp_path, replay_dir=snapshot_dir)
+    results = await service.run()
+    
+    assert [r.id for r in results["modrinth"]] == ["test-mod"]
+    assert [r.name for r in results["hangar"]] == ["TestPlugin"]
+    assert "polymart" not in results
+    processed = tmp_path / "data" / "processed" / "20250101_030000" / "modrinth_processed.json"
+    assert processed.exists()
+    assert service.client_factory.session_manager.closed
+
+@pytest.mark.asyncio
+async def test_incremental_run_stops_at_unchanged_and_merges(tmp_path, monkeypatch):
+    """Test that an incremental run pages until known data and merges the delta"""
+    monkeypatch.chdir(tmp_path)
+    
+    def hit(project_id, downloads, modified):
+        return {
+            "project_id": project_id,
+            "title": project_id,
+            "downloads": downloads,
+            "date_created": "2024-01-01T00:00:00+00:00",
+            "date_modified": modified
+        }
+    
+    service = ScraperService(storage_dir=tmp_path, incremental=True)
+    transformer = service.transformers["modrinth"]
+    previous = [
+        transformer.transform_item("mod", hit(project_id, 100, "2024-01-02T00:00:00+00:00"))
+        for project_id in ("p1", "p2", "p3", "p4")
+    ]
+    await service.storage.save_processed_data({"modrinth": previous}, datetime(2025, 1, 1, 3))
+    
+    client = ModrinthClient()
+    client.BATCH_SIZE = 2
+    updated_pages = [
+        [hit("new", 5, "2024-03-01T00:00:00+00:00"), hit("p1", 150, "2024-02-01T00:00:00+00:00")],
+        [hit("p2", 100, "2024-01-02T00:00:00+00:00"), hit("p3", 100, "2024-01-02T00:00:00+00:00")],
+        [hit("p4", 100, "2024-01-02T00:00:00+00:00")]
+    ]
+    requested = []
+    
+    async def fake_fetch_page(resource_type, offset, index="downloads"):
+        assert index == "updated"
+        requested.append((resource_type, offset))
+        hits = updated_pages[offset // 2] if resource_type == "mod" else []
+        return {"hits": hits, "total_hits": 5}
+    
+    client._fetch_page = fake_fetch_page
+    service.client_factory.create = Mock(return_value=client)
+    
+    platform = next(p for p in service._get_platforms() if p.name == "modrinth")
+    raw_data, resources = await service._run_platform(platform)
+    
+    assert [offset for resource_type, offset in requested if resource_type == "mod"] == [0, 2]
+    assert [h["project_id"] for h in raw_data["mod"]["hits"]] == ["new", "p1", "p2", "p3"]
+    merged = {r.id: r.downloads for r in resources}
+    assert merged == {"p1": 150, "p2": 100, "p3": 100, "p4": 100, "new": 5}
+
+@pytest.mark.asyncio
+async def test_streaming_platform_writes_raw_items_as_they_arrive(tmp_path, monkeypatch):
+    """Test that a streamed platform is stored item by item and replays identically"""
+    monkeypatch.chdir(tmp_path)
+    service = ScraperService(storage_dir=tmp_path)
+    
+    client = PolymartClient()
+    client.batch_size = 2
+    
+    async def fake_search_page(resource_type, start):
+        count = 3 if resource_type == "plugin" else 0
+        return [
+            {"id": f"{resource_type}{i}", "title": f"R{i}", "downloads": i, "owner": {"name": "dev"}}
+            for i in range(start, min(start + 2, count))
+        ]
+    
+    client._search_page = fake_search_page
+    service.client_factory.create = Mock(return_value=client)
+    
+    platform = next(p for p in service._get_platforms() if p.name == "polymart")
+    timestamp = datetime(2025, 1, 1, 3)
+    raw_data, resources = await service._run_platform(platform, timestamp)
+    
+    assert raw_data is None
+    assert [r.id for r in resources] == ["plugin0", "plugin1", "plugin2"]
+    raw_file = tmp_path / "data" / "raw" / "20250101_030000" / "polymart_plugin_raw.json"
+    raw = json.loads(raw_file.read_text())
+    assert raw["total"] == 3
+    assert service.transformers["polymart"].transform({"plugin": raw}) == resources
+
+@pytest.mark.asyncio
+async def test_type_failing_mid_stream_degrades_platform(tmp_path, monkeypatch):
+    """Test that a type failing mid-stream degrades the platform and keeps none of its data"""
+    monkeypatch.chdir(tmp_path)
+    service = ScraperService(storage_dir=tmp_path)
+    
+    client = PolymartClient()
+    client.batch_size = 2
+    
+    async def fake_search_page(resource_type, start):
+        if resource_type == "mod" and start:
+            raise RuntimeError("connection reset")
+        count = 3 if resource_type in ("plugin", "mod") else 0
+        return [
+            {"id": f"{resource_type}{i}", "title": f"R{i}", "downloads": i, "owner": {"name": "dev"}}
+            for i in range(start, min(start + 2, count))
+        ]
+    
+    client._search_page = fake_search_page
+    service.client_factory.create = Mock(return_value=client)
+    
+    platform = next(p for p in service._get_platforms() if p.name == "polymart")
+    raw_data, resources = await service._run_platform(platform, datetime(2025, 1, 1, 3))
+    
+    assert "mod (connection reset)" in service.degraded["polymart"]
+    # The mod page fetched before the failure is dropped along with its raw file
+    assert [r.id for r in resources] == ["plugin0", "plugin1", "plugin2"]
+    raw_dir = tmp_path / "data" / "raw" / "20250101_030000"
+    assert sorted(path.name for path in raw_dir.iterdir()) == ["polymart_plugin_raw.json"]
+
+def test_interrupted_raw_stream_leaves_no_snapshot(tmp_path):
+    """Test that leaving the raw writer through an exception discards its files"""
+    service = ScraperService(storage_dir=tmp_path)
+    timestamp = datetime(2025, 1, 1, 3)
+    
+    with pytest.raises(asyncio.CancelledError):
+        with service.storage.open_raw_stream(timestamp, "hangar") as writer:
+            writer.write("plugin", {"id": 1})
+            raise asyncio.CancelledError()
+    
+    assert list((tmp_path / "data" / "raw" / "20250101_030000").iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_run_finishes_without_hanging_or_failing_platforms(tmp_path):
+    """Test that a hanging and a failing platform are marked degraded instead of stalling the run"""
+    service = ScraperService(storage_dir=tmp_path)
+    
+    async def hang():
+        await asyncio.sleep(60)
+    
+    clients = {name: AsyncMock() for name in ("modrinth", "hangar", "polymart")}
+    for client in clients.values():
+        client.supports_streaming = False
+        client.failed_types = {}
+    clients["modrinth"].fetch_resources.return_value = {}
+    clients["hangar"].fetch_resources.side_effect = RuntimeError("boom")
+    clients["polymart"].fetch_resources.side_effect = hang
+    service.client_factory.create = Mock(side_effect=lambda platform: clients[platform])
+    service._get_platforms = lambda: [
+        Platform(name=name, batch_size=10, deadline=0.05) for name in clients
+    ]
+    
+    service.storage = AsyncMock()
+    service.aggregator = Mock()
+    service.aggregator.aggregate.return_value = {
+        "metadata": {"total_resources": 0, "platforms": []},
+        "resources": {"tabs": [], "resources": {}}
+    }
+    
+    await asyncio.wait_for(service.run(), 5)
+    
+    assert set(service.degraded) == {"hangar", "polymart"}
+    assert "Deadline" in service.degraded["polymart"]
+    assert service.storage.save_raw_data.call_args[0][0] == {"modrinth": {}}
+    assert service.aggregator.aggregate.call_args.kwargs["degraded"] == service.degraded
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_pages_into_raw_snapshot(tmp_path, monkeypatch):
+    """Test that paged platforms flow through the pipeline and their raw files replay identically"""
+    monkeypatch.chdir(tmp_path)
+    service = ScraperService(storage_dir=tmp_path)
+    service.pipeline_depth = 1
+    timestamp = datetime(2025, 1, 1, 3)
+    raw_dir = tmp_path / "data" / "raw" / "20250101_030000"
+    
+    mock = MockPlatformServer(MockSettings(size=230))
+    async with TestServer(mock.create_app()) as test_server:
+        urls = api_urls(str(test_server.make_url("/")))
+        manager = HTTPSessionManager({"rate_limits": {"default": {"rate": 1000, "burst": 1000}}})
+        try:
+            modrinth = ModrinthClient(session_manager=manager)
+            modrinth.base_url = urls["modrinth"]
+            modrinth.max_results = {"default": 150}
+            hangar = HangarClient(session_manager=manager)
+            hangar.base_url = urls["hangar"]
+            clients = {"modrinth": modrinth, "hangar": hangar}
+            service.client_factory.create = Mock(side_effect=lambda platform: clients[platform])
+            
+            results = {}
+            for name in clients:
+                platform = next(p for p in service._get_platforms() if p.name == name)
+                raw_data, results[name] = await service._run_platform(platform, timestamp)
+                assert raw_data is None
+        finally:
+            await manager.close()
+    
+    modrinth_types = service.config["platforms"]["modrinth"]["resource_types"]
+    assert len(results["modrinth"]) == 150 * len(modrinth_types)
+    assert len(results["hangar"]) == 230 * 2
+    
+    mods = json.loads((raw_dir / "modrinth_mod_raw.json").read_text())
+    assert len(mods["hits"]) == 150
+    assert all("enrichment" in hit for hit in mods["hits"])
+    addons = json.loads((raw_dir / "hangar_addon_raw.json").read_text())
+    assert addons["total"] == 230
+    
+    replayed = service.transformers["modrinth"].transform({"mod": mods})
+    assert replayed == [r for r in results["modrinth"] if r.resource_type == "mod"]
+
+@pytest.mark.asyncio
+async def test_sharded_run_merges_work_units_into_snapshots(tmp_path, monkeypatch):
+    """Test that work units drained by several workers merge into the usual snapshots"""
+    monkeypatch.chdir(tmp_path)
+    mock = MockPlatformServer(MockSettings(size=230))
+    sharding = {"shard_size": 100, "lease_timeout": 5, "poll_interval": 0.01}
+    
+    async with TestServer(mock.create_app()) as test_server:
+        urls = api_urls(str(test_server.make_url("/")))
+        manager = HTTPSessionManager({"rate_limits": {"default": {"rate": 1000, "burst": 1000}}})
+        
+        def create_client(platform):
+            client_class = {"modrinth": ModrinthClient, "hangar": HangarClient, "polymart": PolymartClient}
+            client = client_class[platform](session_manager=manager)
+            client.base_url = urls[platform]
+            if platform == "modrinth":
+                client.max_results = {"default": 150}
+            return client
+        
+        def make_service():
+            service = ScraperService(storage_dir=tmp_path)
+            service.sharding = sharding
+            service.client_factory.session_manager = manager
+            service.client_factory.create = Mock(side_effect=create_client)
+            return service
+        
+        coordinator = make_service()
+        coordinator._get_run_timestamp = lambda: datetime(2025, 1, 1, 3)
+        coordinator.aggregator = Mock()
+        coordinator.aggregator.aggregate.return_value = {
+            "metadata": {"total_resources": 0, "platforms": []},
+            "resources": {"tabs": [], "resources": {}}
+        }
+        workers = []
+        coordinator._start_workers = lambda run_id, count: workers.extend(
+            asyncio.create_task(make_service().work(run_id)) for _ in range(count)
+        ) or []
+        
+        try:
+            results = await asyncio.wait_for(coordinator.run_sharded(2), 30)
+            completed = await asyncio.gather(*workers)
+        finally:
+            await manager.close()
+    
+    queue = coordinator._work_queue("20250101_030000")
+    assert sum(completed) == len(queue.units())
+    assert {unit.unit_id for unit in queue.units() if unit.platform == "hangar"} == {
+        "hangar__plugin__000000000", "hangar__plugin__000000100", "hangar__plugin__000000200",
+        "hangar__addon__000000000", "hangar__addon__000000100", "hangar__addon__000000200"
+    }
+    assert coordinator.degraded == {}
+    
+    modrinth_types = coordinator.config["platforms"]["modrinth"]["resource_types"]
+    polymart_types = coordinator.config["platforms"]["polymart"]["resource_types"]
+    assert len(results["modrinth"]) == 150 * len(modrinth_types)
+    assert len(results["hangar"]) == 230 * 2
+    assert len(results["polymart"]) == 230 * len(polymart_types)
+    
+    raw_dir = tmp_path / "data" / "raw" / "20250101_030000"
+    mods = json.loads((raw_dir / "modrinth_mod_raw.json").read_text())
+    assert [hit["project_id"] for hit in mods["hits"]] == [f"mod-{i:07d}" for i in range(150)]
+    processed = json.loads((tmp_path / "data" / "processed" / "20250101_030000" / "hangar_processed.json").read_text())
+    assert len(processed["resources"]["plugin"]) == 230
+    
+    metrics = json.loads((raw_dir / "fetch_metrics.json").read_text())
+    host = metrics["hosts"][test_server.host]
+    assert host["requests"] >= len(queue.units())
+    assert host["latency"]["count"] == host["requests"]
+    assert [set(hosts[test_server.host]) for hosts in metrics["workers"].values()] == [{"concurrency", "rate_limit"}]
+
+@pytest.mark.asyncio
+async def test_resumed_run_skips_checkpointed_pages(tmp_path, monkeypatch):
+    """Test that resuming a run refetches only the pages missing from its checkpoint"""
+    monkeypatch.chdir(tmp_path)
+    timestamp = datetime(2025, 1, 1, 3)
+    partial_dir = tmp_path / "data" / "raw" / "20250101_030000" / ".partial"
+    
+    with pytest.raises(ScraperError):
+        ScraperService(storage_dir=tmp_path, resume="yesterday")
+    
+    mock = MockPlatformServer(MockSettings(size=230))
+    async with TestServer(mock.create_app()) as test_server:
+        urls = api_urls(str(test_server.make_url("/")))
+        
+        async def run_hangar(service):
+            # 每次執行使用獨立的會話，如同新行程
+            manager = HTTPSessionManager({"rate_limits": {"default": {"rate": 1000, "burst": 1000}}})
+            checkpoint = service._open_checkpoint(service._get_run_timestamp().strftime("%Y%m%d_%H%M%S"))
+            client = HangarClient(session_manager=manager)
+            client.base_url = urls["hangar"]
+            client.checkpoint = service.client_factory.checkpoint
+            service.client_factory.create = Mock(return_value=client)
+            platform = next(p for p in service._get_platforms() if p.name == "hangar")
+            try:
+                _, resources = await service._run_platform(platform, timestamp)
+            finally:
+                await manager.close()
+            return checkpoint, resources
+        
+        interrupted = ScraperService(storage_dir=tmp_path)
+        interrupted._get_run_timestamp = lambda: timestamp
+        checkpoint, first = await run_hangar(interrupted)
+        pages = sorted((partial_dir / "hangar").glob("*.json"))
+        assert len(pages) == 10
+        assert checkpoint.saved == len(pages)
+        # 執行在抓取最後兩頁前中斷
+        for page in pages[-2:]:
+            page.unlink()
+        
+        requests_before = mock.stats.requests
+        resumed = ScraperService(storage_dir=tmp_path, resume="20250101_030000")
+        assert resumed._get_run_timestamp() == timestamp
+        checkpoint, second = await run_hangar(resumed)
+    
+    assert mock.stats.requests - requests_before == 2
+    assert checkpoint.hits == len(pages) - 2
+    key = lambda resource: (resource.resource_type, resource.id)
+    assert sorted(second, key=key) == sorted(first, key=key)
+    
+    resumed._close_checkpoint(checkpoint)
+    assert not partial_dir.exists()
@@ -0,0 +1,72 @@
+"""
+Tests for the file-based work unit lease queue
+"""
+
+import os
+import time
+
+from ..services.work_queue import LeaseQueue, WorkUnit
+
+def test_units_are_leased_to_one_worker_at_a_time(tmp_path):
+    """Test that a leased unit is skipped by other workers until it is released"""
+    queue = LeaseQueue(tmp_path)
+    units = [WorkUnit("hangar", "plugin", 0, 100), WorkUnit("hangar", "plugin", 100, 150)]
+    assert queue.add(units) == 2
+    assert queue.add(units) == 0
+    
+    first = queue.claim("a")
+    second = queue.claim("b")
+    assert {first, second} == set(units)
+    assert queue.claim("c") is None
+    
+    queue.complete(first, {"items": [1]})
+    queue.release(second)
+    assert queue.claim("c") == second
+    assert queue.pending() == 1
+    assert queue.result(first) == {"items": [1]}
+
+def test_stale_lease_is_taken_over(tmp_path):
+    """Test that a unit whose worker stopped heartbeating is leased again"""
+    queue = LeaseQueue(tmp_path, lease_timeout=60)
+    unit = WorkUnit("modrinth", "mod", 0, 100)
+    queue.add([unit])
+    assert queue.claim("crashed") == unit
+    assert queue.claim("other") is None
+    
+    lock_path = tmp_path / "leases" / f"{unit.unit_id}.lock"
+    stale = time.time() - 120
+    os.utime(lock_path, (stale, stale))
+    assert queue.claim("other") == unit
+    assert queue.claim("third") is None
+
+def test_failed_unit_is_retried_until_attempts_run_out(tmp_path):
+    """Test that failures release the unit and the last attempt marks it failed"""
+    queue = LeaseQueue(tmp_path, max_attempts=2)
+    unit = WorkUnit("polymart", "plugin")
+    queue.add([unit])
+    
+    queue.fail(queue.claim("a"), "boom")
+    assert queue.status(unit) is None
+    queue.fail(queue.claim("b"), "boom again")
+    
+    assert queue.status(unit) == {"status": "failed", "error": "boom again"}
+    assert queue.claim("c") is None
+    assert queue.pending() == 0
+
+def test_repeatedly_expiring_lease_marks_unit_failed(tmp_path):
+    """Test that a unit whose lease keeps expiring stops being leased after max_attempts"""
+    queue = LeaseQueue(tmp_path, lease_timeout=60, max_attempts=2)
+    unit = WorkUnit("modrinth", "modpack")
+    queue.add([unit])
+    lock_path = tmp_path / "leases" / f"{unit.unit_id}.lock"
+    stale = time.time() - 120
+    
+    assert queue.claim("a") == unit
+    os.utime(lock_path, (stale, stale))
+    assert queue.claim("b") == unit
+    os.utime(lock_path, (stale, stale))
+    
+    assert queue.claim("c") is None
+    assert queue.status(unit) == {"status": "failed", "error": "lease expired"}
+    assert not lock_path.exists()
+    assert queue.pending() == 0
@@ -0,0 +1,84 @@
+"""Per-page checkpoints of a scrape run."""
+
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+
+from scraper.utils import codec
+
+logger = structlog.get_logger(__name__)
+
+class PageCheckpoint:
+    """
+    Store every fetched page of a run so a resumed run can skip it.
+    
+    Pages are kept as ``<root>/<platform>/<key>.json`` and written to a
+    temporary file first, so a run dying mid-write never leaves a truncated
+    page behind. A page that cannot be read is fetched again.
+    """
+    
+    def __init__(self, root: Path) -> None:
+        """
+        Initialize the checkpoint
+        
+        Args:
+            root: Checkpoint directory, usually ``data/raw/<timestamp>/.partial``
+        """
+        self.root = root
+        self.hits = 0
+        self.saved = 0
+    
+    def _path(self, platform: str, key: str) -> Path:
+        """Path of a page, with the key made safe as a file name"""
+        return self.root / platform / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}.json"
+    
+    def load(self, platform: str, key: str) -> Optional[Any]:
+        """
+        Get a checkpointed page
+        
+        Args:
+            platform: Platform identifier
+            key: Page identifier within the platform
+        
+        Returns:
+            The stored page, or None if it has not been completed
+        """
+        path = self._path(platform, key)
+        try:
+            page = codec.read_json(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, codec.JSONDecodeError) as e:
+            logger.warning("checkpoint_page_unreadable", path=str(path), error=str(e))
+            return None
+        self.hits += 1
+        return page
+    
+    def save(self, platform: str, key: str, page: Any) -> None:
+        """
+        Checkpoint a completed page
+        
+        Args:
+            platform: Platform identifier
+            key: Page identifier within the platform
+            page: JSON-serializable page content
+        """
+        path = self._path(platform, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        codec.write_json(tmp_path, page, indent=False)
+        os.replace(tmp_path, path)
+        self.saved += 1
+    
+    def exists(self) -> bool:
+        """Whether any page has been checkpointed"""
+        return self.root.exists()
+    
+    def clear(self) -> None:
+        """Remove every checkpointed page once the run's snapshot is complete"""
+        shutil.rmtree(self.root, ignore_errors=True)
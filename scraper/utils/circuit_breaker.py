@@ -0,0 +1,124 @@
+"""Per-host circuit breakers for HTTP requests."""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+    pass
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single host.
+    
+    After ``failure_threshold`` consecutive failed requests (retries already
+    exhausted) the circuit opens and requests fail fast for ``reset_timeout``
+    seconds. Then a single trial request is let through: success closes the
+    circuit, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 60.0) -> None:
+        """
+        Initialize the breaker
+        
+        Args:
+            host: Host the breaker guards
+            failure_threshold: Consecutive failures opening the circuit
+            reset_timeout: Seconds the circuit stays open before a trial request
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+    
+    def check(self) -> bool:
+        """
+        Make sure a request may be sent to the host
+        
+        The caller of a trial request must resolve it with
+        ``record_success`` or ``record_failure``, also when the request is
+        cancelled, otherwise the circuit stays half-open.
+        
+        Returns:
+            True if the request is the trial request of a half-open circuit
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit open for {self.host}")
+            self.state = self.HALF_OPEN
+            logger.info("circuit_half_open", host=self.host)
+            return True
+        if self.state == self.HALF_OPEN:
+            # Only the trial request is let through
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+        return False
+    
+    def record_success(self) -> None:
+        """Record a successful request"""
+        if self.state != self.CLOSED:
+            logger.info("circuit_closed", host=self.host)
+        self.state = self.CLOSED
+        self.failures = 0
+    
+    def record_failure(self) -> None:
+        """Record a failed request"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning("circuit_opened", host=self.host, failures=self.failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+class CircuitBreakers:
+    """Registry of circuit breakers, one per host"""
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Initialize the registry
+        
+        Args:
+            settings: ``failure_threshold``/``reset_timeout`` applied to every host
+        """
+        self.settings = settings or {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    def for_host(self, host: str) -> CircuitBreaker:
+        """
+        Get the breaker for a host, creating it on first use
+        
+        Args:
+            host: Request host
+        
+        Returns:
+            The host's circuit breaker
+        """
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, **self.settings)
+            self._breakers[host] = breaker
+        return breaker
+    
+    def tripped_hosts(self) -> List[str]:
+        """
+        Get the hosts whose circuit opened at least once
+        
+        Returns:
+            Host names, in first-use order
+        """
+        return [host for host, breaker in self._breakers.items() if breaker.trips]
@@ -0,0 +1,76 @@
+"""In-flight request coalescing and per-run response memoization."""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class RequestCoalescer:
+    """
+    Share one request among identical concurrent calls and remember results.
+    
+    The first call for a key starts the request; calls for the same key made
+    while it runs await the same task instead of sending their own. With
+    ``memoize``, results accepted by ``memoize_if`` are kept for the rest of
+    the run, up to ``max_entries`` (least recently used first out). Failures
+    are never remembered, so a later call retries.
+    """
+    
+    def __init__(self, memoize: bool = False, max_entries: Optional[int] = 10000,
+                 memoize_if: Optional[Callable[[Any], bool]] = None) -> None:
+        """
+        Initialize the coalescer
+        
+        Args:
+            memoize: Keep completed results for later calls
+            max_entries: Maximum number of remembered results, unbounded when None
+            memoize_if: Check deciding whether a result may be remembered
+        """
+        self.memoize = memoize
+        self.max_entries = max_entries
+        self.memoize_if = memoize_if or (lambda result: True)
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.coalesced = 0
+        self.memo_hits = 0
+    
+    async def run(self, key: Hashable, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get the result for a key, sending the request only when needed
+        
+        Args:
+            key: Identity of the request
+            request: Coroutine function sending the request
+        
+        Returns:
+            The request's result, possibly shared with other callers
+        """
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.memo_hits += 1
+            return self._results[key]
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(request())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.coalesced += 1
+        
+        # A cancelled caller must not cancel the request for the others
+        return await asyncio.shield(task)
+    
+    def _complete(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished request and remember its result"""
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if self.memoize and self.memoize_if(result):
+            self._results[key] = result
+            if self.max_entries is not None and len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Forget every remembered result"""
+        self._results.clear()
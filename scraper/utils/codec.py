@@ -0,0 +1,106 @@
+"""JSON codec using orjson when installed, the standard library otherwise."""
+
+import dataclasses
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+def _default(obj: Any) -> Any:
+    """Encode the types orjson supports natively with the standard library"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Encode an object as UTF-8 JSON
+    
+    Datetimes, dates and times are written in ISO 8601, enums as their value
+    and dataclasses as objects. Non-ASCII characters are kept as-is.
+    
+    Args:
+        obj: Object to encode
+        indent: Pretty-print with two-space indentation
+        sort_keys: Sort object keys
+    
+    Returns:
+        Encoded JSON
+    
+    Raises:
+        TypeError: If the object contains an unsupported type
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":")
+    ).encode("utf-8")
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decode JSON
+    
+    Args:
+        data: JSON document
+    
+    Returns:
+        Decoded object
+    
+    Raises:
+        JSONDecodeError: If the document is malformed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def read_json(path: Path) -> Any:
+    """
+    Read and decode a JSON file
+    
+    Args:
+        path: File to read
+    
+    Returns:
+        Decoded object
+    
+    Raises:
+        JSONDecodeError: If the file is malformed
+    """
+    return loads(Path(path).read_bytes())
+
+def write_json(path: Path, obj: Any, indent: bool = True) -> None:
+    """
+    Encode an object and write it to a JSON file
+    
+    Args:
+        path: File to write
+        obj: Object to encode
+        indent: Pretty-print with two-space indentation
+    """
+    Path(path).write_bytes(dumps(obj, indent=indent))
@@ -0,0 +1,153 @@
+"""Adaptive per-host concurrency limits."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for a single host.
+    
+    Every healthy response grows the limit by ``1 / limit``, i.e. by about
+    one slot per round of requests. A 429/5xx, a connection failure or a
+    response slower than ``latency_factor`` times the host's typical
+    latency multiplies the limit by ``decrease``. Requests that were already
+    in flight when the limit was cut do not cut it again, so one burst of
+    failures counts as a single congestion signal.
+    """
+    
+    def __init__(self, host: str, initial: float = 4, min_limit: float = 1,
+                 max_limit: float = 32, decrease: float = 0.5,
+                 latency_factor: float = 3.0, smoothing: float = 0.1) -> None:
+        """
+        Initialize the limit
+        
+        Args:
+            host: Host the limit applies to
+            initial: Starting number of concurrent requests
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            decrease: Factor applied to the limit on congestion
+            latency_factor: Latency above this multiple of the typical latency counts as congestion
+            smoothing: Weight of a new sample in the typical latency average
+        """
+        self.host = host
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.peak_limit = self.limit
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """
+        Hold one of the host's concurrent request slots
+        
+        Yields:
+            Monotonic time the slot was acquired, to pass to ``record_*``
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield time.monotonic()
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+    
+    def record_success(self, started: float) -> None:
+        """
+        Record a response that was not rate limited or a server error
+        
+        Args:
+            started: Value yielded by ``slot`` for the request
+        """
+        latency = time.monotonic() - started
+        spike = self.latency is not None and latency > self.latency * self.latency_factor
+        # The average follows spikes too, so a lasting slowdown becomes the new normal
+        self.latency = latency if self.latency is None else (
+            (1 - self.smoothing) * self.latency + self.smoothing * latency
+        )
+        if spike:
+            self._cut(started, f"latency {latency:.3f}s")
+            return
+        
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self.peak_limit = max(self.peak_limit, self.limit)
+    
+    def record_failure(self, started: float) -> None:
+        """
+        Record a 429/5xx response or a failed connection
+        
+        Args:
+            started: Value yielded by ``slot`` for the request
+        """
+        self._cut(started, "failure")
+    
+    def _cut(self, started: float, reason: str) -> None:
+        """Decrease the limit unless the request predates the last decrease"""
+        if started <= self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.decreases += 1
+        logger.info("concurrency_decreased", host=self.host, limit=round(self.limit, 2), reason=reason)
+
+class AdaptiveConcurrency:
+    """Registry of adaptive concurrency limits, one per host"""
+    
+    def __init__(self, settings: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """
+        Initialize the registry
+        
+        Args:
+            settings: Per-host ``AdaptiveLimit`` settings; the ``default`` key applies to other hosts
+        """
+        self.settings = settings or {}
+        self._limits: Dict[str, AdaptiveLimit] = {}
+    
+    def for_host(self, host: str) -> AdaptiveLimit:
+        """
+        Get the limit for a host, creating it on first use
+        
+        Args:
+            host: Request host
+        
+        Returns:
+            The host's concurrency limit
+        """
+        limit = self._limits.get(host)
+        if limit is None:
+            limit = AdaptiveLimit(host, **{**self.settings.get("default", {}), **self.settings.get(host, {})})
+            self._limits[host] = limit
+        return limit
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the current limit of every host
+        
+        Returns:
+            Dict mapping hosts to their current and peak limit, decrease count and typical latency
+        """
+        return {
+            host: {
+                "limit": round(limit.limit, 2),
+                "peak_limit": round(limit.peak_limit, 2),
+                "decreases": limit.decreases,
+                "latency": round(limit.latency, 4) if limit.latency is not None else None
+            }
+            for host, limit in self._limits.items()
+        }
@@ -0,0 +1,253 @@
+"""Per-host fetch metrics: latency histograms, bytes, retries and status codes."""
+
+import bisect
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scraper.utils import codec
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+    
+    Bucket bounds grow by a factor of ``2 ** (1 / 4)`` from 1 ms, so a
+    percentile read from the histogram is within about 19% of the exact
+    value while memory stays constant regardless of the request count.
+    """
+    
+    BOUNDS: List[float] = [0.001 * 2 ** (i / 4) for i in range(70)]
+    # Bucket index of each bound as rounded by ``to_dict``
+    _BOUND_INDEX: Dict[float, int] = {round(bound, 6): index for index, bound in enumerate(BOUNDS)}
+    
+    def __init__(self) -> None:
+        """Initialize an empty histogram"""
+        # The last bucket holds everything above the largest bound
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, seconds: float) -> None:
+        """
+        Add a sample
+        
+        Args:
+            seconds: Observed latency
+        """
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def add_dict(self, data: Dict[str, Any]) -> None:
+        """
+        Add the samples of another histogram
+        
+        Args:
+            data: ``to_dict`` output of the other histogram
+        """
+        for bucket in data.get("buckets", []):
+            index = len(self.BOUNDS) if bucket["le"] is None else self._BOUND_INDEX[bucket["le"]]
+            self.counts[index] += bucket["count"]
+        self.count += data.get("count", 0)
+        self.total += (data.get("mean") or 0) * data.get("count", 0)
+        self.max = max(self.max, data.get("max") or 0)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a percentile
+        
+        Args:
+            q: Percentile between 0 and 100
+        
+        Returns:
+            Upper bound of the bucket holding the percentile, None without samples
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(self.count * q / 100), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.BOUNDS[index], self.max) if index < len(self.BOUNDS) else self.max
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the histogram to a dict, listing only non-empty buckets"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "p50": _round(self.percentile(50)),
+            "p95": _round(self.percentile(95)),
+            "p99": _round(self.percentile(99)),
+            "buckets": [
+                {"le": round(self.BOUNDS[index], 6) if index < len(self.BOUNDS) else None, "count": count}
+                for index, count in enumerate(self.counts) if count
+            ]
+        }
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Round a latency for output"""
+    return round(value, 6) if value is not None else None
+
+class HostMetrics:
+    """Fetch counters of a single host"""
+    
+    def __init__(self) -> None:
+        """Initialize zeroed counters"""
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.retries = 0
+        self.bytes_compressed = 0
+        self.bytes_uncompressed = 0
+        self.status_counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the counters to a dict"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "bytes_compressed": self.bytes_compressed,
+            "bytes_uncompressed": self.bytes_uncompressed,
+            "status_counts": dict(sorted(self.status_counts.items())),
+            "errors": dict(self.errors),
+            "latency": self.latency.to_dict()
+        }
+
+class FetchMetrics:
+    """
+    Registry of fetch metrics, one ``HostMetrics`` per host.
+    
+    Every attempt counts as a request, including attempts that are retried.
+    Latency runs from sending the request until its response is released,
+    so it covers reading the body.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry"""
+        self._hosts: Dict[str, HostMetrics] = {}
+    
+    def for_host(self, host: str) -> HostMetrics:
+        """
+        Get the metrics of a host, creating them on first use
+        
+        Args:
+            host: Request host
+        
+        Returns:
+            The host's metrics
+        """
+        metrics = self._hosts.get(host)
+        if metrics is None:
+            metrics = HostMetrics()
+            self._hosts[host] = metrics
+        return metrics
+    
+    def record_response(self, host: str, status: int, latency: float,
+                        bytes_compressed: int, bytes_uncompressed: int) -> None:
+        """
+        Record a completed attempt
+        
+        Args:
+            host: Request host
+            status: Response status
+            latency: Seconds from sending the request to releasing the response
+            bytes_compressed: Body bytes received on the wire
+            bytes_uncompressed: Body bytes after content decoding
+        """
+        metrics = self.for_host(host)
+        metrics.requests += 1
+        metrics.latency.add(latency)
+        metrics.bytes_compressed += bytes_compressed
+        metrics.bytes_uncompressed += bytes_uncompressed
+        key = str(status)
+        metrics.status_counts[key] = metrics.status_counts.get(key, 0) + 1
+    
+    def record_error(self, host: str, error: BaseException, latency: float) -> None:
+        """
+        Record an attempt that failed without a response
+        
+        Args:
+            host: Request host
+            error: Connection error or timeout
+            latency: Seconds until the attempt failed
+        """
+        metrics = self.for_host(host)
+        metrics.requests += 1
+        metrics.latency.add(latency)
+        name = type(error).__name__
+        metrics.errors[name] = metrics.errors.get(name, 0) + 1
+    
+    def record_retry(self, host: str) -> None:
+        """
+        Record a retried attempt
+        
+        Args:
+            host: Request host
+        """
+        self.for_host(host).retries += 1
+    
+    def add_dict(self, data: Dict[str, Any]) -> None:
+        """
+        Add the counters of another registry, such as a worker's metrics file
+        
+        Args:
+            data: ``to_dict`` output of the other registry
+        """
+        for host, host_data in data.get("hosts", {}).items():
+            metrics = self.for_host(host)
+            metrics.requests += host_data["requests"]
+            metrics.retries += host_data["retries"]
+            metrics.bytes_compressed += host_data["bytes_compressed"]
+            metrics.bytes_uncompressed += host_data["bytes_uncompressed"]
+            for counts, other in ((metrics.status_counts, host_data["status_counts"]),
+                                  (metrics.errors, host_data["errors"])):
+                for key, count in other.items():
+                    counts[key] = counts.get(key, 0) + count
+            metrics.latency.add_dict(host_data["latency"])
+    
+    def to_dict(self, host_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Convert the metrics to a dict
+        
+        Args:
+            host_stats: Extra per-host sections, such as ``{"concurrency": {host: stats}}``,
+                added to the hosts that have metrics
+        
+        Returns:
+            Totals over every host and the per-host metrics
+        """
+        hosts = {host: metrics.to_dict() for host, metrics in sorted(self._hosts.items())}
+        for section, stats in (host_stats or {}).items():
+            for host, host_section in stats.items():
+                if host in hosts:
+                    hosts[host][section] = host_section
+        return {
+            "totals": {
+                key: sum(host[key] for host in hosts.values())
+                for key in ("requests", "retries", "bytes_compressed", "bytes_uncompressed")
+            },
+            "hosts": hosts
+        }
+    
+    def write(self, path: Path, host_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+              **extra: Any) -> None:
+        """
+        Write the metrics to a JSON file
+        
+        Args:
+            path: Output file
+            host_stats: Extra per-host sections, see ``to_dict``
+            **extra: Additional top-level fields, such as the run timestamp
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 分片執行時協調者會同時讀取 worker 的檔案，先寫暫存檔再搬移
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        codec.write_json(tmp_path, {**extra, **self.to_dict(host_stats)})
+        os.replace(tmp_path, path)
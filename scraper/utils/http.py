@@ -1,7 +1,383 @@
 """HTTP client utilities."""
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
 import aiohttp
-from typing import Any, Dict, Optional
+import structlog
+from yarl import URL
+
+from scraper.config import get_config
+from scraper.utils import codec
+from scraper.utils.circuit_breaker import CircuitBreakers
+from scraper.utils.coalesce import RequestCoalescer
+from scraper.utils.concurrency import AdaptiveConcurrency
+from scraper.utils.fetch_metrics import FetchMetrics
+from scraper.utils.http_cache import HTTPCache
+from scraper.utils.http_record import HTTPRecorder
+from scraper.utils.json_stream import JSONItemStream
+from scraper.utils.rate_limit import RateLimiter
+from scraper.utils.retry import RetryPolicy, parse_retry_after
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class HTTPResult:
+    """A fully read HTTP response"""
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+    
+    def text(self) -> str:
+        """Decode the body as UTF-8 text"""
+        return self.body.decode("utf-8", errors="replace")
+    
+    def json(self) -> Any:
+        """Decode the body as JSON"""
+        return codec.loads(self.body)
+
+def _json_serialize(obj: Any) -> str:
+    """Encode ``json=`` request bodies with the shared codec"""
+    return codec.dumps(obj).decode("utf-8")
+
+class HTTPSessionManager:
+    """
+    Shared aiohttp session for every platform client in a run.
+    
+    A single pooled connector is created lazily and reused until ``close()``,
+    so TCP/TLS handshakes and DNS lookups are paid once per host per run
+    instead of once per client call. Every request also passes through the
+    per-host rate limiter, which follows the hosts' rate limit headers, and
+    the run-wide retry policy for 429/5xx responses and connection failures.
+    Requests are bounded by the configured timeouts, and a per-host circuit
+    breaker fails requests fast once a host keeps failing. Identical GETs
+    sent through ``fetch`` are coalesced, and memoized for the run when
+    ``coalesce.memoize`` is enabled.
+    """
+    
+    DEFAULTS: Dict[str, Any] = {
+        "limit": 100,
+        "limit_per_host": 10,
+        "dns_cache_ttl": 300,
+        "keepalive_timeout": 30,
+    }
+    
+    # Per-request timeouts in seconds, see aiohttp.ClientTimeout
+    DEFAULT_TIMEOUT: Dict[str, float] = {
+        "total": 60,
+        "connect": 10,
+        "sock_read": 30,
+    }
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None,
+                 cache: Optional[HTTPCache] = None) -> None:
+        """
+        Initialize the manager
+        
+        Args:
+            settings: Connection pool settings, defaults to the ``http`` section of config.yml
+            cache: On-disk response cache used by ``fetch``
+        """
+        if settings is None:
+            settings = get_config().get("http", {})
+        self.settings = {**self.DEFAULTS, **settings}
+        self.rate_limiter = RateLimiter(self.settings.get("rate_limits"))
+        self.retry_policy = RetryPolicy(**self.settings.get("retry", {}))
+        self.timeout = aiohttp.ClientTimeout(**{**self.DEFAULT_TIMEOUT, **self.settings.get("timeout", {})})
+        self.circuit_breakers = CircuitBreakers(self.settings.get("circuit_breaker"))
+        self.concurrency = AdaptiveConcurrency(self.settings.get("concurrency"))
+        self.metrics = FetchMetrics()
+        coalesce_settings = self.settings.get("coalesce", {})
+        self.coalescer: Optional[RequestCoalescer] = None
+        if coalesce_settings.get("enabled", True):
+            self.coalescer = RequestCoalescer(
+                memoize=coalesce_settings.get("memoize", False),
+                max_entries=coalesce_settings.get("max_entries", 10000),
+                memoize_if=lambda result: result.status == 200
+            )
+        self.cache = cache
+        self.recorder: Optional[HTTPRecorder] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+    
+    @property
+    def closed(self) -> bool:
+        """Whether there is no open session"""
+        return self._session is None or self._session.closed
+    
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """Create the pooled connector shared by all requests"""
+        return aiohttp.TCPConnector(
+            limit=self.settings["limit"],
+            limit_per_host=self.settings["limit_per_host"],
+            use_dns_cache=True,
+            ttl_dns_cache=self.settings["dns_cache_ttl"],
+            keepalive_timeout=self.settings["keepalive_timeout"],
+        )
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session, creating it on first use
+        
+        Returns:
+            The shared aiohttp session
+        """
+        async with self._lock:
+            if self.closed:
+                self._session = aiohttp.ClientSession(connector=self._create_connector(),
+                                                      timeout=self.timeout,
+                                                      json_serialize=_json_serialize)
+                logger.info("http_session_opened",
+                           limit=self.settings["limit"],
+                           limit_per_host=self.settings["limit_per_host"])
+            return self._session
+    
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request through the shared session
+        
+        Rate limited and transient failures are retried according to the
+        retry policy; the last response is yielded once retries run out.
+        Each attempt holds a slot of the host's adaptive concurrency limit
+        until its response is released.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments passed to ``aiohttp.ClientSession.request``
+            
+        Yields:
+            The response, released when the context exits
+            
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open
+            aiohttp.ClientError: If the connection keeps failing
+            asyncio.TimeoutError: If the request keeps timing out
+        """
+        host = URL(url).host or ""
+        circuit = self.circuit_breakers.for_host(host)
+        session = await self.get_session()
+        bucket = self.rate_limiter.for_host(host)
+        limit = self.concurrency.for_host(host)
+        trial = circuit.check()
+        attempt = 0
+        
+        try:
+            while True:
+                await bucket.acquire()
+                # 重試等待在 slot 之外，避免佔用並行名額
+                async with limit.slot() as started:
+                    try:
+                        response = await session.request(method, url, **kwargs)
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                        limit.record_failure(started)
+                        self.metrics.record_error(host, e, time.monotonic() - started)
+                        delay = self.retry_policy.next_delay(attempt)
+                        if delay is None:
+                            circuit.record_failure()
+                            raise
+                        logger.warning("http_request_retry",
+                                      method=method,
+                                      url=url,
+                                      attempt=attempt + 1,
+                                      error=str(e) or type(e).__name__,
+                                      delay=round(delay, 3))
+                    else:
+                        bucket.update_from_headers(response.headers)
+                        delay = None
+                        if self.retry_policy.should_retry_status(response.status):
+                            limit.record_failure(started)
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                            if response.status == 429 and retry_after is not None:
+                                bucket.pause(retry_after)
+                            delay = self.retry_policy.next_delay(attempt, retry_after)
+                            if delay is not None:
+                                response.release()
+                                self._record_response(host, response, started)
+                                logger.warning("http_request_retry",
+                                              method=method,
+                                              url=url,
+                                              attempt=attempt + 1,
+                                              status=response.status,
+                                              delay=round(delay, 3))
+                            else:
+                                circuit.record_failure()
+                        else:
+                            limit.record_success(started)
+                            circuit.record_success()
+                        
+                        if delay is None:
+                            # The slot is held until the body has been read
+                            try:
+                                yield response
+                            finally:
+                                response.release()
+                                self._record_response(host, response, started)
+                            return
+                
+                self.metrics.record_retry(host)
+                await asyncio.sleep(delay)
+                attempt += 1
+        except BaseException:
+            # 試探請求被取消或意外失敗時重新開路，避免斷路器卡在半開狀態
+            if trial and circuit.state == circuit.HALF_OPEN:
+                circuit.record_failure()
+            raise
+    
+    def write_metrics(self, path: Path, **extra: Any) -> None:
+        """
+        Write the fetch metrics with each host's current concurrency limit and rate
+        
+        Args:
+            path: Output file
+            **extra: Additional top-level fields, such as the run timestamp
+        """
+        self.metrics.write(path, host_stats={
+            "concurrency": self.concurrency.stats(),
+            "rate_limit": self.rate_limiter.stats()
+        }, **extra)
+    
+    def _record_response(self, host: str, response: aiohttp.ClientResponse, started: float) -> None:
+        """Add a released response to the fetch metrics"""
+        content = response.content
+        # Older aiohttp releases only count the decoded body
+        self.metrics.record_response(host, response.status, time.monotonic() - started,
+                                     getattr(content, "total_raw_bytes", content.total_bytes),
+                                     content.total_bytes)
+    
+    async def fetch(self, method: str, url: str, **kwargs: Any) -> HTTPResult:
+        """
+        Send a request and read the whole response
+        
+        Concurrent identical GETs share a single request; with memoization
+        enabled, successful GET responses are also kept for the rest of the
+        run. With a cache configured, a stored entry is revalidated with
+        If-None-Match/If-Modified-Since and a 304 replays the cached body.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments passed to ``request``
+            
+        Returns:
+            The read response; replayed cache entries report status 200
+        """
+        if self.coalescer is None or method.upper() != "GET" or "json" in kwargs or "data" in kwargs:
+            return await self._fetch_once(method, url, **kwargs)
+        
+        full_url = str(URL(url).update_query(kwargs["params"])) if kwargs.get("params") else url
+        # Responses may depend on credentials, so they are part of the identity
+        authorization = kwargs.get("headers", {}).get("Authorization")
+        return await self.coalescer.run((full_url, authorization),
+                                        lambda: self._fetch_once(method, url, **kwargs))
+    
+    async def _fetch_once(self, method: str, url: str, **kwargs: Any) -> HTTPResult:
+        """
+        Send a request and read the whole response, without coalescing
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments passed to ``request``
+            
+        Returns:
+            The read response; replayed cache entries report status 200
+        """
+        key = None
+        entry = None
+        if self.cache is not None:
+            full_url = str(URL(url).update_query(kwargs["params"])) if kwargs.get("params") else url
+            key = self.cache.make_key(method, full_url, kwargs.get("json"))
+            entry = self.cache.load(key)
+            if entry is not None:
+                kwargs["headers"] = {**kwargs.get("headers", {}), **entry.conditional_headers()}
+        
+        async with self.request(method, url, **kwargs) as response:
+            if response.status == 304 and entry is not None:
+                self.cache.hits += 1
+                logger.debug("http_cache_hit", url=entry.url)
+                result = HTTPResult(url=entry.url, status=200, body=entry.body,
+                                    headers=entry.headers, from_cache=True)
+            else:
+                body = await response.read()
+                result = HTTPResult(url=str(response.url), status=response.status,
+                                    body=body, headers=dict(response.headers))
+                if key is not None and result.status == 200:
+                    self.cache.misses += 1
+                    self.cache.store(key, result.url, response.headers, body)
+        
+        if self.recorder is not None:
+            self.recorder.record(method, url, kwargs.get("headers", {}), kwargs.get("params"),
+                                 kwargs.get("json"), result.status, result.headers, result.body,
+                                 from_cache=result.from_cache)
+        return result
+    
+    async def stream_items(self, method: str, url: str, path: Sequence[str],
+                           chunk_size: int = 64 * 1024, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Send a request and decode the items of a JSON array as they arrive
+        
+        The body is read in chunks and fed to an incremental parser, so
+        neither the raw body nor the full object tree is held in memory.
+        Streamed responses bypass the response cache; with a recorder
+        attached, the body is still captured for the recording.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            path: Object keys leading from the document root to the array
+            chunk_size: Bytes read per chunk
+            **kwargs: Extra arguments passed to ``request``
+            
+        Yields:
+            Items of the array, one at a time
+            
+        Raises:
+            aiohttp.ClientResponseError: If the response status is not 200
+            ValueError: If the body has no array at the path or is malformed
+        """
+        async with self.request(method, url, **kwargs) as response:
+            if response.status != 200:
+                response.raise_for_status()
+                raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                  status=response.status, message="Unexpected status")
+            
+            captured = bytearray() if self.recorder is not None else None
+            parser = JSONItemStream(path)
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if captured is not None:
+                        captured.extend(chunk)
+                    for item in parser.feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+            finally:
+                if captured is not None:
+                    self.recorder.record(method, url, kwargs.get("headers", {}), kwargs.get("params"),
+                                         kwargs.get("json"), response.status, dict(response.headers),
+                                         bytes(captured))
+    
+    async def close(self) -> None:
+        """Close the shared session and its connector"""
+        if not self.closed:
+            await self._session.close()
+            logger.info("http_session_closed")
+        self._session = None
+    
+    async def __aenter__(self) -> "HTTPSessionManager":
+        await self.get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
 
 class BaseHTTPClient:
     """Base HTTP client with common functionality."""
@@ -48,7 +424,7 @@ class BaseHTTPClient:
                 if response.status != 200:
                     response_text = await response.text()
                     raise Exception(f"HTTP {response.status}: {response_text}")
-                data = await response.json()
+                data = codec.loads(await response.read())
                 if not isinstance(data, (dict, list)):
                     raise Exception(f"Unexpected response format: {data}")
                 return data
@@ -64,7 +440,7 @@ class BaseHTTPClient:
                 if response.status != 200:
                     response_text = await response.text()
                     raise Exception(f"HTTP {response.status}: {response_text}")
-                data = await response.json()
+                data = codec.loads(await response.read())
                 if not isinstance(data, (dict, list)):
                     raise Exception(f"Unexpected response format: {data}")
                 return data
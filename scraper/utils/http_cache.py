@@ -0,0 +1,136 @@
+"""On-disk HTTP response cache with conditional revalidation."""
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import structlog
+
+from scraper.utils import codec
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class CachedResponse:
+    """A cached response body with its validators"""
+    url: str
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Build the headers revalidating this entry
+        
+        Returns:
+            Dict with If-None-Match and/or If-Modified-Since
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class HTTPCache:
+    """
+    Persistent cache of validated HTTP responses.
+    
+    Entries are keyed by method, URL (including query) and request body and
+    are only stored when the server sent an ETag or Last-Modified header, so
+    every reuse goes through a conditional request first.
+    """
+    
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Initialize the cache
+        
+        Args:
+            cache_dir: Directory holding the cache entries
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(method: str, url: str, body: Any = None) -> str:
+        """
+        Build the cache key of a request
+        
+        Args:
+            method: HTTP method
+            url: Full request URL including the query string
+            body: JSON request body, if any
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode())
+        digest.update(b"\0")
+        digest.update(url.encode())
+        digest.update(b"\0")
+        if body is not None:
+            digest.update(codec.dumps(body, sort_keys=True))
+        return digest.hexdigest()
+    
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        """Get the metadata and body paths of an entry"""
+        entry_dir = self.cache_dir / key[:2]
+        return entry_dir / f"{key}.meta.json", entry_dir / f"{key}.body"
+    
+    def load(self, key: str) -> Optional[CachedResponse]:
+        """
+        Load a cache entry
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The cached response, or None when absent or unreadable
+        """
+        meta_path, body_path = self._paths(key)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            meta = codec.read_json(meta_path)
+            return CachedResponse(body=body_path.read_bytes(), **meta)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("http_cache_entry_unreadable", key=key, error=str(e))
+            return None
+    
+    def store(self, key: str, url: str, headers: Mapping[str, str], body: bytes) -> bool:
+        """
+        Store a response if it carries validators
+        
+        Args:
+            key: Cache key
+            url: Request URL
+            headers: Response headers
+            body: Response body
+        
+        Returns:
+            True if the response was stored
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+        
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {
+                name: headers[name] for name in ("Content-Type",) if name in headers
+            }
+        }
+        # Body first, so a crash never leaves metadata pointing at a missing body
+        body_path.write_bytes(body)
+        codec.write_json(meta_path, meta, indent=False)
+        return True
@@ -0,0 +1,72 @@
+"""HTTP request/response recording."""
+
+import base64
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from scraper.utils import codec
+
+class HTTPRecorder:
+    """
+    Append every request/response pair of a run to a JSON Lines file.
+    
+    Authorization headers are never written.
+    """
+    
+    REDACTED_HEADERS = frozenset({"authorization", "cookie"})
+    
+    def __init__(self, path: Path) -> None:
+        """
+        Initialize the recorder
+        
+        Args:
+            path: JSON Lines file to append to
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+    
+    def record(self, method: str, url: str, request_headers: Mapping[str, str],
+               params: Optional[Mapping[str, Any]], body: Any,
+               status: int, response_headers: Mapping[str, str], response_body: bytes,
+               from_cache: bool = False) -> None:
+        """
+        Record one request/response pair
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            request_headers: Request headers
+            params: Query parameters
+            body: JSON request body
+            status: Response status
+            response_headers: Response headers
+            response_body: Raw response body
+            from_cache: Whether the body was replayed from the HTTP cache
+        """
+        try:
+            encoded_body: Dict[str, str] = {"text": response_body.decode("utf-8")}
+        except UnicodeDecodeError:
+            encoded_body = {"base64": base64.b64encode(response_body).decode("ascii")}
+        
+        entry = {
+            "request": {
+                "method": method,
+                "url": url,
+                "params": dict(params) if params else None,
+                "headers": {
+                    name: value for name, value in request_headers.items()
+                    if name.lower() not in self.REDACTED_HEADERS
+                },
+                "json": body
+            },
+            "response": {
+                "status": status,
+                "headers": dict(response_headers),
+                "from_cache": from_cache,
+                **encoded_body
+            }
+        }
+        with open(self.path, "ab") as f:
+            f.write(codec.dumps(entry) + b"\n")
+        self.count += 1
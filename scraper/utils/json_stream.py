@@ -0,0 +1,149 @@
+"""Incremental decoding of JSON arrays from chunked input."""
+
+import codecs
+import json
+from typing import Any, List, Optional, Sequence
+
+_WHITESPACE = " \t\n\r"
+
+class JSONItemStream:
+    """
+    Incremental parser yielding the items of one JSON array.
+    
+    The array is located by a path of object keys, e.g. ``("response",
+    "result")``. Everything before it is scanned without building objects,
+    and every item is decoded and dropped from the buffer as soon as it is
+    complete, so memory stays bounded by the largest single item rather
+    than by the whole document.
+    """
+    
+    def __init__(self, path: Sequence[str]) -> None:
+        """
+        Initialize the parser
+        
+        Args:
+            path: Object keys leading from the document root to the array
+        """
+        self.path = list(path)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # Scanner state while looking for the array
+        self._stack: List[Optional[str]] = []  # Current key of each open object, None for arrays
+        self._in_string = False
+        self._escape = False
+        self._string_chars: List[str] = []
+        self._last_string: Optional[str] = None
+        self._in_array = False
+        self._done = False
+    
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Feed the next chunk of the document
+        
+        Args:
+            data: Raw bytes of the next chunk
+        
+        Returns:
+            Items completed by this chunk, in document order
+        
+        Raises:
+            ValueError: If the document is malformed
+        """
+        if self._done:
+            return []
+        self._buffer += self._text_decoder.decode(data)
+        return self._parse(final=False)
+    
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the document
+        
+        Returns:
+            Items still pending in the buffer
+        
+        Raises:
+            ValueError: If the array was not found or is incomplete
+        """
+        items = []
+        if not self._done:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            items = self._parse(final=True)
+        if not (self._in_array and self._done):
+            raise ValueError(f"JSON array at {'.'.join(self.path)} not found or incomplete")
+        return items
+    
+    def _parse(self, final: bool) -> List[Any]:
+        """Consume as much of the buffer as possible"""
+        if not self._in_array:
+            self._seek()
+            if not self._in_array:
+                return []
+        
+        items = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                self._done = True
+                pos = len(buffer)
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError(f"Malformed JSON item at offset {pos}")
+                break
+            # A number or literal running to the end of the buffer may continue in the next chunk
+            if end == len(buffer) and not final and buffer[pos] not in "{[\"":
+                break
+            items.append(item)
+            pos = end
+        
+        self._buffer = buffer[pos:]
+        return items
+    
+    def _seek(self) -> None:
+        """Scan the buffer up to the opening bracket of the target array"""
+        buffer = self._buffer
+        for pos, char in enumerate(buffer):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = json.loads('"' + "".join(self._string_chars) + '"')
+                    continue
+                self._string_chars.append(char)
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                self._string_chars = []
+            elif char == ":":
+                # Only object keys are followed by a colon
+                if self._stack:
+                    self._stack[-1] = self._last_string
+            elif char == "{":
+                self._stack.append("")
+            elif char == "[":
+                if self._stack == self.path:
+                    self._in_array = True
+                    self._buffer = buffer[pos + 1:]
+                    return
+                self._stack.append(None)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    # The document ended without the array
+                    self._done = True
+                    self._buffer = ""
+                    return
+        self._buffer = ""
@@ -0,0 +1,158 @@
+"""Per-host rate limiting utilities."""
+
+import asyncio
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class TokenBucket:
+    """
+    Async token bucket for a single host.
+    
+    The refill rate starts from configuration and is then adjusted live from
+    the ``X-Ratelimit-*`` headers the host sends back, so requests run at the
+    highest throughput the server currently allows.
+    """
+    
+    LIMIT_HEADER = "X-Ratelimit-Limit"
+    REMAINING_HEADER = "X-Ratelimit-Remaining"
+    RESET_HEADER = "X-Ratelimit-Reset"
+    
+    def __init__(self, host: str, rate: float, burst: float, min_rate: float = 0.1) -> None:
+        """
+        Initialize the bucket
+        
+        Args:
+            host: Host the bucket limits
+            rate: Initial refill rate in requests per second
+            burst: Bucket capacity, i.e. the largest allowed burst
+            min_rate: Lower bound for header-driven rate adjustments
+        """
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.tokens = burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent to the host"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while, e.g. after a 429
+        
+        Args:
+            seconds: How long to pause
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        logger.warning("rate_limit_paused", host=self.host, seconds=round(seconds, 3))
+    
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adjust the bucket from rate limit response headers
+        
+        The remaining quota is spread evenly over the time left in the window.
+        An exhausted quota blocks the bucket until the window resets.
+        
+        Args:
+            headers: Response headers
+        """
+        remaining = _parse_float(headers.get(self.REMAINING_HEADER))
+        reset = _parse_float(headers.get(self.RESET_HEADER))
+        if remaining is None or reset is None:
+            return
+        
+        if remaining < 1:
+            self.pause(reset)
+            return
+        
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, remaining / max(reset, 1.0))
+        self.tokens = min(self.tokens, remaining)
+        
+        limit = _parse_float(headers.get(self.LIMIT_HEADER))
+        if limit is not None:
+            self.burst = max(1.0, min(self.burst, limit))
+
+class RateLimiter:
+    """Registry of token buckets, one per host"""
+    
+    DEFAULT_LIMIT: Dict[str, float] = {"rate": 10.0, "burst": 10.0}
+    
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """
+        Initialize the registry
+        
+        Args:
+            limits: Per-host ``rate``/``burst`` settings; the ``default`` key applies to other hosts
+        """
+        self.limits = limits or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+    
+    def for_host(self, host: str) -> TokenBucket:
+        """
+        Get the bucket for a host, creating it on first use
+        
+        Args:
+            host: Request host
+        
+        Returns:
+            The host's token bucket
+        """
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            settings = {
+                **self.DEFAULT_LIMIT,
+                **self.limits.get("default", {}),
+                **self.limits.get(host, {})
+            }
+            bucket = TokenBucket(host, rate=float(settings["rate"]), burst=float(settings["burst"]))
+            self._buckets[host] = bucket
+        return bucket
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the current rate of every host
+        
+        Returns:
+            Dict mapping hosts to their current rate and burst
+        """
+        return {
+            host: {"rate": round(bucket.rate, 3), "burst": bucket.burst}
+            for host, bucket in self._buckets.items()
+        }
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric header value, ignoring malformed ones"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
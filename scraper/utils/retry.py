@@ -0,0 +1,96 @@
+"""Retry policy for HTTP requests."""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter and a total time budget.
+    
+    One policy instance is shared by every request of a run, so the budget
+    caps the time the whole run may spend waiting on retries.
+    """
+    
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.25,
+                 max_delay: float = 10.0, total_budget: float = 120.0) -> None:
+        """
+        Initialize the policy
+        
+        Args:
+            max_attempts: Attempts per request, including the first one
+            base_delay: Backoff ceiling of the first retry in seconds
+            max_delay: Upper bound of the backoff ceiling in seconds
+            total_budget: Seconds all retries of a run may sleep in total
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_budget = total_budget
+        self.spent = 0.0
+        self.retries = 0
+    
+    def should_retry_status(self, status: int) -> bool:
+        """
+        Check whether a response status is worth retrying
+        
+        Args:
+            status: HTTP status code
+        
+        Returns:
+            True for rate limiting and transient server errors
+        """
+        return status in self.RETRY_STATUSES
+    
+    def next_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Get the delay before the next attempt and charge it to the budget
+        
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            retry_after: Delay requested by the server, if any
+        
+        Returns:
+            Seconds to sleep, or None when the request should not be retried
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        
+        if retry_after is not None:
+            delay = max(retry_after, 0.0)
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        
+        if self.spent + delay > self.total_budget:
+            return None
+        
+        self.spent += delay
+        self.retries += 1
+        return delay
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+    
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+    
+    Returns:
+        Delay in seconds, or None when absent or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
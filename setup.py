@@ -10,6 +10,7 @@ setup(
         "click",
         "jinja2",
         "structlog",
+        "numpy",
     ],
     entry_points={
         "console_scripts": [